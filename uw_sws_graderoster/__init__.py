@@ -1,66 +1,500 @@
 # Copyright 2025 UW-IT, University of Washington
 # SPDX-License-Identifier: Apache-2.0
 
-from uw_sws import encode_section_label
-from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster.cache import get_graderoster_cache
+from uw_sws_graderoster.metrics import (
+    call_with_metrics, async_call_with_metrics, timed)
 from uw_sws_graderoster.models import GradeRoster
+from uw_sws_graderoster.retry import call_with_retry
+from uw_sws_graderoster.validation import (
+    validate_graderoster, InvalidGradeRosterException)
 from restclients_core.exceptions import DataFailureException
+from commonconf import settings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
 from lxml import etree
+import asyncio
+import re
 
 graderoster_url = "/student/v5/graderoster"
+stream_chunk_size = 64 * 1024
 
 
-def get_graderoster(section, instructor, requestor):
+def get_graderoster(section, instructor, requestor, stream=False,
+                    lazy_persons=False):
     """
     Returns a restclients.GradeRoster for the passed Section model and
-    instructor Person.
+    instructor Person.  If stream is True, the items of the returned
+    GradeRoster are parsed lazily from the response.  If lazy_persons is
+    True, the people on the roster are PersonReference models, resolved
+    only when needed.
     """
-    label = GradeRoster(section=section,
-                        instructor=instructor).graderoster_label()
-    url = "{}/{}".format(graderoster_url, encode_section_label(label))
-    headers = {"Accept": "text/xhtml",
-               "Connection": "keep-alive",
-               "X-UW-Act-as": requestor.uwnetid}
+    return call_with_metrics(
+        "get_graderoster", _get_graderoster, section, instructor, requestor,
+        stream, lazy_persons)
 
-    response = SWS_GradeRoster_DAO().getURL(url, headers)
 
-    if response.status != 200:
-        root = etree.fromstring(response.data)
-        msg = root.find(".//*[@class='status_description']").text.strip()
-        raise DataFailureException(url, response.status, msg)
+def iter_graderoster_items(section, instructor, requestor,
+                           lazy_persons=False):
+    """
+    Returns a generator of restclients.GradeRosterItem models for the
+    passed Section model and instructor Person, yielding each item as it
+    is parsed from the response.
+    """
+    graderoster = get_graderoster(section, instructor, requestor, stream=True,
+                                  lazy_persons=lazy_persons)
+    return graderoster.iter_items()
+
 
+def get_graderosters(pairs, requestor, max_workers=None,
+                     lazy_persons=False):
+    """
+    Generator fetching the restclients.GradeRoster for each of the passed
+    (Section model, instructor Person) pairs concurrently, on at most
+    max_workers threads.  Yields a (section, instructor, graderoster)
+    tuple as each fetch completes.  A fetch that fails yields its
+    DataFailureException in place of the graderoster.
+    """
+    if max_workers is None:
+        max_workers = int(getattr(
+            settings, "GRADEROSTER_FETCH_MAX_WORKERS", 4))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
     try:
-        root = etree.fromstring(response.data.strip())
-    except etree.XMLSyntaxError as ex:
-        raise DataFailureException(url, response.status, ex)
+        futures = {}
+        for (section, instructor) in pairs:
+            future = executor.submit(get_graderoster, section, instructor,
+                                     requestor, lazy_persons=lazy_persons)
+            futures[future] = (section, instructor)
 
-    return GradeRoster.from_xhtml(root, section=section, instructor=instructor)
+        for future in as_completed(futures):
+            (section, instructor) = futures[future]
+            try:
+                graderoster = future.result()
+            except DataFailureException as ex:
+                graderoster = ex
+            yield (section, instructor, graderoster)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
-def update_graderoster(graderoster, requestor):
+def update_graderoster(graderoster, requestor, lazy_persons=False,
+                       delta=False, merge=False, validate=False,
+                       chunked=False):
     """
     Updates the graderoster resource for the passed restclients.GradeRoster
     model. A new restclients.GradeRoster is returned, representing the
     document returned from the update request.
+
+    If delta is True, only the items changed since the graderoster was
+    parsed are submitted.  The returned GradeRoster contains every item,
+    with the submitted items replaced by those returned from the update.
+    If no items have changed, the passed graderoster is returned.
+
+    If merge is True, the document returned from the update is merged
+    into the passed graderoster, which is returned.
+
+    If validate is True, the changes to the items are validated first, and
+    an InvalidGradeRosterException listing the item errors is raised in
+    place of the update if any are invalid.
+
+    If chunked is True, the document is sent as an iterable of encoded
+    chunks, rendered as the request body is sent, rather than rendered in
+    full before the request.
+    """
+    return call_with_metrics(
+        "update_graderoster", _update_graderoster, graderoster, requestor,
+        lazy_persons, delta, merge, validate, chunked)
+
+
+async def async_get_graderoster(section, instructor, requestor,
+                                executor=None, lazy_persons=False):
+    """
+    Coroutine returning a restclients.GradeRoster for the passed Section
+    model and instructor Person.  The SWS request runs on the event loop's
+    default executor, and the response is parsed on the passed executor.
+    """
+    return await async_call_with_metrics(
+        "async_get_graderoster", _async_get_graderoster, section,
+        instructor, requestor, executor, lazy_persons)
+
+
+async def async_update_graderoster(graderoster, requestor, executor=None,
+                                   lazy_persons=False, delta=False,
+                                   merge=False, validate=False,
+                                   chunked=False):
     """
-    label = graderoster.graderoster_label()
-    url = "{}/{}".format(graderoster_url, encode_section_label(label))
-    headers = {"Content-Type": "application/xhtml+xml",
-               "Connection": "keep-alive",
-               "X-UW-Act-as": requestor.uwnetid}
-    body = graderoster.xhtml()
+    Coroutine updating the graderoster resource for the passed
+    restclients.GradeRoster model, as update_graderoster does.  The SWS
+    request runs on the event loop's default executor, and the document is
+    rendered and parsed on the passed executor.  A chunked document is
+    rendered as the request sends it.
+    """
+    return await async_call_with_metrics(
+        "async_update_graderoster", _async_update_graderoster, graderoster,
+        requestor, executor, lazy_persons, delta, merge, validate, chunked)
+
+
+def _get_graderoster(section, instructor, requestor, stream, lazy_persons,
+                     metrics):
+    label = _graderoster_label(section, instructor)
+    url = _graderoster_url(label)
+    headers = _get_headers(requestor)
+
+    if stream:
+        response = _get_response(url, headers, metrics)
+        _check_status(url, response)
+        if metrics is not None:
+            metrics.add_count("response_bytes", len(response.data))
+        return _stream_graderoster(url, response, section, instructor,
+                                   lazy_persons, metrics)
+
+    cache = get_graderoster_cache()
+    entry = _get_cache_entry(cache, label, requestor, headers)
+    if entry is not None and entry.is_fresh():
+        cache.record("hits")
+        _count_cache_hit(metrics)
+        return _copy_cached(entry, section, instructor, lazy_persons,
+                            metrics)
+
+    response = _get_response(url, headers, metrics)
+
+    if entry is not None and response.status == 304:
+        _count_cache_hit(metrics)
+        return _revalidated(cache, entry, section, instructor, lazy_persons,
+                            metrics)
+
+    graderoster = _parse_graderoster(url, response, section, instructor,
+                                     lazy_persons, metrics)
+    _cache_response(cache, label, requestor, response, graderoster)
+    return graderoster
+
+
+def _update_graderoster(graderoster, requestor, lazy_persons, delta, merge,
+                        validate, chunked, metrics):
+    items = graderoster.changed_items() if delta else None
+    if items is not None and not len(items):
+        return graderoster
+
+    url = _graderoster_url(graderoster.graderoster_label())
+    if validate:
+        _validate(url, graderoster, items, metrics)
+
+    if chunked:
+        body = _chunked_body(graderoster, items, metrics)
+    else:
+        body = timed(metrics, "render", graderoster.xhtml, items=items)
+        _count_request(metrics, body)
+
+    response = _put_response(url, requestor, body, metrics)
+
+    return _parse_update(url, response, graderoster, lazy_persons, delta,
+                         merge, metrics)
+
+
+async def _async_get_graderoster(section, instructor, requestor, executor,
+                                 lazy_persons, metrics):
+    loop = asyncio.get_running_loop()
+    label = _graderoster_label(section, instructor)
+    url = _graderoster_url(label)
+    headers = _get_headers(requestor)
+
+    cache = get_graderoster_cache()
+    entry = _get_cache_entry(cache, label, requestor, headers)
+    if entry is not None and entry.is_fresh():
+        cache.record("hits")
+        _count_cache_hit(metrics)
+        return await loop.run_in_executor(
+            executor, _copy_cached, entry, section, instructor, lazy_persons,
+            metrics)
+
+    response = await loop.run_in_executor(
+        None, _get_response, url, headers, metrics)
+
+    if entry is not None and response.status == 304:
+        _count_cache_hit(metrics)
+        return await loop.run_in_executor(
+            executor, _revalidated, cache, entry, section, instructor,
+            lazy_persons, metrics)
+
+    graderoster = await loop.run_in_executor(
+        executor, _parse_graderoster, url, response, section, instructor,
+        lazy_persons, metrics)
+    _cache_response(cache, label, requestor, response, graderoster)
+    return graderoster
+
+
+async def _async_update_graderoster(graderoster, requestor, executor,
+                                    lazy_persons, delta, merge, validate,
+                                    chunked, metrics):
+    items = graderoster.changed_items() if delta else None
+    if items is not None and not len(items):
+        return graderoster
+
+    loop = asyncio.get_running_loop()
+    url = _graderoster_url(graderoster.graderoster_label())
+    if validate:
+        _validate(url, graderoster, items, metrics)
+    if chunked:
+        body = _chunked_body(graderoster, items, metrics)
+    else:
+        body = await loop.run_in_executor(
+            executor, timed, metrics, "render", graderoster.xhtml, items)
+        _count_request(metrics, body)
+
+    response = await loop.run_in_executor(
+        None, _put_response, url, requestor, body, metrics)
+
+    return await loop.run_in_executor(
+        executor, _parse_update, url, response, graderoster, lazy_persons,
+        delta, merge, metrics)
+
+
+def _validate(url, graderoster, items, metrics):
+    errors = timed(metrics, "validate", validate_graderoster, graderoster,
+                   items)
+    if len(errors):
+        raise InvalidGradeRosterException(url, errors)
+
+
+def _graderoster_label(section, instructor):
+    return GradeRoster(section=section,
+                       instructor=instructor).graderoster_label()
+
+
+def _graderoster_url(label):
+    # Encoded as uw_sws.encode_section_label does, without importing uw_sws
+    return "{}/{}".format(graderoster_url, quote(label, safe="/,"))
+
+
+def _get_headers(requestor):
+    return {"Accept": "text/xhtml",
+            "Connection": "keep-alive",
+            "X-UW-Act-as": requestor.uwnetid}
+
+
+def _put_headers(requestor):
+    return {"Content-Type": "application/xhtml+xml",
+            "Connection": "keep-alive",
+            "X-UW-Act-as": requestor.uwnetid}
+
+
+def _get_dao():
+    # Deferred until a request is made, as the DAO imports uw_sws and PWS
+    from uw_sws_graderoster.dao import get_graderoster_dao
+    return get_graderoster_dao()
+
+
+def _get_response(url, headers, metrics=None):
+    dao = _get_dao()
+    return call_with_retry(url, lambda: timed(
+        metrics, "request", dao.getURL, url, headers), metrics)
 
-    response = SWS_GradeRoster_DAO().putURL(url, headers, body)
 
+def _put_response(url, requestor, body, metrics=None):
+    # A callable body returns a new body for each attempt
+    dao = _get_dao()
+    return call_with_retry(url, lambda: timed(
+        metrics, "request", dao.putURL, url, _put_headers(requestor),
+        body() if callable(body) else body), metrics)
+
+
+def _chunked_body(graderoster, items, metrics):
+    """
+    Returns a function returning new chunks of the graderoster document for
+    each attempt of the request.  The rendering time and size of the first
+    attempt are counted in the metrics.
+    """
+    counted = metrics is None
+
+    def body():
+        nonlocal counted
+        chunks = graderoster.xhtml_chunks(items=items,
+                                          chunk_size=stream_chunk_size)
+        if counted:
+            return chunks
+        counted = True
+        return _counted_chunks(metrics, chunks)
+    return body
+
+
+def _counted_chunks(metrics, chunks):
+    while True:
+        chunk = timed(metrics, "render", next, chunks, None)
+        if chunk is None:
+            return
+        metrics.add_count("request_bytes", len(chunk))
+        yield chunk
+
+
+def _get_header(response, name):
+    for key, value in (response.headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+
+
+def _get_cache_entry(cache, label, requestor, headers):
+    """
+    Returns the cache entry for the graderoster, adding the headers that
+    revalidate a stale entry.
+    """
+    if cache is None:
+        return None
+
+    entry = cache.get_entry(label, requestor.uwnetid)
+    if entry is not None and not entry.is_fresh():
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+    return entry
+
+
+def _revalidated(cache, entry, section, instructor, lazy_persons, metrics):
+    entry.refresh(cache.ttl)
+    cache.record("revalidations")
+    return _copy_cached(entry, section, instructor, lazy_persons, metrics)
+
+
+def _copy_cached(entry, section, instructor, lazy_persons, metrics):
+    # The cached graderoster may have been parsed with lazy_persons, so its
+    # stand-ins are resolved for callers that want PWS people
+    graderoster = entry.copy_graderoster(section, instructor)
+    if not lazy_persons:
+        graderoster.resolve_people(metrics)
+    return graderoster
+
+
+def _cache_response(cache, label, requestor, response, graderoster):
+    if cache is not None:
+        cache.record("misses")
+        cache.store(label, requestor.uwnetid, graderoster,
+                    etag=_get_header(response, "ETag"),
+                    last_modified=_get_header(response, "Last-Modified"))
+
+
+def _count_cache_hit(metrics):
+    if metrics is not None:
+        metrics.add_count("cache_hits")
+
+
+def _count_request(metrics, body):
+    if metrics is not None:
+        metrics.add_count("request_bytes", len(body.encode("utf-8")))
+
+
+def _check_status(url, response):
     if response.status != 200:
-        root = etree.fromstring(response.data)
-        msg = root.find(".//*[@class='status_description']").text.strip()
-        raise DataFailureException(url, response.status, msg)
+        raise DataFailureException(url, response.status,
+                                   _status_description(response.data))
+
+
+def _status_description(data):
+    # Errors from proxies and load balancers may not be XHTML
+    if not data:
+        return ""
 
+    try:
+        node = etree.fromstring(data).find(".//*[@class='status_description']")
+        if node is not None and node.text:
+            return node.text.strip()
+    except (etree.XMLSyntaxError, ValueError):
+        pass
+
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", errors="replace")
+    return data.strip()
+
+
+def _parse_graderoster(url, response, section, instructor, lazy_persons,
+                       metrics=None):
+    _check_status(url, response)
+
+    graderoster = timed(metrics, "parse", _graderoster_from_response, url,
+                        response, section, instructor, lazy_persons, metrics)
+    if metrics is not None:
+        metrics.add_count("response_bytes", len(response.data))
+        metrics.add_count("items", len(graderoster.items))
+    return graderoster
+
+
+def _graderoster_from_response(url, response, section, instructor,
+                               lazy_persons, metrics):
     try:
         root = etree.fromstring(response.data.strip())
     except etree.XMLSyntaxError as ex:
         raise DataFailureException(url, response.status, ex)
 
-    return GradeRoster.from_xhtml(root, section=graderoster.section,
-                                  instructor=graderoster.instructor)
+    return GradeRoster.from_xhtml(root, section=section, instructor=instructor,
+                                  lazy_persons=lazy_persons, metrics=metrics)
+
+
+def _parse_update(url, response, graderoster, lazy_persons, delta,
+                  merge=False, metrics=None):
+    cache = get_graderoster_cache()
+    if cache is not None:
+        cache.delete_label(graderoster.graderoster_label())
+
+    if merge:
+        _check_status(url, response)
+        items = timed(metrics, "parse", _merge_response, url, response,
+                      graderoster, lazy_persons, metrics)
+        if metrics is not None:
+            metrics.add_count("response_bytes", len(response.data))
+            metrics.add_count("items", len(items))
+        return graderoster
+
+    new_graderoster = _parse_graderoster(
+        url, response, graderoster.section, graderoster.instructor,
+        lazy_persons, metrics)
+
+    if delta:
+        submitted = dict((item.student_label(), item)
+                         for item in new_graderoster.items)
+        new_graderoster.items = [
+            submitted.get(item.student_label(), item)
+            for item in graderoster.items]
+
+    return new_graderoster
+
+
+def _merge_response(url, response, graderoster, lazy_persons, metrics):
+    try:
+        root = etree.fromstring(response.data.strip())
+    except etree.XMLSyntaxError as ex:
+        raise DataFailureException(url, response.status, ex)
+
+    return graderoster.merge_xhtml(root, lazy_persons=lazy_persons,
+                                   metrics=metrics)
+
+
+def _stream_graderoster(url, response, section, instructor,
+                        lazy_persons=False, metrics=None):
+    # Only the graderoster header is parsed during the call
+    try:
+        graderoster = timed(
+            metrics, "parse", GradeRoster.from_xhtml_stream,
+            _iter_chunks(response.data), section=section,
+            instructor=instructor, lazy_persons=lazy_persons,
+            metrics=metrics)
+    except (etree.XMLSyntaxError, ValueError) as ex:
+        raise DataFailureException(url, response.status, ex)
+
+    graderoster.items = _guard_stream(url, response.status,
+                                      graderoster.iter_items())
+    return graderoster
+
+
+def _guard_stream(url, status, items):
+    try:
+        yield from items
+    except etree.XMLSyntaxError as ex:
+        raise DataFailureException(url, status, ex)
+
+
+def _iter_chunks(data, size=stream_chunk_size):
+    # Skip leading whitespace without copying the response data
+    pattern = rb"\s*" if isinstance(data, bytes) else r"\s*"
+    offset = re.match(pattern, data).end()
+    for start in range(offset, len(data), size):
+        yield data[start:start + size]
@@ -0,0 +1,197 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Grade distributions and roster statistics over many graderosters.  The
+items of a batch of rosters are converted once into columns of grade codes,
+grade points and flags, stored in arrays, and the statistics are computed
+over slices of those columns with builtins that run in C, rather than by
+looping over the items.
+"""
+
+from uw_sws_graderoster.models import (
+    GradeRosterItem, GradingScale, _item_field_key, _sorted_scale)
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+# Flag bits, for the flags column
+INCOMPLETE = 1
+WITHDRAWN = 2
+NO_GRADE_NOW = 4
+WRITING_CREDIT = 8
+AUDITOR = 16
+
+FLAG_NAMES = (
+    ("incomplete", INCOMPLETE),
+    ("withdrawn", WITHDRAWN),
+    ("no_grade_now", NO_GRADE_NOW),
+    ("writing_credit", WRITING_CREDIT),
+    ("auditor", AUDITOR),
+)
+
+_ITEM_FIELDS = ("grade", "has_incomplete", "date_withdrawn", "no_grade_now",
+                "has_writing_credit", "is_auditor")
+
+
+@lru_cache(maxsize=None)
+def grade_points():
+    """
+    Returns a dict of the grade points of the grades on the 4.0 scale.  The
+    graduate scale is a subset of the undergraduate scale, and 0.0 is the
+    failing grade below it.
+    """
+    grades = GradingScale.GRADE_SCALES[GradingScale.UNDERGRADUATE_SCALE]
+    return dict((grade, float(grade)) for grade in grades + ["0.0"])
+
+
+@lru_cache(maxsize=None)
+def _field_keys():
+    return tuple(_item_field_key(name) for name in _ITEM_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def _bit_table(flag):
+    # Maps each flags byte to 1 if the flag is set, so flags can be
+    # counted with bytes.translate and bytes.count
+    return bytes(1 if value & flag else 0 for value in range(256))
+
+
+class GradeRosterArrays(object):
+    """
+    The items of one or more graderosters, as columns:
+
+        codes    array of codes into the grades list, with "" for no grade
+        points   array of the grade points of decimal grades, 0.0 for others
+        decimal  array of 1 for the items with a decimal grade, 0 for others
+        flags    array of the INCOMPLETE, WITHDRAWN, NO_GRADE_NOW,
+                 WRITING_CREDIT and AUDITOR bits of each item
+
+    The items of the nth roster are the rows from offsets[n] to
+    offsets[n + 1], and labels[n] is its graderoster label.  The statistics
+    methods take the index of a roster, or None for the whole batch.
+    """
+    def __init__(self, graderosters):
+        if hasattr(graderosters, "items"):
+            graderosters = [graderosters]
+
+        self.grades = []
+        self.labels = []
+        self.offsets = array("I", [0])
+        self.codes = array("H")
+        self.points = array("d")
+        self.decimal = array("B")
+        self.flags = array("B")
+
+        codes = {}
+        points = grade_points()
+        for graderoster in graderosters:
+            self.labels.append(graderoster.graderoster_label())
+            for values in _item_values(graderoster.items):
+                (grade, incomplete, withdrawn, no_grade_now, writing_credit,
+                    auditor) = values
+                if grade is None:
+                    grade = ""
+                code = codes.get(grade)
+                if code is None:
+                    code = codes[grade] = len(self.grades)
+                    self.grades.append(grade)
+                self.codes.append(code)
+
+                point = points.get(grade)
+                self.points.append(0.0 if point is None else point)
+                self.decimal.append(0 if point is None else 1)
+                self.flags.append(
+                    (INCOMPLETE if incomplete else 0) |
+                    (WITHDRAWN if withdrawn is not None else 0) |
+                    (NO_GRADE_NOW if no_grade_now else 0) |
+                    (WRITING_CREDIT if writing_credit else 0) |
+                    (AUDITOR if auditor else 0))
+            self.offsets.append(len(self.flags))
+
+    def __len__(self):
+        return len(self.flags)
+
+    def _rows(self, roster):
+        if roster is None:
+            return slice(None)
+        return slice(self.offsets[roster], self.offsets[roster + 1])
+
+    def grade_distribution(self, roster=None):
+        """
+        Returns a dict of the count of each grade, in grade order, with
+        ungraded items counted under "".
+        """
+        counts = Counter(self.codes[self._rows(roster)])
+        grades = dict((self.grades[code], count)
+                      for code, count in counts.items())
+        return dict((grade, grades[grade])
+                    for grade in _sorted_scale(tuple(grades)))
+
+    def mean_grade_points(self, roster=None):
+        """
+        Returns the mean of the decimal grades, or None if there are none.
+        """
+        rows = self._rows(roster)
+        count = self.decimal[rows].count(1)
+        if count:
+            return sum(self.points[rows]) / count
+
+    def counts(self, roster=None):
+        """
+        Returns a dict of the count of items, graded items, items with a
+        decimal grade, and items with each of the flags.
+        """
+        rows = self._rows(roster)
+        flags = self.flags[rows].tobytes()
+        counts = {
+            "items": len(flags),
+            "graded": len(flags) - self.codes[rows].count(
+                self._code("")),
+            "decimal": self.decimal[rows].count(1),
+        }
+        for (name, flag) in FLAG_NAMES:
+            counts[name] = flags.translate(_bit_table(flag)).count(1)
+        return counts
+
+    def summary(self, roster=None):
+        """
+        Returns a dict of the counts, grade distribution and mean grade
+        points of a roster, or of the batch.
+        """
+        summary = self.counts(roster)
+        summary["grade_distribution"] = self.grade_distribution(roster)
+        summary["mean_grade_points"] = self.mean_grade_points(roster)
+        return summary
+
+    def summaries(self):
+        """
+        Returns a dict of the summary of each roster, keyed on graderoster
+        label.
+        """
+        return dict((label, self.summary(roster))
+                    for roster, label in enumerate(self.labels))
+
+    def _code(self, grade):
+        try:
+            return self.grades.index(grade)
+        except ValueError:
+            return -1
+
+
+def _item_values(items):
+    """
+    Yields a tuple of the _ITEM_FIELDS values of each item.  The values of
+    GradeRosterItem models are read from the model's field values, skipping
+    the field descriptors.
+    """
+    keys = _field_keys()
+    defaults = tuple(GradeRosterItem.__dict__[name].default
+                     for name in _ITEM_FIELDS)
+    for item in items:
+        if type(item) is GradeRosterItem:
+            values = item._field_values
+            yield tuple(values.get(key, default)
+                        for key, default in zip(keys, defaults))
+        else:
+            yield tuple(getattr(item, name) for name in _ITEM_FIELDS)
@@ -0,0 +1,269 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmarks for graderoster parsing and rendering.  Timings are the best of
+several runs, in seconds.
+
+The benchmark suite runs against synthetic rosters, and its results can be
+saved and compared with earlier results:
+
+    python uw_sws_graderoster/benchmarks.py --save results.json
+    python uw_sws_graderoster/benchmarks.py --compare results.json
+"""
+
+from restclients_core.dao import MockDAO
+from restclients_core.util.mock import convert_to_platform_safe
+from tempfile import TemporaryDirectory
+from urllib.parse import unquote
+from lxml import etree
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+BENCHMARK_SIZES = (10, 100, 1000, 10000)
+
+
+def best_time(func, repeat=5, number=1):
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def render_per_1000_items(graderoster, size=1000, repeat=5):
+    """
+    Returns the time to render GradeRoster.xhtml() per 1000 items, for a
+    roster of size items cycled from the items of the passed graderoster.
+    """
+    items = graderoster.items
+    graderoster.items = [items[idx % len(items)] for idx in range(size)]
+    try:
+        elapsed = best_time(graderoster.xhtml, repeat=repeat)
+    finally:
+        graderoster.items = items
+    return elapsed * 1000 / size
+
+
+def bytes_per_student(graderoster):
+    """
+    Returns a dict of the memory used per item by the items of the passed
+    graderoster, as GradeRosterItem models and as a CompactGradeRoster.
+    Objects shared with the graderoster header, such as the people on the
+    roster, are not counted.
+    """
+    from uw_sws_graderoster.compact import CompactGradeRoster
+
+    shared = [graderoster.section, graderoster.instructor]
+    shared.extend(item.grade_submitter_person for item in graderoster.items)
+    shared.extend(graderoster.authorized_grade_submitters)
+    shared.extend(graderoster.grade_submission_delegates)
+
+    compact = CompactGradeRoster(graderoster)
+    count = max(len(graderoster.items), 1)
+    return {
+        "items": deep_sizeof(
+            graderoster.items, exclude=shared) / count,
+        "compact": deep_sizeof(
+            (compact._values, compact._columns, compact._flags),
+            exclude=shared) / count,
+    }
+
+
+def deep_sizeof(obj, exclude=()):
+    """
+    Returns the size in bytes of obj and the objects it references,
+    counting each object once, and skipping the objects in exclude.
+    """
+    seen = set(id(o) for o in exclude)
+    size = 0
+    pending = [obj]
+    while len(pending):
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        if hasattr(obj, "__dict__"):
+            pending.append(obj.__dict__)
+    return size
+
+
+IMPORT_TIME_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, " ".join(sorted(sys.modules)))
+"""
+
+
+def import_time(module="uw_sws_graderoster", repeat=3):
+    """
+    Returns the best time to import module in a new interpreter, and the
+    set of modules loaded by the import.
+    """
+    times = []
+    for idx in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_TIME_SCRIPT.format(module=module)],
+            check=True, capture_output=True, text=True).stdout
+        (elapsed, modules) = output.split(" ", 1)
+        times.append(float(elapsed))
+    return min(times), set(modules.split())
+
+
+def run_benchmarks(sizes=BENCHMARK_SIZES, repeat=3, seed=0):
+    """
+    Runs the benchmark suite on synthetic rosters of each of the passed
+    sizes, and returns a dict of the timings for each benchmark, keyed on
+    roster size.  The round trip benchmark gets and updates the roster
+    through the mock DAO.  The import time of the package doesn't depend on
+    roster size, so is keyed on 0.
+    """
+    from uw_sws_graderoster import get_graderoster, update_graderoster
+    from uw_sws_graderoster.analytics import GradeRosterArrays
+    from uw_sws_graderoster.models import GradeRoster, GradingScale
+    from uw_sws_graderoster.synthetic import (
+        make_graderoster_xhtml, make_section, make_instructor)
+
+    results = {"from_xhtml": {}, "from_snapshot": {}, "xhtml": {},
+               "round_trip": {}, "grading_scale": {}, "to_arrays": {},
+               "grade_statistics": {}}
+    results["import"] = {"0": import_time(repeat=repeat)[0]}
+    instructor = make_instructor()
+    grading_scale = GradingScale()
+    scales = list(GradingScale.GRADE_SCALES.values())
+
+    with TemporaryDirectory() as path:
+        MockDAO.register_mock_path(path)
+        try:
+            for size in sizes:
+                section = make_section(size)
+                document = make_graderoster_xhtml(section, size, seed=seed)
+                _write_mock_resource(path, section, instructor, document)
+
+                def from_xhtml():
+                    return GradeRoster.from_xhtml(
+                        etree.fromstring(document), section=section,
+                        instructor=instructor)
+
+                def round_trip():
+                    graderoster = get_graderoster(
+                        section, instructor, instructor)
+                    update_graderoster(graderoster, instructor)
+
+                grade_scales = [scales[idx % len(scales)][::-1]
+                                for idx in range(size)]
+
+                def grading_scale_checks():
+                    for grade_scale in grade_scales:
+                        grading_scale.is_any_scale(grade_scale)
+
+                graderoster = from_xhtml()
+                snapshot = graderoster.to_snapshot()
+
+                def from_snapshot():
+                    return GradeRoster.from_snapshot(
+                        snapshot, section=section, instructor=instructor)
+
+                def to_arrays():
+                    return GradeRosterArrays(graderoster)
+
+                arrays = to_arrays()
+
+                key = str(size)
+                results["from_xhtml"][key] = best_time(from_xhtml, repeat)
+                results["from_snapshot"][key] = best_time(
+                    from_snapshot, repeat)
+                results["xhtml"][key] = best_time(graderoster.xhtml, repeat)
+                results["round_trip"][key] = best_time(round_trip, repeat)
+                results["grading_scale"][key] = best_time(
+                    grading_scale_checks, repeat)
+                results["to_arrays"][key] = best_time(to_arrays, repeat)
+                results["grade_statistics"][key] = best_time(
+                    arrays.summary, repeat)
+        finally:
+            # The mock path is removed with the directory
+            MockDAO.paths.remove(path)
+    return results
+
+
+def _write_mock_resource(path, section, instructor, document):
+    from uw_sws_graderoster import _graderoster_label, _graderoster_url
+
+    url = _graderoster_url(_graderoster_label(section, instructor))
+    filename = convert_to_platform_safe(
+        os.path.join(path, "sws", "file") + unquote(url))
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "w") as f:
+        f.write(document)
+
+
+def save_results(results, path):
+    with open(path, "w") as f:
+        json.dump({"python": platform.python_version(),
+                   "results": results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(baseline, results, threshold=1.2):
+    """
+    Returns a list of the benchmarks in results that are slower than in
+    baseline by more than the threshold ratio, as (benchmark, size,
+    baseline time, time) tuples.
+    """
+    regressions = []
+    for name, timings in sorted(results.items()):
+        for size, elapsed in sorted(timings.items(), key=lambda t: int(t[0])):
+            base = baseline.get(name, {}).get(size)
+            if base is not None and elapsed > base * threshold:
+                regressions.append((name, size, base, elapsed))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Graderoster benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=list(BENCHMARK_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="file to save the results to")
+    parser.add_argument("--compare", help="file of results to compare to")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(args)
+
+    results = run_benchmarks(sizes=args.sizes, repeat=args.repeat)
+    for name, timings in sorted(results.items()):
+        for size, elapsed in timings.items():
+            print("{:<16}{:>8} students{:>12.6f}s".format(name, size, elapsed))
+
+    if args.save:
+        save_results(results, args.save)
+
+    if args.compare:
+        regressions = compare_results(
+            load_results(args.compare), results, args.threshold)
+        for (name, size, base, elapsed) in regressions:
+            print("Regression: {} at {} students, {:.6f}s to {:.6f}s".format(
+                name, size, base, elapsed))
+        return 1 if len(regressions) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    # Runs against the mock DAO, as the tests do
+    from commonconf.backends import use_configparser_backend
+    use_configparser_backend(os.path.abspath(os.path.join(
+        os.path.dirname(__file__), "..", "conf", "test.conf")), "SWS")
+    sys.exit(main())
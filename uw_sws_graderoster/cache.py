@@ -0,0 +1,132 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from commonconf import settings
+from collections import OrderedDict
+from importlib import import_module
+from threading import Lock
+import copy
+import time
+
+
+class CacheEntry(object):
+    def __init__(self, graderoster, etag=None, last_modified=None, ttl=0):
+        self.graderoster = graderoster
+        self.etag = etag
+        self.last_modified = last_modified
+        self.refresh(ttl)
+
+    def refresh(self, ttl):
+        self.expires = time.monotonic() + ttl
+
+    def is_fresh(self):
+        return self.expires > time.monotonic()
+
+    def copy_graderoster(self, section, instructor):
+        """
+        Returns a copy of the cached graderoster, for the passed Section
+        model and instructor Person.
+        """
+        graderoster = self.graderoster
+        return copy.deepcopy(graderoster, memo={
+            id(graderoster.section): section,
+            id(graderoster.instructor): instructor})
+
+
+class GradeRosterCache(object):
+    """
+    A thread-safe, in-memory LRU cache of parsed GradeRosters, keyed by
+    graderoster label and acting user.  Entries are served for ttl seconds,
+    then revalidated with SWS using their ETag and Last-Modified values.
+
+    Subclasses can store entries elsewhere by overriding get_entry,
+    set_entry and delete_label.
+    """
+    def __init__(self, ttl=60, max_size=500):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get_entry(self, label, netid):
+        with self._lock:
+            entry = self._entries.get((label, netid))
+            if entry is not None:
+                self._entries.move_to_end((label, netid))
+            return entry
+
+    def set_entry(self, label, netid, entry):
+        with self._lock:
+            self._entries[(label, netid)] = entry
+            self._entries.move_to_end((label, netid))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete_label(self, label):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == label]:
+                del self._entries[key]
+
+    def store(self, label, netid, graderoster, etag=None,
+              last_modified=None):
+        """
+        Caches a copy of the passed graderoster.
+        """
+        entry = CacheEntry(
+            copy.deepcopy(graderoster), etag=etag,
+            last_modified=last_modified, ttl=self.ttl)
+        self.set_entry(label, netid, entry)
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.revalidations + self.misses
+            return {
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.revalidations) / requests
+                             if requests else 0.0),
+                "size": len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.revalidations = 0
+            self.misses = 0
+
+
+_cache = None
+_cache_lock = Lock()
+
+
+def get_graderoster_cache():
+    """
+    Returns the process-wide graderoster cache, an instance of the
+    GRADEROSTER_CACHE_CLASS setting, or None if no class is configured.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            path = getattr(settings, "GRADEROSTER_CACHE_CLASS", None)
+            if path:
+                module, attr = path.rsplit(".", 1)
+                _cache = getattr(import_module(module), attr)()
+        return _cache
+
+
+def set_graderoster_cache(cache):
+    """
+    Replaces the process-wide graderoster cache.  Passing None reverts to
+    the GRADEROSTER_CACHE_CLASS setting.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
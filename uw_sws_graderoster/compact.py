@@ -0,0 +1,192 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A compact, columnar representation of a GradeRoster, for holding many
+rosters in memory.  Item fields are stored as columns of codes into a table
+of the distinct values in the roster, with strings interned, and boolean
+fields packed into one byte of flags per item.
+"""
+
+from restclients_core import models
+from uw_sws_graderoster.models import GradeRoster, GradeRosterItem
+from array import array
+from datetime import date
+import sys
+
+_HEADER_FIELDS = ("section", "instructor", "section_credits",
+                  "allows_writing_credit")
+
+# Values that are coded by value, any others are coded by identity
+_VALUE_TYPES = (str, int, float, date, tuple, type(None))
+
+
+def _item_columns():
+    """
+    Returns a list of (name, key, default) for the coded GradeRosterItem
+    fields, and a list of (name, key, default) for the boolean fields.
+    """
+    columns = [("grade_choices", None, ())]
+    flags = []
+    for name, field in GradeRosterItem.__dict__.items():
+        if isinstance(field, models.BaseField):
+            column = (name, field._key_for_instance(field), field.default)
+            if isinstance(field, models.BooleanField):
+                flags.append(column)
+            else:
+                columns.append(column)
+    return columns, flags
+
+
+_columns, _flags = _item_columns()
+
+
+class CompactGradeRoster(object):
+    """
+    A read-only GradeRoster, storing its items in columns.  Iterating or
+    indexing the roster returns CompactGradeRosterItem row views.
+    """
+    def __init__(self, graderoster):
+        for name in _HEADER_FIELDS:
+            setattr(self, name, getattr(graderoster, name))
+        self.authorized_grade_submitters = list(
+            graderoster.authorized_grade_submitters)
+        self.grade_submission_delegates = list(
+            graderoster.grade_submission_delegates)
+
+        self._values = []
+        self._columns = dict((name, array("I")) for (name, k, d) in _columns)
+        self._flags = array("B")
+
+        # The roster is read-only, so the codes are only needed while
+        # building it
+        codes = {}
+        for item in graderoster.items:
+            self._append(item, codes)
+
+    def _code(self, value, codes):
+        if isinstance(value, _VALUE_TYPES):
+            if type(value) is str:
+                value = sys.intern(value)
+            key = (type(value), value)
+        else:
+            key = id(value)
+
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def _append(self, item, codes):
+        values = item._field_values
+        for (name, key, default) in _columns:
+            value = (item.grade_choices if key is None else
+                     values.get(key, default))
+            self._columns[name].append(self._code(value, codes))
+
+        flags = 0
+        for bit, (name, key, default) in enumerate(_flags):
+            if values.get(key, default):
+                flags |= 1 << bit
+        self._flags.append(flags)
+
+    def __len__(self):
+        return len(self._flags)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return CompactGradeRosterItem(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield CompactGradeRosterItem(self, row)
+
+    @property
+    def items(self):
+        return list(self)
+
+    def graderoster_label(self):
+        return self._header().graderoster_label()
+
+    def xhtml(self, items=None):
+        return self._header().xhtml(items=self.items if items is None
+                                    else items)
+
+    def to_graderoster(self):
+        """
+        Returns a GradeRoster with GradeRosterItem models for the items.
+        """
+        graderoster = self._header()
+        graderoster.items = [view.to_item() for view in self]
+        return graderoster
+
+    def _header(self):
+        graderoster = GradeRoster(
+            **dict((name, getattr(self, name)) for name in _HEADER_FIELDS))
+        graderoster.authorized_grade_submitters = list(
+            self.authorized_grade_submitters)
+        graderoster.grade_submission_delegates = list(
+            self.grade_submission_delegates)
+        return graderoster
+
+
+class CompactGradeRosterItem(object):
+    """
+    A read-only view of a row of a CompactGradeRoster, with the fields and
+    methods of a GradeRosterItem.
+    """
+    __slots__ = ("_roster", "_row")
+
+    def __init__(self, roster, row):
+        self._roster = roster
+        self._row = row
+
+    student_label = GradeRosterItem.student_label
+    __eq__ = GradeRosterItem.__eq__
+    __hash__ = GradeRosterItem.__hash__
+
+    def changed_fields(self):
+        return set()
+
+    def is_changed(self):
+        return False
+
+    def to_item(self):
+        """
+        Returns a GradeRosterItem model for the row, marked clean.
+        """
+        gr_item = GradeRosterItem()
+        for (name, key, default) in _columns:
+            value = getattr(self, name)
+            if key is None:
+                gr_item.grade_choices = value
+            else:
+                gr_item._field_values[key] = value
+        for (name, key, default) in _flags:
+            gr_item._field_values[key] = getattr(self, name)
+        gr_item.mark_clean()
+        return gr_item
+
+
+def _column_property(name):
+    def getter(view):
+        roster = view._roster
+        return roster._values[roster._columns[name][view._row]]
+    return property(getter)
+
+
+def _flag_property(bit):
+    def getter(view):
+        return bool(view._roster._flags[view._row] & (1 << bit))
+    return property(getter)
+
+
+for (name, key, default) in _columns:
+    setattr(CompactGradeRosterItem, name, _column_property(name))
+
+for bit, (name, key, default) in enumerate(_flags):
+    setattr(CompactGradeRosterItem, name, _flag_property(bit))
@@ -2,12 +2,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from uw_sws.dao import SWS_DAO
+from restclients_core.dao import LiveDAO
 from commonconf import settings
 from os.path import abspath, dirname
+from threading import Lock
 from lxml import etree
-import random
 import os
 import re
+import zlib
 
 
 class SWS_GradeRoster_DAO(SWS_DAO):
@@ -17,6 +19,25 @@ class SWS_GradeRoster_DAO(SWS_DAO):
     def _custom_headers(self, method, url, headers, body):
         pass
 
+    def _get_live_implementation(self):
+        return GradeRosterLiveDAO(self.service_name(), self)
+
+    def pool_stats(self):
+        """
+        Returns a dict of the statistics of the connection pool to SWS, or
+        None if the DAO isn't live.
+        """
+        if not self.get_implementation().is_live():
+            return None
+
+        pool = GradeRosterLiveDAO(self.service_name(), self).get_pool()
+        with pool.pool.mutex:
+            idle = sum(1 for conn in pool.pool.queue if conn is not None)
+        return {"connections": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": idle,
+                "max_size": pool.pool.maxsize}
+
     def _update_put(self, url, body, response):
         # For developing against crashes in grade submission
         if re.match(r'/student/v\d/graderoster/2013,spring,ZERROR,101,S1,',
@@ -39,40 +60,108 @@ class SWS_GradeRoster_DAO(SWS_DAO):
             response.data = "Bad Request: no PUT body"
 
     def _make_grade_roster_submitted(self, submitted_body):
+        # Use settings.GRADEROSTER_PARTIAL_SUBMISSIONS to simulate failures,
+        # seeded with settings.GRADEROSTER_PARTIAL_SUBMISSIONS_SEED
+        failure_rate = 0.0
+        if getattr(settings, 'GRADEROSTER_PARTIAL_SUBMISSIONS', False):
+            failure_rate = 0.5
+
+        return make_graderoster_submitted(
+            submitted_body, failure_rate=failure_rate,
+            seed=getattr(settings, 'GRADEROSTER_PARTIAL_SUBMISSIONS_SEED', 0))
+
+
+class GradeRosterLiveDAO(LiveDAO):
+    """
+    LiveDAO creating the connection pool for the service under a lock, so
+    that threads making their first requests together share one pool.
+    """
+    _pool_lock = Lock()
+
+    def get_pool(self):
+        with GradeRosterLiveDAO._pool_lock:
+            return super(GradeRosterLiveDAO, self).get_pool()
+
+
+_dao = None
+_dao_lock = Lock()
+
+
+def get_graderoster_dao():
+    """
+    Returns the process-wide SWS_GradeRoster_DAO, shared by all graderoster
+    requests.  The DAO is thread-safe, and its live implementation reuses
+    the connections of a pool bounded by the RESTCLIENTS_SWS_POOL_SIZE
+    setting.
+    """
+    global _dao
+    with _dao_lock:
+        if _dao is None:
+            _dao = SWS_GradeRoster_DAO()
+        return _dao
+
+
+def set_graderoster_dao(dao):
+    """
+    Replaces the process-wide graderoster DAO.  Passing None reverts to a
+    new SWS_GradeRoster_DAO.
+    """
+    global _dao
+    with _dao_lock:
+        _dao = dao
+
+
+def make_graderoster_submitted(submitted_body, failure_rate=0.0, seed=0):
+    """
+    Returns the document SWS would return for the submitted graderoster
+    body, with a status code and message for each item.  The body is a
+    document, or an iterable of encoded chunks of one.  Each item fails
+    with probability failure_rate, decided by the seed and the student, so
+    that the same submission always fails the same items.
+    """
+    if isinstance(submitted_body, (str, bytes)):
         root = etree.fromstring(submitted_body)
-        item_elements = root.findall('.//*[@class="graderoster_item"]')
-        for item in item_elements:
-            date_graded = item.find('.//*[@class="date_graded date"]')
-            if date_graded.text is None:
-                date_graded.text = '2013-06-01'
-
-            grade_submitter_source = item.find(
-                './/*[@class="grade_submitter_source"]')
-            if grade_submitter_source.text is None:
-                grade_submitter_source.text = 'WEBCGB'
-
-            # Set the status code and message for each item, these elements
-            # aren't present in graderosters returned from GET
-            # Use settings.GRADEROSTER_PARTIAL_SUBMISSIONS to simulate failures
-            status_code_text = '200'
-            status_message_text = ''
-            if (getattr(settings,
-                        'GRADEROSTER_PARTIAL_SUBMISSIONS',
-                        False) and random.choice([True, False])):
-
-                status_code_text = '500'
-                status_message_text = 'Invalid grade'
-
-            status_code = item.find('.//*[@class="code"]')
-            if status_code is None:
-                status_code = etree.fromstring('<span class="code"/>')
-                item.append(status_code)
-            status_code.text = status_code_text
-
-            status_message = item.find('.//*[@class="message"]')
-            if status_message is None:
-                status_message = etree.fromstring('<span class="message"/>')
-                item.append(status_message)
-            status_message.text = status_message_text
-
-        return etree.tostring(root)
+    else:
+        # A chunked body is an iterable of encoded chunks
+        parser = etree.XMLParser()
+        for chunk in submitted_body:
+            parser.feed(chunk)
+        root = parser.close()
+
+    for item in root.iterfind('.//*[@class="graderoster_item"]'):
+        date_graded = item.find('.//*[@class="date_graded date"]')
+        if date_graded.text is None:
+            date_graded.text = '2013-06-01'
+
+        grade_submitter_source = item.find(
+            './/*[@class="grade_submitter_source"]')
+        if grade_submitter_source.text is None:
+            grade_submitter_source.text = 'WEBCGB'
+
+        # Set the status code and message for each item, these elements
+        # aren't present in graderosters returned from GET
+        status_code_text = '200'
+        status_message_text = ''
+        if failure_rate > 0 and _item_fails(item, failure_rate, seed):
+            status_code_text = '500'
+            status_message_text = 'Invalid grade'
+
+        status_code = item.find('.//*[@class="code"]')
+        if status_code is None:
+            status_code = etree.SubElement(item, 'span', {'class': 'code'})
+        status_code.text = status_code_text
+
+        status_message = item.find('.//*[@class="message"]')
+        if status_message is None:
+            status_message = etree.SubElement(
+                item, 'span', {'class': 'message'})
+        status_message.text = status_message_text
+
+    return etree.tostring(root)
+
+
+def _item_fails(item, failure_rate, seed):
+    student = "{}:{}:{}".format(
+        seed, item.findtext('.//*[@class="reg_id"]'),
+        item.findtext('.//*[@class="duplicate_code"]'))
+    return zlib.crc32(student.encode("utf-8")) < failure_rate * 2 ** 32
@@ -0,0 +1,180 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Bulk export of graderosters to CSV or JSON lines, for reporting on many
+sections.  Rosters are fetched concurrently on a thread pool and parsed on
+a process pool, and each roster's rows are written as its parse completes.
+At most max_in_flight rosters are fetched or parsed at once, so memory use
+doesn't grow with the number of sections.
+"""
+
+from uw_sws_graderoster import (
+    _graderoster_label, _graderoster_url, _get_headers, _get_response,
+    _check_status)
+from uw_sws_graderoster.models import (
+    GradeRosterItem, _ItemValues, _parse_item, _graderoster_xpath,
+    _items_xpath, _section_id_xpath)
+from restclients_core.exceptions import DataFailureException
+from commonconf import settings
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED)
+from lxml import etree
+import csv
+import json
+import multiprocessing
+import os
+
+ITEM_FIELDS = (
+    "student_uwregid", "student_number", "student_surname",
+    "student_first_name", "student_former_name", "student_type",
+    "student_credits", "duplicate_code", "section_id", "is_auditor",
+    "allows_incomplete", "has_incomplete", "has_writing_credit",
+    "no_grade_now", "date_withdrawn", "grade", "allows_grade_change",
+    "date_graded", "grade_document_id", "grade_submitter_source",
+    "status_code", "status_message")
+
+ITEM_DEFAULTS = dict((name, GradeRosterItem.__dict__[name].default)
+                     for name in ITEM_FIELDS)
+
+EXPORT_FIELDS = (("section_label", "instructor_uwregid") + ITEM_FIELDS +
+                 ("grade_submitter_uwregid",))
+
+
+def export_graderosters(pairs, requestor, output, format="csv",
+                        max_workers=None, processes=None,
+                        max_in_flight=None):
+    """
+    Writes a row for each item on the graderoster of each of the passed
+    (Section model, instructor Person) pairs to the file object output, in
+    the "csv" or "jsonl" format.  The columns are EXPORT_FIELDS.  Rosters
+    are fetched on at most max_workers threads, and parsed on at most
+    processes processes.  Rows are written in the order the rosters
+    complete.
+
+    Returns a dict of the number of sections and rows exported, and a list
+    of the (section label, exception) pairs of rosters that failed.
+    """
+    if max_workers is None:
+        max_workers = int(getattr(
+            settings, "GRADEROSTER_FETCH_MAX_WORKERS", 4))
+    if processes is None:
+        processes = int(getattr(
+            settings, "GRADEROSTER_EXPORT_PROCESSES", os.cpu_count() or 1))
+    if max_in_flight is None:
+        max_in_flight = int(getattr(
+            settings, "GRADEROSTER_EXPORT_MAX_IN_FLIGHT", 2 * processes))
+
+    if format not in _writers:
+        raise ValueError("Unknown export format: {}".format(format))
+
+    writer = _writers[format](output)
+    results = {"sections": 0, "rows": 0, "errors": []}
+    pairs = iter(pairs)
+    fetching = {}
+    parsing = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as fetcher, \
+            ProcessPoolExecutor(max_workers=processes,
+                                mp_context=_mp_context()) as parser:
+        while True:
+            # Keeps the window of rosters full
+            while len(fetching) + len(parsing) < max_in_flight:
+                pair = next(pairs, None)
+                if pair is None:
+                    break
+                (section, instructor) = pair
+                future = fetcher.submit(
+                    _fetch_graderoster, section, instructor, requestor)
+                fetching[future] = (section.section_label(),
+                                    instructor.uwregid)
+
+            if not len(fetching) and not len(parsing):
+                break
+
+            done = wait(list(fetching) + list(parsing),
+                        return_when=FIRST_COMPLETED).done
+            for future in done:
+                is_fetch = future in fetching
+                prefix = (fetching if is_fetch else parsing).pop(future)
+                try:
+                    result = future.result()
+                except (DataFailureException, ValueError) as ex:
+                    results["errors"].append((prefix[0], ex))
+                    continue
+
+                if is_fetch:
+                    parsing[parser.submit(export_rows, prefix, result)] = (
+                        prefix)
+                else:
+                    writer(result)
+                    results["sections"] += 1
+                    results["rows"] += len(result)
+    return results
+
+
+def export_rows(prefix, data):
+    """
+    Returns a list of the rows for the items in a graderoster document,
+    each a tuple of the EXPORT_FIELDS values, starting with the prefix
+    values.  People are exported by regid, without PWS requests.  Raises
+    ValueError for a document that isn't a graderoster.
+    """
+    try:
+        roots = _graderoster_xpath(etree.fromstring(data.strip()))
+    except etree.XMLSyntaxError as ex:
+        # Raised as a ValueError, which can be returned from a process
+        raise ValueError("Invalid graderoster document: {}".format(ex))
+    if not len(roots):
+        raise ValueError("Invalid graderoster document: no graderoster")
+
+    root = roots[0]
+    section_ids = _section_id_xpath(root)
+    if not len(section_ids) or section_ids[0].text is None:
+        raise ValueError("Invalid graderoster document: no section_id")
+
+    section_id = section_ids[0].text.upper()
+    rows = []
+    for el in _items_xpath(root):
+        item = _ItemValues(section_id=section_id)
+        grade_submitter = _parse_item(el, item)
+        values = vars(item)
+        rows.append(prefix +
+                    tuple(values.get(name, ITEM_DEFAULTS[name])
+                          for name in ITEM_FIELDS) +
+                    (grade_submitter.get("uwregid"),))
+    return rows
+
+
+def _mp_context():
+    # The parser processes are started while the fetch threads are running,
+    # and forking a multi-threaded process can deadlock the child
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _fetch_graderoster(section, instructor, requestor):
+    url = _graderoster_url(_graderoster_label(section, instructor))
+    response = _get_response(url, _get_headers(requestor))
+    _check_status(url, response)
+    return response.data
+
+
+def _csv_writer(output):
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_FIELDS)
+    return writer.writerows
+
+
+def _jsonl_writer(output):
+    def write(rows):
+        for row in rows:
+            output.write(json.dumps(dict(zip(EXPORT_FIELDS, row))))
+            output.write("\n")
+    return write
+
+
+_writers = {
+    "csv": _csv_writer,
+    "jsonl": _jsonl_writer,
+}
@@ -0,0 +1,215 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A stand-in for the SWS graderoster resource, for load testing grade
+submission without SWS.  Select it with:
+
+    RESTCLIENTS_SWS_DAO_CLASS = \\
+        "uw_sws_graderoster.loadtest.GradeRosterLoadTestDAO"
+
+Graderoster GETs return synthetic rosters, and PUTs return the submitted
+roster with a status for each item.  Other SWS resources are served from
+the mock resources.  The load is shaped by these settings:
+
+    GRADEROSTER_LOADTEST_SEED               seed for all random choices
+    GRADEROSTER_LOADTEST_ROSTER_SIZE        students in each roster
+    GRADEROSTER_LOADTEST_LATENCY            latency distribution, one of
+                                            "fixed:<seconds>",
+                                            "uniform:<min>,<max>",
+                                            "normal:<mean>,<stddev>",
+                                            "lognormal:<mu>,<sigma>" or
+                                            "exponential:<mean>"
+    GRADEROSTER_LOADTEST_ITEM_FAILURE_RATE  fraction of submitted items
+                                            that fail
+    GRADEROSTER_LOADTEST_BURST_RATE         chance that a request starts
+                                            a burst of errors
+    GRADEROSTER_LOADTEST_BURST_LENGTH       requests in each error burst
+    GRADEROSTER_LOADTEST_BURST_STATUS       status of the burst errors,
+                                            such as 500, or 503 to
+                                            throttle
+"""
+
+from restclients_core.dao import DAOImplementation, MockDAO
+from restclients_core.models import MockHTTP
+from uw_sws.models import Section, Term
+from uw_sws_graderoster.dao import make_graderoster_submitted
+from uw_sws_graderoster.synthetic import make_graderoster_xhtml
+from commonconf import settings
+from functools import lru_cache
+from threading import Lock
+from urllib.parse import unquote
+import random
+import re
+import time
+
+_graderoster_url = re.compile(r"^/student/v\d/graderoster/([^/?]+)$")
+
+ERROR_XHTML = """<html xml:lang="en" lang="en" \
+xmlns="http://www.w3.org/1999/xhtml">
+  <head>
+    <title>Error</title>
+  </head>
+  <body>
+    <div class="status">
+      <span class="status_code">{status}</span>
+      <span class="status_description">{description}</span>
+    </div>
+  </body>
+</html>
+"""
+
+
+class LoadProfile(object):
+    """
+    The simulated behavior of the graderoster resource.  Random choices are
+    made from a generator seeded with seed, so a sequence of requests sees
+    the same latencies and errors on every run.
+    """
+    LATENCY_DISTRIBUTIONS = {
+        "fixed": lambda rnd, seconds: seconds,
+        "uniform": lambda rnd, low, high: rnd.uniform(low, high),
+        "normal": lambda rnd, mean, stddev: rnd.normalvariate(mean, stddev),
+        "lognormal": lambda rnd, mu, sigma: rnd.lognormvariate(mu, sigma),
+        "exponential": lambda rnd, mean: rnd.expovariate(1.0 / mean),
+    }
+
+    def __init__(self, latency="fixed:0", item_failure_rate=0.0,
+                 burst_rate=0.0, burst_length=10, burst_status=500,
+                 roster_size=30, seed=0):
+        (name, _, params) = latency.partition(":")
+        if name not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError("Unknown latency distribution: {}".format(
+                latency))
+
+        self._latency = self.LATENCY_DISTRIBUTIONS[name]
+        self._latency_params = [float(p) for p in params.split(",") if p]
+        self.item_failure_rate = item_failure_rate
+        self.burst_rate = burst_rate
+        self.burst_length = burst_length
+        self.burst_status = burst_status
+        self.roster_size = roster_size
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._burst_remaining = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def from_settings():
+        return LoadProfile(
+            latency=getattr(settings, "GRADEROSTER_LOADTEST_LATENCY",
+                            "fixed:0"),
+            item_failure_rate=float(getattr(
+                settings, "GRADEROSTER_LOADTEST_ITEM_FAILURE_RATE", 0.0)),
+            burst_rate=float(getattr(
+                settings, "GRADEROSTER_LOADTEST_BURST_RATE", 0.0)),
+            burst_length=int(getattr(
+                settings, "GRADEROSTER_LOADTEST_BURST_LENGTH", 10)),
+            burst_status=int(getattr(
+                settings, "GRADEROSTER_LOADTEST_BURST_STATUS", 500)),
+            roster_size=int(getattr(
+                settings, "GRADEROSTER_LOADTEST_ROSTER_SIZE", 30)),
+            seed=int(getattr(settings, "GRADEROSTER_LOADTEST_SEED", 0)))
+
+    def next_request(self):
+        """
+        Returns the latency in seconds, and the error status or None, for
+        the next request.
+        """
+        with self._lock:
+            latency = max(0.0, self._latency(
+                self._random, *self._latency_params))
+
+            if self._burst_remaining == 0 and self.burst_rate > 0:
+                if self._random.random() < self.burst_rate:
+                    self._burst_remaining = self.burst_length
+
+            status = None
+            if self._burst_remaining > 0:
+                self._burst_remaining -= 1
+                status = self.burst_status
+        return (latency, status)
+
+
+_profile = None
+_profile_lock = Lock()
+
+
+def get_load_profile():
+    global _profile
+    with _profile_lock:
+        if _profile is None:
+            _profile = LoadProfile.from_settings()
+        return _profile
+
+
+def set_load_profile(profile):
+    """
+    Replaces the process-wide load profile.  Passing None reverts to the
+    GRADEROSTER_LOADTEST settings.
+    """
+    global _profile
+    with _profile_lock:
+        _profile = profile
+
+
+class GradeRosterLoadTestDAO(DAOImplementation):
+    def __init__(self, service_name, dao):
+        super(GradeRosterLoadTestDAO, self).__init__(service_name, dao)
+        self._mock = MockDAO(service_name, dao)
+
+    def load(self, method, url, headers, body):
+        match = _graderoster_url.match(url)
+        if match is None:
+            return self._mock.load(method, url, headers, body)
+
+        profile = get_load_profile()
+        (latency, status) = profile.next_request()
+        if latency > 0:
+            time.sleep(latency)
+
+        if status is not None:
+            return _error_response(status, "Simulated error")
+
+        if method == "GET":
+            response = MockHTTP()
+            response.status = 200
+            response.headers = {"Content-Type": "application/xhtml+xml"}
+            response.data = _roster_xhtml(
+                unquote(match.group(1)), profile.roster_size, profile.seed)
+            return response
+
+        if method == "PUT":
+            if body is None:
+                return _error_response(400, "Bad Request: no PUT body")
+
+            response = MockHTTP()
+            response.status = 200
+            response.headers = {"Content-Type": "application/xhtml+xml"}
+            response.data = make_graderoster_submitted(
+                body, failure_rate=profile.item_failure_rate,
+                seed=profile.seed)
+            return response
+
+        return _error_response(405, "Method Not Allowed")
+
+
+def _error_response(status, description):
+    response = MockHTTP()
+    response.status = status
+    response.headers = {"Content-Type": "application/xhtml+xml"}
+    if status in (429, 503):
+        response.headers["Retry-After"] = "1"
+    response.data = ERROR_XHTML.format(status=status, description=description)
+    return response
+
+
+@lru_cache(maxsize=128)
+def _roster_xhtml(label, size, seed):
+    (year, quarter, curriculum_abbr, course_number, section_id,
+     instructor_regid) = label.split(",")
+    section = Section(
+        term=Term(year=int(year), quarter=quarter),
+        curriculum_abbr=curriculum_abbr, course_number=course_number,
+        section_id=section_id)
+    return make_graderoster_xhtml(section, size, seed=seed)
@@ -0,0 +1,122 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Per-phase timings for graderoster requests.  Each registered sink is called
+with a CallMetrics at the end of every get_graderoster and
+update_graderoster call.  When no sink is registered, no metrics are
+collected.
+"""
+
+from threading import Lock
+import time
+
+_sinks = ()
+_sinks_lock = Lock()
+
+
+class CallMetrics(object):
+    """
+    The metrics for a single graderoster call.  timings is a dict of the
+    seconds spent in each phase:
+
+        request   the SWS request
+        render    rendering the graderoster document
+        parse     parsing the response, including the people lookups
+        people    resolving the people on the graderoster with PWS
+        validate  validating the changes to the items
+
+    A chunked update renders the document while the request sends it, so
+    its render time is also part of the request time.  counts is a dict of
+    request_bytes, response_bytes, items, pws_lookups, cache_hits and
+    retries.  error is the exception raised by the call, if any.
+    """
+    def __init__(self, operation, sinks):
+        self.operation = operation
+        self.timings = {}
+        self.counts = {}
+        self.error = None
+        self._sinks = sinks
+
+    def add_time(self, phase, elapsed):
+        self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+
+    def add_count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def report(self):
+        for sink in self._sinks:
+            sink(self)
+
+
+def add_metrics_sink(sink):
+    """
+    Registers a callable, to be passed the CallMetrics of each call.
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + (sink,)
+
+
+def remove_metrics_sink(sink):
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s != sink)
+
+
+def start_metrics(operation):
+    """
+    Returns a CallMetrics for a new call, or None if no sink is registered.
+    """
+    if len(_sinks):
+        return CallMetrics(operation, _sinks)
+
+
+def call_with_metrics(operation, func, *args):
+    """
+    Returns func(*args, metrics), reporting the metrics of the call to the
+    registered sinks.
+    """
+    metrics = start_metrics(operation)
+    if metrics is None:
+        return func(*args, None)
+
+    try:
+        return func(*args, metrics)
+    except Exception as ex:
+        metrics.error = ex
+        raise
+    finally:
+        metrics.report()
+
+
+async def async_call_with_metrics(operation, func, *args):
+    """
+    Coroutine awaiting func(*args, metrics), as call_with_metrics does.
+    """
+    metrics = start_metrics(operation)
+    if metrics is None:
+        return await func(*args, None)
+
+    try:
+        return await func(*args, metrics)
+    except Exception as ex:
+        metrics.error = ex
+        raise
+    finally:
+        metrics.report()
+
+
+def timed(metrics, phase, func, /, *args, **kwargs):
+    """
+    Returns func(*args, **kwargs), adding its elapsed time to the phase of
+    metrics.
+    """
+    if metrics is None:
+        return func(*args, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        metrics.add_time(phase, time.perf_counter() - start)
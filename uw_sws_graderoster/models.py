@@ -2,12 +2,47 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from restclients_core import models
-from uw_pws import PWS
-from uw_sws.models import Section, Person, GradeSubmissionDelegate
-from jinja2 import Environment, FileSystemLoader
+from uw_sws_graderoster.people import PersonReference, get_people_by_regid
+from uw_sws_graderoster.metrics import timed
+from markupsafe import Markup, escape
+from lxml import etree
+from functools import lru_cache
+from itertools import chain
+from datetime import date, datetime
+import json
 import os
+import zlib
 
 nsmap = {"xhtml": "http://www.w3.org/1999/xhtml"}
+xhtml_a = "{{{}}}a".format(nsmap["xhtml"])
+xhtml_li = "{{{}}}li".format(nsmap["xhtml"])
+xhtml_ul = "{{{}}}ul".format(nsmap["xhtml"])
+
+_graderoster_xpath = etree.XPath(
+    ".//xhtml:div[@class='graderoster']", namespaces=nsmap)
+_section_id_xpath = etree.XPath(
+    "./xhtml:div/xhtml:a[@rel='section']/*[@class='section_id']",
+    namespaces=nsmap)
+_section_credits_xpath = etree.XPath(
+    "./xhtml:div/*[@class='section_credits']", namespaces=nsmap)
+_writing_credit_xpath = etree.XPath(
+    "./xhtml:div/*[@class='writing_credit_display']", namespaces=nsmap)
+_authorized_submitter_xpath = etree.XPath(
+    "./xhtml:div//*[@rel='authorized_grade_submitter']", namespaces=nsmap)
+_delegate_xpath = etree.XPath(
+    "./xhtml:div//*[@class='grade_submission_delegate']", namespaces=nsmap)
+_reg_id_xpath = etree.XPath(".//*[@class='reg_id']")
+_name_xpath = etree.XPath(".//*[@class='name']")
+_delegate_level_xpath = etree.XPath(".//*[@class='delegate_level']")
+_items_xpath = etree.XPath(
+    "./*[@class='graderoster_items']/*[@class='graderoster_item']")
+
+# The item fields set by GradeRoster.apply_grades
+GRADE_FIELDS = ("grade", "has_incomplete", "has_writing_credit",
+                "no_grade_now")
+
+SNAPSHOT_MAGIC = b"GRS"
+SNAPSHOT_VERSION = 2
 
 
 class GradeRosterItem(models.Model):
@@ -31,7 +66,7 @@ class GradeRosterItem(models.Model):
     date_graded = models.DateField(null=True)
     grade_document_id = models.CharField(max_length=100, null=True)
     grade_submitter_person = models.ForeignKey(
-        Person, related_name="grade_submitter", null=True)
+        "uw_sws.models.Person", related_name="grade_submitter", null=True)
     grade_submitter_source = models.CharField(max_length=8, null=True)
     status_code = models.CharField(max_length=3, null=True)
     status_message = models.CharField(max_length=500, null=True)
@@ -46,83 +81,286 @@ class GradeRosterItem(models.Model):
         return (self.student_uwregid == other.student_uwregid and
                 self.duplicate_code == other.duplicate_code)
 
+    def __hash__(self):
+        return hash((self.student_uwregid, self.duplicate_code))
+
     def __init__(self, *args, **kwargs):
         super(GradeRosterItem, self).__init__(*args, **kwargs)
-        self.grade_choices = []
+        self.grade_choices = ()
+        self._clean_values = None
+
+    def mark_clean(self):
+        """
+        Records the current field values as the unmodified state of the item.
+        """
+        self._clean_values = dict(self._field_values)
+
+    def changed_fields(self):
+        """
+        Returns the set of field names modified since the item was parsed,
+        or since mark_clean() was last called.  All fields of an item that
+        was never marked clean are considered changed.
+        """
+        fields = _item_fields()
+        if self._clean_values is None:
+            return set(name for (name, default) in fields.values())
+
+        # Compares the underlying field values, to avoid the cost of the
+        # field descriptors
+        changed = set()
+        for key, (name, default) in fields.items():
+            if (self._field_values.get(key, default) !=
+                    self._clean_values.get(key, default)):
+                changed.add(name)
+        return changed
+
+    def is_changed(self):
+        return len(self.changed_fields()) > 0
 
     @staticmethod
     def from_xhtml(tree, *args, **kwargs):
         gr_item = GradeRosterItem(*args, **kwargs)
-        for el in tree.xpath(".//xhtml:a[@rel='student']/*[@class='reg_id']",
-                             namespaces=nsmap):
-            gr_item.student_uwregid = el.text.strip()
-
-        for el in tree.xpath(".//xhtml:a[@rel='student']/*[@class='name']",
-                             namespaces=nsmap):
-            try:
-                (surname, first_name) = el.text.split(",", 1)
-                gr_item.student_first_name = first_name.strip()
-                gr_item.student_surname = surname.strip()
-            except ValueError:
-                pass
-
-        for el in tree.xpath(".//*[@class]"):
-            classname = el.get("class")
-            if classname == "duplicate_code" and el.text is not None:
-                duplicate_code = el.text.strip()
-                if len(duplicate_code):
-                    gr_item.duplicate_code = duplicate_code
-            elif classname == "section_id" and el.text is not None:
-                gr_item.section_id = el.text.strip()
-            elif classname == "student_former_name" and el.text is not None:
-                student_former_name = el.text.strip()
-                if len(student_former_name):
-                    gr_item.student_former_name = student_former_name
-            elif classname == "student_number":
-                gr_item.student_number = el.text.strip()
-            elif classname == "student_credits" and el.text is not None:
-                gr_item.student_credits = el.text.strip()
-            elif "date_withdrawn" in classname and el.text is not None:
-                gr_item.date_withdrawn = el.text.strip()
-            elif classname == "incomplete":
-                if el.get("checked", "") == "checked":
-                    gr_item.has_incomplete = True
-                if el.get("disabled", "") != "disabled":
-                    gr_item.allows_incomplete = True
-            elif classname == "writing_course":
-                if el.get("checked", "") == "checked":
-                    gr_item.has_writing_credit = True
-            elif classname == "auditor":
-                if el.get("checked", "") == "checked":
-                    gr_item.is_auditor = True
-            elif classname == "no_grade_now":
-                if el.get("checked", "") == "checked":
-                    gr_item.no_grade_now = True
-            elif classname == "grades":
-                if el.get("disabled", "") != "disabled":
-                    gr_item.allows_grade_change = True
-            elif classname == "grade":
-                grade = el.text.strip() if el.text is not None else ""
-                gr_item.grade_choices.append(grade)
-                if el.get("selected", "") == "selected":
-                    gr_item.grade = grade
-            elif classname == "grade_document_id" and el.text is not None:
-                gr_item.grade_document_id = el.text.strip()
-            elif "date_graded" in classname and el.text is not None:
-                gr_item.date_graded = el.text.strip()
-            elif classname == "grade_submitter_source" and el.text is not None:
-                gr_item.grade_submitter_source = el.text.strip()
-            elif classname == "code" and el.text is not None:
-                gr_item.status_code = el.text.strip()
-            elif classname == "message" and el.text is not None:
-                gr_item.status_message = el.text.strip()
+        _parse_item(tree, gr_item)
+        gr_item.mark_clean()
         return gr_item
 
 
+class _ItemValues(object):
+    """
+    The values parsed from a graderoster_item element, as plain attributes,
+    avoiding the cost of the GradeRosterItem field descriptors.
+    """
+    student_uwregid = None
+    duplicate_code = None
+
+    def __init__(self, section_id=None):
+        self.section_id = section_id
+        self.grade_choices = ()
+
+    student_label = GradeRosterItem.student_label
+
+    def mark_clean(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def _item_field_key(name):
+    field = GradeRosterItem.__dict__[name]
+    return field._key_for_instance(field)
+
+
+@lru_cache(maxsize=None)
+def _item_fields():
+    """
+    Returns a dict of (name, default) pairs for the GradeRosterItem fields,
+    keyed on the key under which the model stores each field value.
+    """
+    fields = {}
+    for name, field in GradeRosterItem.__dict__.items():
+        if isinstance(field, models.BaseField):
+            fields[field._key_for_instance(field)] = (name, field.default)
+    return fields
+
+
+def _parse_reg_id(gr_item, el):
+    rel = _person_rel(el)
+    if rel == "student":
+        gr_item.student_uwregid = el.text.strip()
+    elif rel == "grade_submitter_person":
+        return ("uwregid", el.text.strip())
+
+
+def _parse_name(gr_item, el):
+    rel = _person_rel(el)
+    if rel == "student":
+        try:
+            (surname, first_name) = el.text.split(",", 1)
+            gr_item.student_first_name = first_name.strip()
+            gr_item.student_surname = surname.strip()
+        except ValueError:
+            pass
+    elif rel == "grade_submitter_person":
+        return ("name", el.text)
+
+
+def _parse_duplicate_code(gr_item, el):
+    if el.text is not None:
+        duplicate_code = el.text.strip()
+        if len(duplicate_code):
+            gr_item.duplicate_code = duplicate_code
+
+
+def _parse_section_id(gr_item, el):
+    if el.text is not None:
+        gr_item.section_id = el.text.strip()
+
+
+def _parse_student_former_name(gr_item, el):
+    if el.text is not None:
+        student_former_name = el.text.strip()
+        if len(student_former_name):
+            gr_item.student_former_name = student_former_name
+
+
+def _parse_student_number(gr_item, el):
+    gr_item.student_number = el.text.strip()
+
+
+def _parse_student_credits(gr_item, el):
+    if el.text is not None:
+        gr_item.student_credits = el.text.strip()
+
+
+def _parse_date_withdrawn(gr_item, el):
+    if el.text is not None:
+        gr_item.date_withdrawn = el.text.strip()
+
+
+def _parse_incomplete(gr_item, el):
+    if el.get("checked", "") == "checked":
+        gr_item.has_incomplete = True
+    if el.get("disabled", "") != "disabled":
+        gr_item.allows_incomplete = True
+
+
+def _parse_writing_course(gr_item, el):
+    if el.get("checked", "") == "checked":
+        gr_item.has_writing_credit = True
+
+
+def _parse_auditor(gr_item, el):
+    if el.get("checked", "") == "checked":
+        gr_item.is_auditor = True
+
+
+def _parse_no_grade_now(gr_item, el):
+    if el.get("checked", "") == "checked":
+        gr_item.no_grade_now = True
+
+
+def _parse_grades(gr_item, el):
+    if el.get("disabled", "") != "disabled":
+        gr_item.allows_grade_change = True
+
+
+def _parse_grade(gr_item, el):
+    grade = el.text.strip() if el.text is not None else ""
+    gr_item.grade_choices.append(grade)
+    if el.get("selected", "") == "selected":
+        gr_item.grade = grade
+
+
+def _parse_grade_document_id(gr_item, el):
+    if el.text is not None:
+        gr_item.grade_document_id = el.text.strip()
+
+
+def _parse_date_graded(gr_item, el):
+    if el.text is not None:
+        gr_item.date_graded = el.text.strip()
+
+
+def _parse_grade_submitter_source(gr_item, el):
+    if el.text is not None:
+        gr_item.grade_submitter_source = el.text.strip()
+
+
+def _parse_status_code(gr_item, el):
+    if el.text is not None:
+        gr_item.status_code = el.text.strip()
+
+
+def _parse_status_message(gr_item, el):
+    if el.text is not None:
+        gr_item.status_message = el.text.strip()
+
+
+# Dispatch table for graderoster_item descendants, keyed on the class
+# attribute.  Parsers return a (key, value) pair when they find a grade
+# submitter attribute.
+_item_parsers = {
+    "reg_id": _parse_reg_id,
+    "name": _parse_name,
+    "duplicate_code": _parse_duplicate_code,
+    "section_id": _parse_section_id,
+    "student_former_name": _parse_student_former_name,
+    "student_number": _parse_student_number,
+    "student_credits": _parse_student_credits,
+    "incomplete": _parse_incomplete,
+    "writing_course": _parse_writing_course,
+    "auditor": _parse_auditor,
+    "no_grade_now": _parse_no_grade_now,
+    "grades": _parse_grades,
+    "grade": _parse_grade,
+    "grade_document_id": _parse_grade_document_id,
+    "grade_submitter_source": _parse_grade_submitter_source,
+    "code": _parse_status_code,
+    "message": _parse_status_message,
+}
+
+
+def _person_rel(el):
+    parent = el.getparent()
+    if parent is not None and parent.tag == xhtml_a:
+        return parent.get("rel")
+
+
+def _item_parser(classname):
+    parser = _item_parsers.get(classname)
+    if parser is None:
+        # Date classes carry a second "date" class
+        if "date_withdrawn" in classname:
+            parser = _parse_date_withdrawn
+        elif "date_graded" in classname:
+            parser = _parse_date_graded
+    return parser
+
+
+def _parse_item(tree, gr_item):
+    """
+    Populates gr_item from a single pass over the descendants of a
+    graderoster_item element, and returns a dict of the grade submitter
+    uwregid and name.
+    """
+    grade_submitter = {}
+    gr_item.grade_choices = []
+    for el in tree.iterdescendants(etree.Element):
+        classname = el.get("class")
+        if classname is None:
+            continue
+
+        parser = _item_parser(classname)
+        if parser is not None:
+            value = parser(gr_item, el)
+            if value is not None:
+                grade_submitter[value[0]] = value[1]
+
+    gr_item.grade_choices = _shared_grade_choices(
+        tuple(gr_item.grade_choices))
+    return grade_submitter
+
+
+@lru_cache(maxsize=1024)
+def _shared_grade_choices(grade_choices):
+    """
+    Returns the first-seen tuple equal to grade_choices, so that items with
+    the same choices share a single tuple.
+    """
+    return grade_choices
+
+
+def _split_name(name):
+    try:
+        (surname, first_name) = name.split(",", 1)
+        return (surname.strip(), first_name.strip())
+    except (AttributeError, ValueError):
+        return (None, None)
+
+
 class GradeRoster(models.Model):
-    section = models.ForeignKey(Section,
+    section = models.ForeignKey("uw_sws.models.Section",
                                 on_delete=models.PROTECT)
-    instructor = models.ForeignKey(Person,
+    instructor = models.ForeignKey("uw_sws.models.Person",
                                    on_delete=models.PROTECT)
     section_credits = models.FloatField()
     allows_writing_credit = models.NullBooleanField()
@@ -136,11 +374,170 @@ class GradeRoster(models.Model):
             sect=self.section.section_id,
             inst=self.instructor.uwregid)
 
-    def xhtml(self):
-        template_path = os.path.join(os.path.dirname(__file__), "templates/")
-        return Environment(
-            loader=FileSystemLoader(template_path), autoescape=True
-        ).get_template("graderoster.xhtml").render({"graderoster": self})
+    def xhtml(self, items=None):
+        """
+        Returns the XHTML document for the graderoster, including the
+        passed items in place of self.items.
+        """
+        return _get_template().render({
+            "graderoster": self,
+            "items": self.items if items is None else items})
+
+    def xhtml_chunks(self, items=None, chunk_size=64 * 1024):
+        """
+        Yields the XHTML document xhtml() returns, encoded as UTF-8 in chunks
+        of about chunk_size bytes.  The document is rendered as the chunks
+        are consumed, so it is never held in memory as a whole.
+        """
+        pending = []
+        size = 0
+        for text in _get_template().generate({
+                "graderoster": self,
+                "items": self.items if items is None else items}):
+            pending.append(text)
+            size += len(text)
+            if size >= chunk_size:
+                yield "".join(pending).encode("utf-8")
+                pending = []
+                size = 0
+        if len(pending):
+            yield "".join(pending).encode("utf-8")
+
+    def changed_items(self):
+        return [item for item in self.items if item.is_changed()]
+
+    def index(self):
+        """
+        Returns a GradeRosterIndex of the graderoster items.  The index
+        isn't updated when items are added to or removed from the roster.
+        """
+        return GradeRosterIndex(self.items)
+
+    def apply_grades(self, grades):
+        """
+        Applies a mapping of students to grades to the graderoster items.
+        Students are keyed on student_label(), regid or student number, as
+        GradeRosterIndex.find() matches them.  Each value is a grade, or a
+        dict of the GRADE_FIELDS values to set.  Returns a dict of:
+
+            applied    the list of updated items
+            unknown    the list of keys matching no item
+            ambiguous  a dict of the student labels matched by each key
+                       matching more than one item, such as the regid of a
+                       student with a duplicate enrollment
+
+        Nothing is applied for unknown or ambiguous keys.  Raises ValueError,
+        before applying any grades, for a value with other fields.
+        """
+        index = self.index()
+        matched = []
+        results = {"applied": [], "unknown": [], "ambiguous": {}}
+        for key, value in grades.items():
+            if not isinstance(value, dict):
+                value = {"grade": value}
+            for name in value:
+                if name not in GRADE_FIELDS:
+                    raise ValueError("Not a grade field: {}".format(name))
+
+            items = index.find(key)
+            if len(items) == 1:
+                matched.append((items[0], value))
+            elif len(items):
+                results["ambiguous"][key] = [
+                    item.student_label() for item in items]
+            else:
+                results["unknown"].append(key)
+
+        for (item, value) in matched:
+            for name, field_value in value.items():
+                setattr(item, name, field_value)
+            results["applied"].append(item)
+        return results
+
+    def merge_xhtml(self, tree, lazy_persons=False, metrics=None):
+        """
+        Applies the items of a graderoster document, such as the response
+        to an update, to the items of the graderoster, matched on
+        student_label().  Only the fields that differ are updated, and the
+        items are marked clean.  Items not on the graderoster are appended.
+        People already on the graderoster are reused.  Returns the list of
+        merged items.
+        """
+        parser = _GradeRosterParser(self, lazy_persons, metrics)
+        parser.people.update(self._people())
+
+        root = _graderoster_xpath(tree)[0]
+        parser.default_section_id = _section_id_xpath(root)[0].text.upper()
+
+        items = dict((item.student_label(), item) for item in self.items)
+        merged = []
+        for parsed in parser.parse_items(_items_xpath(root), _ItemValues):
+            new_values = vars(parsed)
+            gr_item = items.get(parsed.student_label())
+            if gr_item is None:
+                gr_item = GradeRosterItem()
+                self.items.append(gr_item)
+
+            values = gr_item._field_values
+            for key, (name, default) in _item_fields().items():
+                value = new_values.get(name, default)
+                if _differs(values.get(key, default), value):
+                    values[key] = value
+            gr_item.grade_choices = parsed.grade_choices
+            gr_item.mark_clean()
+            merged.append(gr_item)
+        return merged
+
+    def resolve_people(self, metrics=None):
+        """
+        Replaces the PersonReference stand-ins for the people on the
+        graderoster, from a graderoster parsed with lazy_persons, with PWS
+        Person models.  The unresolved people are resolved together.
+        """
+        references = [person for person in self._people().values()
+                      if isinstance(person, PersonReference)]
+        if not len(references):
+            return
+
+        people = timed(metrics, "people", get_people_by_regid, [
+            person.uwregid for person in references
+            if not person.is_resolved()], None, metrics)
+        people.update((person.uwregid, person.resolve())
+                      for person in references if person.is_resolved())
+
+        def resolved(person):
+            if isinstance(person, PersonReference):
+                return people[person.uwregid]
+            return person
+
+        self.authorized_grade_submitters = [
+            resolved(person) for person in self.authorized_grade_submitters]
+        for delegate in self.grade_submission_delegates:
+            delegate.person = resolved(delegate.person)
+
+        # The clean values are replaced too, so the items aren't changed
+        key = _item_field_key("grade_submitter_person")
+        for item in self.items:
+            for values in (item._field_values, item._clean_values):
+                if values is not None and key in values:
+                    values[key] = resolved(values[key])
+
+    def _people(self):
+        """
+        Returns a dict of the people on the graderoster, keyed by regid.
+        """
+        people = dict((person.uwregid, person)
+                      for person in self.authorized_grade_submitters)
+        people.update((delegate.person.uwregid, delegate.person)
+                      for delegate in self.grade_submission_delegates)
+
+        key = _item_field_key("grade_submitter_person")
+        for item in self.items:
+            person = item._field_values.get(key)
+            if person is not None:
+                people[person.uwregid] = person
+        people[self.instructor.uwregid] = self.instructor
+        return people
 
     def __init__(self, *args, **kwargs):
         super(GradeRoster, self).__init__(*args, **kwargs)
@@ -148,68 +545,467 @@ class GradeRoster(models.Model):
         self.grade_submission_delegates = []
         self.items = []
 
+    @property
+    def items(self):
+        if self._pending_items is not None:
+            pending, self._pending_items = self._pending_items, None
+            self._items.extend(pending)
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        # Any iterable other than a list is consumed lazily
+        if isinstance(items, list):
+            self._items, self._pending_items = items, None
+        else:
+            self._items, self._pending_items = [], iter(items)
+
+    def iter_items(self):
+        """
+        Returns an iterator over the graderoster items.  Items that have not
+        yet been parsed are handed to the iterator, and are not retained in
+        self.items.
+        """
+        pending, self._pending_items = self._pending_items, None
+        return chain(self._items, pending or ())
+
     @staticmethod
-    def from_xhtml(tree, *args, **kwargs):
-        pws = PWS()
+    def from_xhtml(tree, *args, lazy_persons=False, metrics=None, **kwargs):
+        gr = GradeRoster(*args, **kwargs)
+        parser = _GradeRosterParser(gr, lazy_persons, metrics)
+
+        root = _graderoster_xpath(tree)[0]
+        parser.parse_header(root)
+        gr.items = parser.parse_items(_items_xpath(root))
+        return gr
+
+    def to_snapshot(self):
+        """
+        Returns the graderoster as a compact, versioned bytes snapshot, for
+        restoring with from_snapshot.  The snapshot is zlib compressed JSON,
+        so it can be shared between processes and Python versions.  The
+        section and instructor are not included, and other people are
+        stored by regid and name.  Raises ValueError for a field value that
+        can't be stored.
+        """
+        people = _SnapshotPeople(self.instructor)
+        names = [name for (name, default) in _item_fields().values()]
+        keys = list(_item_fields().keys())
+
+        columns = [[] for key in keys]
+        choices = {}
+        grade_choices = []
+        for item in self.items:
+            values = item._field_values
+            for key, column in zip(keys, columns):
+                column.append(values.get(key))
+            grade_choices.append(choices.setdefault(
+                tuple(item.grade_choices), len(choices)))
+
+        submitter = names.index("grade_submitter_person")
+        columns[submitter] = [people.index(person)
+                              for person in columns[submitter]]
+
+        payload = (
+            self.graderoster_label(),
+            self.section_credits,
+            self.allows_writing_credit,
+            [people.index(person)
+             for person in self.authorized_grade_submitters],
+            [(people.index(delegate.person), delegate.delegate_level)
+             for delegate in self.grade_submission_delegates],
+            people.persons,
+            list(choices.keys()),
+            names,
+            columns,
+            grade_choices)
+        return (SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]) +
+                zlib.compress(json.dumps(
+                    payload, separators=(",", ":"),
+                    default=_snapshot_value).encode("utf-8")))
+
+    @staticmethod
+    def from_snapshot(data, *args, **kwargs):
+        """
+        Returns a GradeRoster for a snapshot from to_snapshot, for the
+        passed Section model and instructor Person.  The people on the
+        roster are PersonReference models.  The items are marked clean.
+        Raises ValueError for a snapshot in another version, of another
+        graderoster, or that is truncated or invalid.
+        """
+        header = len(SNAPSHOT_MAGIC)
+        if data[:header] != SNAPSHOT_MAGIC:
+            raise ValueError("Not a graderoster snapshot")
+        if len(data) <= header:
+            raise ValueError("Truncated graderoster snapshot")
+        if data[header] != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported graderoster snapshot version: {}"
+                             .format(data[header]))
+
+        try:
+            (label, section_credits, allows_writing_credit, submitters,
+             delegates, persons, choices, names, columns,
+             grade_choices) = json.loads(
+                zlib.decompress(data[header + 1:]),
+                object_hook=_snapshot_object)
+        except (zlib.error, ValueError, TypeError) as ex:
+            raise ValueError("Invalid graderoster snapshot: {}".format(ex))
+
         gr = GradeRoster(*args, **kwargs)
+        if gr.graderoster_label() != label:
+            raise ValueError("Snapshot of another graderoster: {}".format(
+                label))
+
+        gr.section_credits = section_credits
+        gr.allows_writing_credit = allows_writing_credit
 
-        people = {gr.instructor.uwregid: gr.instructor}
+        people = [gr.instructor if reg_id == gr.instructor.uwregid else
+                  PersonReference(reg_id, surname=surname,
+                                  first_name=first_name)
+                  for (reg_id, surname, first_name) in persons]
+        people.append(None)  # The index -1
 
-        root = tree.xpath(
-            ".//xhtml:div[@class='graderoster']", namespaces=nsmap)[0]
+        gr.authorized_grade_submitters = [people[idx] for idx in submitters]
+        GradeSubmissionDelegate = _sws_models().GradeSubmissionDelegate
+        gr.grade_submission_delegates = [
+            GradeSubmissionDelegate(person=people[idx], delegate_level=level)
+            for (idx, level) in delegates]
 
-        default_section_id = None
-        xpath = "./xhtml:div/xhtml:a[@rel='section']/*[@class='section_id']"
-        el = root.xpath(xpath, namespaces=nsmap)[0]
-        default_section_id = el.text.upper()
+        # Fields unknown to this version of the model are skipped
+        fields = dict((name, key) for key, (name, default)
+                      in _item_fields().items())
+        keys = [fields.get(name) for name in names]
+        submitter = names.index("grade_submitter_person")
+        columns[submitter] = [people[idx] for idx in columns[submitter]]
+        choices = [_shared_grade_choices(tuple(c)) for c in choices]
 
-        el = root.xpath(
-            "./xhtml:div/*[@class='section_credits']", namespaces=nsmap)[0]
+        items = []
+        for (row, choice) in zip(zip(*columns), grade_choices):
+            gr_item = GradeRosterItem()
+            gr_item._field_values.update(
+                (key, value) for (key, value) in zip(keys, row)
+                if value is not None and key is not None)
+            gr_item.grade_choices = choices[choice]
+            gr_item.mark_clean()
+            items.append(gr_item)
+        gr.items = items
+        return gr
+
+    @staticmethod
+    def from_xhtml_stream(chunks, *args, lazy_persons=False, metrics=None,
+                          **kwargs):
+        """
+        Returns a GradeRoster for an iterable of XHTML document chunks.
+        The items are parsed lazily, each one as its graderoster_item
+        element is closed, and the processed elements are discarded.
+        Only the parsing of the graderoster header is added to metrics.
+        Raises ValueError if the document has no graderoster element.
+        """
+        gr = GradeRoster(*args, **kwargs)
+        parser = _GradeRosterParser(gr, lazy_persons, metrics)
+
+        events = _iter_xhtml_events(chunks)
+        document = items_el = None
+        for event, el in events:
+            if event == "close":
+                document = el
+            elif (event == "start" and
+                    el.get("class") == "graderoster_items" and
+                    el.getparent().get("class") == "graderoster"):
+                items_el = el
+                break
+
+        if items_el is None:
+            # A roster without an items list, parsed from the document root
+            roots = _graderoster_xpath(document)
+            if not len(roots):
+                raise ValueError("No graderoster element")
+            parser.parse_header(roots[0])
+        else:
+            parser.parse_header(items_el.getparent())
+            parser.metrics = None
+            gr.items = _iter_stream_items(parser, items_el, events)
+        return gr
+
+
+class GradeRosterIndex(object):
+    """
+    An index of graderoster items on student_label(), student_uwregid,
+    student_number and linked section_id.  A student with a duplicate
+    enrollment has an item for each, so lookups other than by label return
+    lists of items.
+    """
+    def __init__(self, items):
+        self.by_label = {}
+        self.by_regid = {}
+        self.by_student_number = {}
+        self.by_section_id = {}
+        for item in items:
+            self.by_label[item.student_label()] = item
+            self.by_regid.setdefault(item.student_uwregid, []).append(item)
+            self.by_student_number.setdefault(
+                _student_number_key(item.student_number), []).append(item)
+            self.by_section_id.setdefault(
+                _section_id_key(item.section_id), []).append(item)
+
+    def find(self, key):
+        """
+        Returns the list of items for a student label, which includes the
+        duplicate code of a duplicate enrollment, a regid, or a student
+        number.  A regid or student number matches each enrollment of the
+        student, and a regid with a trailing comma matches the enrollment
+        without a duplicate code.
+        """
+        if isinstance(key, int):
+            return self._find_student_number(key)
+
+        key = key.strip().upper()
+        if "," in key:
+            # A trailing comma is the label of a student's enrollment
+            # without a duplicate code
+            item = self.by_label.get(key.rstrip(","))
+            return [] if item is None else [item]
+        if key in self.by_regid:
+            return list(self.by_regid[key])
+        if key.isdigit():
+            return self._find_student_number(key)
+        return []
+
+    def _find_student_number(self, student_number):
+        return list(self.by_student_number.get(
+            _student_number_key(student_number), ()))
+
+    def items_for_section(self, section_id):
+        """
+        Returns the list of items enrolled in the linked section_id.
+        """
+        return list(self.by_section_id.get(_section_id_key(section_id), ()))
+
+
+def _student_number_key(student_number):
+    # Parsed student numbers are strings
+    try:
+        return int(student_number)
+    except (TypeError, ValueError):
+        return student_number
+
+
+def _section_id_key(section_id):
+    # Section ids are matched without case
+    return section_id.upper() if section_id is not None else None
+
+
+class _GradeRosterParser(object):
+    """
+    Builds the GradeRoster parts from graderoster elements.  The people
+    referenced by each part are collected and resolved together, or
+    with lazy_persons, represented by PersonReference stand-ins.
+    """
+    def __init__(self, graderoster, lazy_persons=False, metrics=None):
+        self.graderoster = graderoster
+        self.lazy_persons = lazy_persons
+        self.metrics = metrics
+        self.default_section_id = None
+        self.people = {
+            graderoster.instructor.uwregid: graderoster.instructor}
+
+    def resolve_people(self, persons):
+        """
+        Adds the people for a list of (reg_id, name) pairs.
+        """
+        missing = [(reg_id, name) for (reg_id, name) in persons
+                   if reg_id not in self.people]
+        if self.lazy_persons:
+            for (reg_id, name) in missing:
+                (surname, first_name) = _split_name(name)
+                self.people[reg_id] = PersonReference(
+                    reg_id, surname=surname, first_name=first_name)
+        else:
+            reg_ids = [reg_id for (reg_id, name) in missing]
+            self.people.update(timed(
+                self.metrics, "people", get_people_by_regid, reg_ids, None,
+                self.metrics))
+
+    def parse_header(self, root):
+        gr = self.graderoster
+
+        el = _section_id_xpath(root)[0]
+        self.default_section_id = el.text.upper()
+
+        el = _section_credits_xpath(root)[0]
         if el.text is not None:
             gr.section_credits = el.text.strip()
 
-        el = root.xpath(
-            "./xhtml:div/*[@class='writing_credit_display']",
-            namespaces=nsmap)[0]
+        el = _writing_credit_xpath(root)[0]
         if el.get("checked", "") == "checked":
             gr.allows_writing_credit = True
 
-        for el in root.xpath(
-                "./xhtml:div//*[@rel='authorized_grade_submitter']",
-                namespaces=nsmap):
-            reg_id = el.xpath(".//*[@class='reg_id']")[0].text.strip()
-            if reg_id not in people:
-                people[reg_id] = pws.get_person_by_regid(reg_id)
-            gr.authorized_grade_submitters.append(people[reg_id])
-
-        for el in root.xpath(
-                "./xhtml:div//*[@class='grade_submission_delegate']",
-                namespaces=nsmap):
-            reg_id = el.xpath(".//*[@class='reg_id']")[0].text.strip()
-            node = el.xpath(".//*[@class='delegate_level']")[0]
-            delegate_level = node.text.strip()
-            if reg_id not in people:
-                people[reg_id] = pws.get_person_by_regid(reg_id)
-            delegate = GradeSubmissionDelegate(person=people[reg_id],
-                                               delegate_level=delegate_level)
+        submitters = []
+        for el in _authorized_submitter_xpath(root):
+            submitters.append(_parse_person(el))
+
+        delegates = []
+        for el in _delegate_xpath(root):
+            node = _delegate_level_xpath(el)[0]
+            delegates.append((_parse_person(el), node.text.strip()))
+
+        self.resolve_people(
+            submitters + [person for (person, level) in delegates])
+
+        for (reg_id, name) in submitters:
+            gr.authorized_grade_submitters.append(self.people[reg_id])
+
+        for ((reg_id, name), delegate_level) in delegates:
+            delegate = _sws_models().GradeSubmissionDelegate(
+                person=self.people[reg_id], delegate_level=delegate_level)
             gr.grade_submission_delegates.append(delegate)
 
-        xpath = "./*[@class='graderoster_items']/*[@class='graderoster_item']"
-        for item in root.xpath(xpath):
-            grade_submitter_person = None
-            xpath = (".//xhtml:a[@rel='grade_submitter_person']/"
-                     "*[@class='reg_id']")
-            for el in item.xpath(xpath, namespaces=nsmap):
-                reg_id = el.text.strip()
-                if reg_id not in people:
-                    people[reg_id] = pws.get_person_by_regid(reg_id)
-                grade_submitter_person = people[reg_id]
-
-            gr_item = GradeRosterItem.from_xhtml(
-                item, section_id=default_section_id,
-                grade_submitter_person=grade_submitter_person)
-            gr.items.append(gr_item)
-        return gr
+    def parse_items(self, elements, item_class=GradeRosterItem):
+        items = []
+        submitters = []
+        for el in elements:
+            gr_item = item_class(section_id=self.default_section_id)
+            grade_submitter = _parse_item(el, gr_item)
+            if "uwregid" in grade_submitter:
+                submitters.append((gr_item, grade_submitter["uwregid"],
+                                   grade_submitter.get("name")))
+            items.append(gr_item)
+
+        self.resolve_people(
+            [(reg_id, name) for (gr_item, reg_id, name) in submitters])
+
+        for (gr_item, reg_id, name) in submitters:
+            gr_item.grade_submitter_person = self.people[reg_id]
+
+        for gr_item in items:
+            gr_item.mark_clean()
+        return items
+
+    def parse_item(self, el):
+        return self.parse_items([el])[0]
+
+
+def _differs(value, other):
+    # Person models can't be compared with None
+    if value is None or other is None:
+        return value is not other
+    return value != other
+
+
+def _snapshot_value(value):
+    # Encodes the field values that JSON has no type for
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise ValueError("Can't snapshot a {} value".format(
+        type(value).__name__))
+
+
+def _snapshot_object(obj):
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+class _SnapshotPeople(object):
+    """
+    The table of people in a snapshot, as (regid, surname, first_name)
+    tuples.  A missing person has the index -1.
+    """
+    def __init__(self, instructor):
+        self.persons = []
+        self._indexes = {}
+        self.index(instructor)
+
+    def index(self, person):
+        if person is None:
+            return -1
+
+        reg_id = person.uwregid
+        idx = self._indexes.get(reg_id)
+        if idx is None:
+            if (isinstance(person, PersonReference) and
+                    not person.is_resolved()):
+                # Avoids resolving the person for the names
+                names = vars(person)
+            else:
+                names = {"surname": getattr(person, "surname", None),
+                         "first_name": getattr(person, "first_name", None)}
+            idx = self._indexes[reg_id] = len(self.persons)
+            self.persons.append((reg_id, names.get("surname"),
+                                 names.get("first_name")))
+        return idx
+
+
+def _parse_person(el):
+    reg_id = _reg_id_xpath(el)[0].text.strip()
+    names = _name_xpath(el)
+    return (reg_id, names[0].text if len(names) else None)
+
+
+def _iter_xhtml_events(chunks):
+    # The ul and li events, followed by a "close" event for the root element
+    parser = etree.XMLPullParser(events=("start", "end"),
+                                 tag=(xhtml_ul, xhtml_li))
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    root = parser.close()
+    yield from parser.read_events()
+    yield "close", root
+
+
+def _iter_stream_items(parser, items_el, events):
+    for event, el in events:
+        if (event == "end" and el.getparent() is items_el and
+                el.get("class") == "graderoster_item"):
+            gr_item = parser.parse_item(el)
+
+            # Release the parsed elements
+            el.clear()
+            while el.getprevious() is not None:
+                del items_el[0]
+            yield gr_item
+
+
+def _sws_models():
+    # uw_sws loads PWS and the DAO stack, so is imported when first needed
+    from uw_sws import models
+    return models
+
+
+_template = None
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        from jinja2 import Environment, FileSystemLoader
+
+        template_path = os.path.join(os.path.dirname(__file__), "templates/")
+        env = Environment(
+            loader=FileSystemLoader(template_path), autoescape=True)
+        env.filters["grade_options"] = _grade_options
+        _template = env.get_template("graderoster.xhtml")
+    return _template
+
+
+def _grade_options(item):
+    return _render_grade_options(tuple(item.grade_choices), item.grade)
+
+
+@lru_cache(maxsize=256)
+def _render_grade_options(grade_choices, selected):
+    options = []
+    for grade in grade_choices:
+        options.append(
+            '<option class="grade" value="{0}"{1}>{0}</option>'.format(
+                escape(grade),
+                ' selected="selected"' if grade == selected else ""))
+    return Markup("".join(options))
 
 
 class GradingScale(models.Model):
@@ -250,9 +1046,7 @@ class GradingScale(models.Model):
     }
 
     def sorted_scale(self, grade_scale):
-        return sorted([str(x).upper() for x in grade_scale],
-                      key=lambda x: self.GRADE_ORDER.get(x, x),
-                      reverse=True)
+        return list(_sorted_scale(tuple(str(x).upper() for x in grade_scale)))
 
     def is_undergraduate_scale(self, grade_scale):
         return self._is_scale(grade_scale, self.UNDERGRADUATE_SCALE)
@@ -270,9 +1064,47 @@ class GradingScale(models.Model):
         return self._is_scale(grade_scale, self.HIGHPASSFAIL_SCALE)
 
     def is_any_scale(self, grade_scale):
-        for scale in self.GRADE_SCALES.keys():
-            if self._is_scale(grade_scale, scale):
-                return scale
+        grade_scale = [str(x).upper() for x in grade_scale]
+        scale = _grade_scale_index().get(frozenset(grade_scale))
+        # The scales have no repeated grades, so matching the set and the
+        # length matches the scale exactly
+        if (scale is not None and
+                len(grade_scale) == len(self.GRADE_SCALES[scale])):
+            return scale
+
+    def classify(self, grade_scales):
+        """
+        Returns a list of the scale of each of the passed grade scales, or
+        None for those matching no scale.  Grade scales that are the same
+        object, such as the grade_choices shared by GradeRosterItems, are
+        classified once.
+        """
+        scales = {}
+        classified = []
+        for grade_scale in grade_scales:
+            key = id(grade_scale)
+            if key not in scales:
+                # Holds a reference, so the id isn't reused in the batch
+                scales[key] = (self.is_any_scale(grade_scale), grade_scale)
+            classified.append(scales[key][0])
+        return classified
 
     def _is_scale(self, grade_scale, scale):
-        return self.sorted_scale(grade_scale) == self.GRADE_SCALES[scale]
+        return self.is_any_scale(grade_scale) == scale
+
+
+@lru_cache(maxsize=None)
+def _grade_scale_index():
+    """
+    Returns a dict of the GradingScale scales, keyed on the set of grades in
+    each scale.
+    """
+    return dict((frozenset(grades), scale)
+                for scale, grades in GradingScale.GRADE_SCALES.items())
+
+
+@lru_cache(maxsize=256)
+def _sorted_scale(grade_scale):
+    return tuple(sorted(
+        grade_scale, key=lambda x: GradingScale.GRADE_ORDER.get(x, x),
+        reverse=True))
@@ -0,0 +1,151 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from commonconf import settings
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from threading import Lock
+import time
+
+
+class PersonCache(object):
+    """
+    A thread-safe LRU cache of PWS Person models, keyed by regid.  Entries
+    expire ttl seconds after they are added.
+    """
+    def __init__(self, max_size=1000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._people = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, reg_id):
+        with self._lock:
+            entry = self._people.get(reg_id)
+            if entry is not None:
+                (expires, person) = entry
+                if expires > time.monotonic():
+                    self._people.move_to_end(reg_id)
+                    self.hits += 1
+                    return person
+                del self._people[reg_id]
+            self.misses += 1
+
+    def set(self, reg_id, person):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._people[reg_id] = (time.monotonic() + self.ttl, person)
+            self._people.move_to_end(reg_id)
+            while len(self._people) > self.max_size:
+                self._people.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._people.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "size": len(self._people)}
+
+
+_person_cache = None
+_person_cache_lock = Lock()
+
+
+def get_person_cache():
+    """
+    Returns the process-wide PersonCache, configured by the
+    GRADEROSTER_PERSON_CACHE_SIZE and GRADEROSTER_PERSON_CACHE_TTL settings.
+    """
+    global _person_cache
+    with _person_cache_lock:
+        if _person_cache is None:
+            _person_cache = PersonCache(
+                max_size=int(getattr(
+                    settings, "GRADEROSTER_PERSON_CACHE_SIZE", 1000)),
+                ttl=float(getattr(
+                    settings, "GRADEROSTER_PERSON_CACHE_TTL", 300)))
+        return _person_cache
+
+
+def get_people_by_regid(reg_ids, max_workers=None, metrics=None):
+    """
+    Returns a dict of PWS Person models for the passed regids.  Cached
+    people are returned directly, and the others are resolved concurrently
+    on a pool of at most max_workers threads.  The number of PWS requests
+    is added to the pws_lookups count of metrics.
+    """
+    cache = get_person_cache()
+    people = {}
+    missing = []
+    for reg_id in reg_ids:
+        if reg_id in people or reg_id in missing:
+            continue
+
+        person = cache.get(reg_id)
+        if person is None:
+            missing.append(reg_id)
+        else:
+            people[reg_id] = person
+
+    if metrics is not None:
+        metrics.add_count("pws_lookups", len(missing))
+
+    if len(missing) > 1:
+        if max_workers is None:
+            max_workers = int(getattr(
+                settings, "GRADEROSTER_PWS_MAX_WORKERS", 8))
+        with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(missing))) as executor:
+            resolved = list(executor.map(_get_person, missing))
+    else:
+        resolved = [_get_person(reg_id) for reg_id in missing]
+
+    for reg_id, person in zip(missing, resolved):
+        cache.set(reg_id, person)
+        people[reg_id] = person
+    return people
+
+
+def _get_person(reg_id):
+    # PWS is imported when first needed, to keep the package import light
+    from uw_pws import PWS
+    return PWS().get_person_by_regid(reg_id)
+
+
+class PersonReference(object):
+    """
+    A stand-in for a PWS Person model, known by regid.  The uwregid, and
+    the surname and first_name published in the graderoster document, are
+    available directly.  Reading any other attribute resolves the person
+    through PWS.
+    """
+    def __init__(self, uwregid, surname=None, first_name=None):
+        self.uwregid = uwregid
+        if surname is not None:
+            self.surname = surname
+        if first_name is not None:
+            self.first_name = first_name
+        self._person = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def is_resolved(self):
+        return self._person is not None
+
+    def resolve(self):
+        if self._person is None:
+            self._person = get_people_by_regid(
+                [self.uwregid])[self.uwregid]
+        return self._person
@@ -0,0 +1,209 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Retries with jittered backoff, and a process-wide circuit breaker, for
+graderoster requests to SWS.  Both are off by default, and are enabled
+with these settings:
+
+    GRADEROSTER_RETRY_ATTEMPTS           attempts for each request
+    GRADEROSTER_RETRY_BACKOFF            base delay in seconds
+    GRADEROSTER_RETRY_MAX_BACKOFF        maximum delay in seconds
+    GRADEROSTER_CIRCUIT_FAILURE_THRESHOLD  consecutive failures that open
+                                         the circuit
+    GRADEROSTER_CIRCUIT_RESET_TIMEOUT    seconds before an open circuit
+                                         lets a request through
+"""
+
+from restclients_core.exceptions import DataFailureException
+from commonconf import settings
+from threading import Lock
+from time import monotonic, sleep
+import random
+
+
+class CircuitOpenException(DataFailureException):
+    """
+    Raised in place of a request to SWS while the circuit is open.
+    """
+    def __init__(self, url):
+        super(CircuitOpenException, self).__init__(
+            url, 503, "SWS is unavailable, the request was not sent")
+
+
+class RetryPolicy(object):
+    """
+    Retries requests that fail with a retry_statuses status, or that fail
+    to connect, up to a total of max_attempts.  The delay before each retry
+    is chosen at random up to an exponentially increasing limit, or is the
+    response's Retry-After, if longer.
+    """
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+    def __init__(self, max_attempts=1, backoff=0.5, max_backoff=8.0,
+                 retry_statuses=RETRY_STATUSES, seed=None):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self._random = random.Random(seed)
+
+    @staticmethod
+    def from_settings():
+        return RetryPolicy(
+            max_attempts=int(getattr(
+                settings, "GRADEROSTER_RETRY_ATTEMPTS", 1)),
+            backoff=float(getattr(
+                settings, "GRADEROSTER_RETRY_BACKOFF", 0.5)),
+            max_backoff=float(getattr(
+                settings, "GRADEROSTER_RETRY_MAX_BACKOFF", 8.0)))
+
+    def is_retryable(self, status):
+        # Status 0 is a connection failure or timeout
+        return status == 0 or status in self.retry_statuses
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Returns the seconds to wait before the retry following attempt,
+        counting from 0.
+        """
+        delay = self._random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        try:
+            delay = max(delay, min(self.max_backoff, float(retry_after)))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+
+class CircuitBreaker(object):
+    """
+    Fails requests fast once failure_threshold requests in a row have
+    failed.  After reset_timeout seconds, requests are let through again,
+    and the circuit closes when one succeeds.  A failure_threshold of 0
+    disables the breaker.
+    """
+    def __init__(self, failure_threshold=0, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = Lock()
+
+    @staticmethod
+    def from_settings():
+        return CircuitBreaker(
+            failure_threshold=int(getattr(
+                settings, "GRADEROSTER_CIRCUIT_FAILURE_THRESHOLD", 0)),
+            reset_timeout=float(getattr(
+                settings, "GRADEROSTER_CIRCUIT_RESET_TIMEOUT", 30)))
+
+    def is_open(self):
+        with self._lock:
+            return (self.opened_at is not None and
+                    monotonic() < self.opened_at + self.reset_timeout)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        if self.failure_threshold <= 0:
+            return
+
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = monotonic()
+
+
+_retry_policy = None
+_circuit_breaker = None
+_lock = Lock()
+
+
+def get_retry_policy():
+    global _retry_policy
+    with _lock:
+        if _retry_policy is None:
+            _retry_policy = RetryPolicy.from_settings()
+        return _retry_policy
+
+
+def set_retry_policy(policy):
+    """
+    Replaces the process-wide retry policy.  Passing None reverts to the
+    GRADEROSTER_RETRY settings.
+    """
+    global _retry_policy
+    with _lock:
+        _retry_policy = policy
+
+
+def get_circuit_breaker():
+    global _circuit_breaker
+    with _lock:
+        if _circuit_breaker is None:
+            _circuit_breaker = CircuitBreaker.from_settings()
+        return _circuit_breaker
+
+
+def set_circuit_breaker(breaker):
+    """
+    Replaces the process-wide circuit breaker.  Passing None reverts to the
+    GRADEROSTER_CIRCUIT settings.
+    """
+    global _circuit_breaker
+    with _lock:
+        _circuit_breaker = breaker
+
+
+def call_with_retry(url, request, metrics=None):
+    """
+    Returns the response of request(), retried as the retry policy allows.
+    The response of the last attempt is returned, and a connection failure
+    on the last attempt is raised.  request is called for each attempt, so
+    it must build any request body anew.
+    """
+    policy = get_retry_policy()
+    breaker = get_circuit_breaker()
+
+    attempt = 0
+    while True:
+        if breaker.is_open():
+            raise CircuitOpenException(url)
+
+        response = None
+        try:
+            response = request()
+            status = response.status
+        except DataFailureException as ex:
+            if ex.status != 0:
+                raise
+            error, status = ex, 0
+
+        if not policy.is_retryable(status):
+            breaker.record_success()
+            return response
+
+        breaker.record_failure()
+        if attempt + 1 >= policy.max_attempts:
+            if response is None:
+                raise error
+            return response
+
+        retry_after = None
+        if response is not None and response.headers:
+            retry_after = _get_header(response, "Retry-After")
+        sleep(policy.delay(attempt, retry_after))
+
+        attempt += 1
+        if metrics is not None:
+            metrics.add_count("retries")
+
+
+def _get_header(response, name):
+    for key, value in response.headers.items():
+        if key.lower() == name.lower():
+            return value
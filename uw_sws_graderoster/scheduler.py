@@ -0,0 +1,196 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Coalescing of graderoster submissions.  When several graders save the same
+roster at about the same time, their changes are gathered for a short
+window and sent together, in place of an update request for each save.
+The window is set with GRADEROSTER_SUBMISSION_WINDOW, in seconds.
+"""
+
+from uw_sws_graderoster import update_graderoster, _graderoster_url
+from uw_sws_graderoster.models import GradeRoster, GradeRosterItem
+from uw_sws_graderoster.validation import (
+    validate_graderoster, InvalidGradeRosterException)
+from commonconf import settings
+from concurrent.futures import Future
+from threading import Lock, Thread
+from time import sleep
+
+
+class _Submission(object):
+    def __init__(self, graderoster, requestor, items):
+        self.graderoster = graderoster
+        self.requestor = requestor
+        self.items = items
+        self.future = Future()
+
+
+class SubmissionScheduler(object):
+    """
+    Coalesces the submissions of changes to a graderoster, keyed on
+    graderoster_label().  The first submission to a roster opens a batch,
+    and waits window seconds for others to join it before the batch is
+    sent.  The changed fields of the items are merged in the order they
+    were submitted, so a later change to a field of a student replaces an
+    earlier one.
+
+    SWS records the X-UW-Act-as requestor as the submitter of each grade,
+    so saves by different graders are not merged: the submissions of each
+    requestor in a batch are sent as a separate update request, and only
+    repeated saves by the same grader are coalesced.  The requests of a
+    batch are sent concurrently, each on its own thread.
+    """
+    def __init__(self, window=0.5, lazy_persons=False, chunked=False,
+                 validate=False):
+        self.window = window
+        self.lazy_persons = lazy_persons
+        self.chunked = chunked
+        self.validate = validate
+        self._batches = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def from_settings():
+        return SubmissionScheduler(window=float(getattr(
+            settings, "GRADEROSTER_SUBMISSION_WINDOW", 0.5)))
+
+    def submit(self, graderoster, requestor, items=None):
+        """
+        Submits the passed items of the graderoster, or its changed items,
+        and blocks until the batch they join has been sent.  Returns a dict
+        of the status_code, status_message and grade returned by SWS for
+        each submitted item, keyed on student_label().  The exception
+        raised by the update request is raised to each of its submitters.
+
+        If the scheduler validates, invalid changes raise an
+        InvalidGradeRosterException before joining a batch.
+        """
+        if items is None:
+            items = graderoster.changed_items()
+        if not len(items):
+            return {}
+
+        label = graderoster.graderoster_label()
+        if self.validate:
+            errors = validate_graderoster(graderoster, items)
+            if len(errors):
+                raise InvalidGradeRosterException(
+                    _graderoster_url(label), errors)
+
+        submission = _Submission(graderoster, requestor, items)
+        with self._lock:
+            batch = self._batches.get(label)
+            is_first = batch is None
+            if is_first:
+                batch = self._batches[label] = []
+            batch.append(submission)
+
+        if is_first:
+            sleep(self.window)
+            with self._lock:
+                del self._batches[label]
+            self._send(batch)
+
+        return submission.future.result()
+
+    def _send(self, batch):
+        requests = {}
+        for submission in batch:
+            requests.setdefault(
+                submission.requestor.uwregid, []).append(submission)
+
+        # The requests of the other requestors are sent on threads of their
+        # own, so a slow request doesn't delay the first submitter's
+        groups = list(requests.values())
+        for submissions in groups[1:]:
+            Thread(target=self._send_requests, args=(submissions,),
+                   daemon=True).start()
+        self._send_requests(groups[0])
+
+    def _send_requests(self, submissions):
+        try:
+            returned = self._update(submissions)
+        except Exception as ex:
+            for submission in submissions:
+                submission.future.set_exception(ex)
+            return
+
+        for submission in submissions:
+            submission.future.set_result(dict(
+                (item.student_label(), _item_result(
+                    returned.get(item.student_label())))
+                for item in submission.items))
+
+    def _update(self, submissions):
+        """
+        Sends the merged items of the submissions as one update, and
+        returns a dict of the returned items, keyed on student_label().
+        """
+        merged = {}
+        for submission in submissions:
+            for item in submission.items:
+                label = item.student_label()
+                if label not in merged:
+                    merged[label] = _copy_item(item)
+                    continue
+                for name in item.changed_fields():
+                    setattr(merged[label], name, getattr(item, name))
+
+        graderoster = _copy_header(submissions[0].graderoster)
+        graderoster.items = list(merged.values())
+        new_graderoster = update_graderoster(
+            graderoster, submissions[0].requestor,
+            lazy_persons=self.lazy_persons, chunked=self.chunked)
+        return dict((item.student_label(), item)
+                    for item in new_graderoster.items)
+
+
+def _copy_item(item):
+    gr_item = GradeRosterItem()
+    gr_item._field_values.update(item._field_values)
+    gr_item.grade_choices = item.grade_choices
+    return gr_item
+
+
+def _copy_header(graderoster):
+    header = GradeRoster(section=graderoster.section,
+                         instructor=graderoster.instructor,
+                         section_credits=graderoster.section_credits,
+                         allows_writing_credit=(
+                             graderoster.allows_writing_credit))
+    header.authorized_grade_submitters = list(
+        graderoster.authorized_grade_submitters)
+    header.grade_submission_delegates = list(
+        graderoster.grade_submission_delegates)
+    return header
+
+
+def _item_result(item):
+    if item is None:
+        return {"status_code": None, "status_message": None, "grade": None}
+    return {"status_code": item.status_code,
+            "status_message": item.status_message,
+            "grade": item.grade}
+
+
+_scheduler = None
+_lock = Lock()
+
+
+def get_submission_scheduler():
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = SubmissionScheduler.from_settings()
+        return _scheduler
+
+
+def set_submission_scheduler(scheduler):
+    """
+    Replaces the process-wide submission scheduler.  Passing None reverts
+    to the GRADEROSTER_SUBMISSION_WINDOW setting.
+    """
+    global _scheduler
+    with _lock:
+        _scheduler = scheduler
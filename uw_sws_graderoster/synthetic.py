@@ -0,0 +1,283 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Deterministic synthetic graderoster documents, in the format returned by
+SWS, for benchmarking and testing rosters of any size.
+"""
+
+from uw_sws.models import Section, Term
+from uw_pws.models import Person
+from uw_sws_graderoster.models import GradingScale
+from markupsafe import escape
+from urllib.parse import quote
+import random
+
+# People with PWS mock resources, so that parsed rosters can be resolved.
+# The first is the instructor.
+PEOPLE = [
+    ("FBB38FE46A7C11D5A4AE0004AC494FFE", "TEACHER", "BILL AVERAGE"),
+    ("6DF0A9206A7D11D5A4AE0004AC494FFE", "TEACHER", "FRED AVERAGE"),
+    ("260A0DEC95CB11D78BAA000629C31437", "TEACHER", "JAMES & AVERAGE"),
+]
+DELEGATE_LEVELS = ["department", "curriculum"]
+
+SURNAMES = ["AVERAGE", "STUDENT", "O'NEIL", "SMITH & JONES", "NGUYEN"]
+FIRST_NAMES = ["CHARLIE", "JASON A", "STEPHEN J", "MICHAEL S.", "ANA <B>"]
+
+GRADE_CHOICES = (
+    [""] + GradingScale.GRADE_SCALES[GradingScale.UNDERGRADUATE_SCALE] +
+    ["0.0"])
+
+
+def make_section(size, curriculum_abbr="EDC&I", year=2013, quarter="autumn",
+                 section_id="A"):
+    """
+    Returns a Section model for a synthetic roster of size students.  The
+    course number is derived from size, so that rosters of different sizes
+    have different resources.
+    """
+    term = Term(year=year, quarter=quarter)
+    return Section(term=term, curriculum_abbr=curriculum_abbr,
+                   course_number=str(size), section_id=section_id,
+                   sln="12637", summer_term="")
+
+
+def make_instructor():
+    (reg_id, surname, first_name) = PEOPLE[0]
+    return Person(uwregid=reg_id, uwnetid="bill", surname=surname,
+                  first_name=first_name)
+
+
+def make_graderoster_xhtml(section, size, seed=0,
+                           linked_sections=("AA", "AB")):
+    """
+    Returns the XHTML document for a graderoster of size students in the
+    passed section, generated from seed.  The students are spread across
+    the linked_sections, and include duplicate enrollments, graded and
+    ungraded students, auditors, withdrawals and names needing escapes.
+    """
+    rnd = random.Random(seed)
+    context = _section_context(section)
+
+    items = []
+    student = None
+    for idx in range(size):
+        (item, student) = _item_xhtml(
+            rnd, idx, context, linked_sections, student)
+        items.append(item)
+
+    instructor = PEOPLE[0]
+    delegates = "".join(
+        DELEGATE_XHTML.format(person=_person_link(
+            person, "grade_submission_delegate"), level=level)
+        for (person, level) in zip(PEOPLE[1:], DELEGATE_LEVELS))
+
+    return ROSTER_XHTML.format(
+        items="".join(items),
+        instructor=_person_link(instructor, "instructor"),
+        submitter=_person_link(instructor, "authorized_grade_submitter"),
+        delegates=delegates,
+        section=SECTION_XHTML.format(
+            rel="section", section_id=escape(section.section_id),
+            **context),
+        **context)
+
+
+def _section_context(section):
+    return {
+        "year": section.term.year,
+        "quarter": escape(section.term.quarter),
+        "curriculum_abbr": escape(section.curriculum_abbr),
+        "curriculum_url": quote(section.curriculum_abbr),
+        "course_number": escape(section.course_number),
+        "primary_id": escape(section.section_id),
+    }
+
+
+def _person_link(person, rel):
+    (reg_id, surname, first_name) = person
+    return PERSON_XHTML.format(
+        rel=rel, reg_id=reg_id, name=escape("{},{}".format(
+            surname, first_name)))
+
+
+def _item_xhtml(rnd, idx, context, linked_sections, previous):
+    """
+    Returns the XHTML for an item, and the (reg_id, name, student_number)
+    of its student.  previous is the student of the preceding item.
+    """
+    student = ("{:032X}".format(rnd.getrandbits(128)),
+               escape("{},{}".format(rnd.choice(SURNAMES),
+                                     rnd.choice(FIRST_NAMES))),
+               1000000 + idx)
+    # Every 50th item is a second, duplicate enrollment of the preceding
+    # student
+    duplicate_code = " "
+    if idx % 50 == 49 and previous is not None:
+        (student, duplicate_code) = (previous, "A")
+    (reg_id, name, student_number) = student
+
+    linked = ""
+    if len(linked_sections) and rnd.random() < 0.8:
+        linked = LINKED_XHTML.format(section=SECTION_XHTML.format(
+            rel="secondary",
+            section_id=escape(rnd.choice(linked_sections)), **context))
+
+    graded = rnd.random() < 0.6
+    grade = rnd.choice(GRADE_CHOICES[1:]) if graded else ""
+    grade_options = "".join(
+        '<option class="grade" value="{0}"{1}>{0}</option>'.format(
+            choice, ' selected="selected"' if (
+                graded and choice == grade) else "")
+        for choice in GRADE_CHOICES)
+
+    submitter = ""
+    if graded:
+        submitter = _person_link(rnd.choice(PEOPLE), "grade_submitter_person")
+
+    def checkbox(name, checked, disabled):
+        return CHECKBOX_XHTML.format(
+            name=name, id="{}_{}_{}".format(name, reg_id, duplicate_code),
+            checked=' checked="checked"' if checked else "",
+            disabled=' disabled="disabled"' if disabled else "")
+
+    return ITEM_XHTML.format(
+        name=name, reg_id=reg_id, duplicate_code=duplicate_code,
+        linked=linked,
+        student_former_name="Former Name" if rnd.random() < 0.05 else "",
+        student_number=student_number,
+        student_credits="5.0",
+        date_withdrawn="2013-10-15" if rnd.random() < 0.02 else "",
+        incomplete=checkbox("incomplete", rnd.random() < 0.05, graded),
+        writing_course=checkbox("writing_course", rnd.random() < 0.2, graded),
+        auditor=checkbox("auditor", rnd.random() < 0.03, True),
+        no_grade_now=checkbox("no_grade_now", False, graded),
+        grades_disabled=' disabled="disabled"' if graded else "",
+        grade_options=grade_options,
+        grade_document_id="08261300000" if graded else "",
+        date_graded="2013-12-16" if graded else "",
+        submitter=submitter,
+        grade_submitter_source="WEBCGB" if graded else "",
+        status_code="200" if graded else ""), student
+
+
+ROSTER_XHTML = """<html xml:lang="en" lang="en" \
+xmlns="http://www.w3.org/1999/xhtml">
+  <head>
+    <title>Grade Roster {year} {quarter} {curriculum_abbr} {course_number} \
+{primary_id}</title>
+  </head>
+  <body>
+    <div class="graderoster">
+      <div>
+            Section:
+            {section}</div>
+      <div>
+            Instructor:
+            {instructor}</div>
+      <div>
+            SLN:
+            <span class="sln">12637</span></div>
+      <div>
+            Summer Term Code:
+            <span class="summer_term_code"></span></div>
+      <div>
+            Section Credits:
+            <span class="section_credits"> 5.0</span></div>
+      <div>
+        <label for="">Writing Credit Display:</label>
+        <input type="checkbox" class="writing_credit_display" id="" name="" \
+checked="checked" disabled="disabled"/>
+      </div>
+      <div>
+          Authorized Grade Submitters:
+          <ul class="authorized_grade_submitters">
+                <li>{submitter}</li>
+          </ul>
+          <ul class="grade_submission_delegates">{delegates}
+          </ul>
+      </div>
+      <ul class="graderoster_items">{items}
+      </ul>
+    </div>
+  </body>
+</html>
+"""
+
+SECTION_XHTML = (
+    '<a class="section" rel="{rel}" href="/student/v5/course/{year},'
+    '{quarter},{curriculum_url},{course_number}/{section_id}">'
+    '<span class="year">{year}</span> <span class="quarter">{quarter}</span> '
+    '<span class="curriculum_abbreviation">{curriculum_abbr}</span> '
+    '<span class="course_number">{course_number}</span> '
+    '<span class="section_id">{section_id}</span></a>')
+
+PERSON_XHTML = (
+    '<a class="person" rel="{rel}" href="/student/v5/person/{reg_id}">'
+    '<span class="name">{name}</span> - '
+    '<span class="reg_id">{reg_id}</span></a>')
+
+DELEGATE_XHTML = """
+                <li class="grade_submission_delegate">{person} \
+<span class="delegate_level">{level}</span></li>"""
+
+LINKED_XHTML = """
+          <div>
+          Linked Section:
+          {section}</div>"""
+
+CHECKBOX_XHTML = """
+          <div>
+            <label for="{id}">{name}:</label>
+            <input type="checkbox" class="{name}" id="{id}" name="{id}"\
+{checked}{disabled}/>
+          </div>"""
+
+ITEM_XHTML = """
+        <li class="graderoster_item">
+          <h1>{name}</h1>
+          <div>
+            <a class="person" rel="student" \
+href="/student/v5/person/{reg_id}"><span class="name">{name}</span> - \
+<span class="reg_id">{reg_id}</span></a>
+          </div>
+          <div>
+          Duplicate code:
+          <span class="duplicate_code">{duplicate_code}</span></div>{linked}
+          <div>
+          Student Former Name:
+          <span class="student_former_name">{student_former_name}</span></div>
+          <div>
+          Student Number:
+          <span class="student_number">{student_number}</span></div>
+          <div>
+          Student Type:
+          <span class="student_type"></span></div>
+          <div>
+          Student Credits:
+          <span class="student_credits"> {student_credits}</span></div>
+          <div>
+          Date Withdrawn:
+          <span class="date_withdrawn date">{date_withdrawn}</span></div>\
+{incomplete}{writing_course}{auditor}{no_grade_now}
+          <div>
+          Grade:
+          <select class="grades"{grades_disabled}>{grade_options}</select>\
+</div>
+          <div>
+          Grade document ID: <span class="grade_document_id">\
+{grade_document_id}</span></div>
+          <div>
+          Date Graded: <span class="date_graded date">{date_graded}</span>\
+</div>
+          <div>
+          Grade submitter person:
+          {submitter}</div>
+          <div>
+          Grade submitter source:
+          <span class="grade_submitter_source">{grade_submitter_source}</span>\
+</div>
+          <span class="code">{status_code}</span>
+          <span class="message"></span>
+        </li>"""
@@ -0,0 +1,138 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster
+from uw_sws_graderoster.analytics import GradeRosterArrays, grade_points
+from uw_sws_graderoster.compact import CompactGradeRoster
+from uw_sws_graderoster.models import GradeRoster, GradingScale
+from uw_sws_graderoster.synthetic import (
+    make_graderoster_xhtml, make_section, make_instructor)
+from lxml import etree
+
+
+def expected_summary(graderoster):
+    # The statistics, computed by looping over the items
+    items = graderoster.items
+    grades = [item.grade or "" for item in items]
+    decimal = [float(grade) for grade in grades
+               if grade in GradingScale.GRADE_SCALES["ug"] + ["0.0"]]
+    distribution = {}
+    for grade in GradingScale().sorted_scale(set(grades)):
+        distribution[grade] = grades.count(grade)
+    return {
+        "items": len(items),
+        "graded": len([grade for grade in grades if grade]),
+        "decimal": len(decimal),
+        "incomplete": len([i for i in items if i.has_incomplete]),
+        "withdrawn": len([i for i in items if i.date_withdrawn]),
+        "no_grade_now": len([i for i in items if i.no_grade_now]),
+        "writing_credit": len([i for i in items if i.has_writing_credit]),
+        "auditor": len([i for i in items if i.is_auditor]),
+        "grade_distribution": distribution,
+        "mean_grade_points": (sum(decimal) / len(decimal)
+                              if len(decimal) else None),
+    }
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterAnalyticsTest(TestCase):
+    def setUp(self):
+        self.graderosters = []
+        for label in ['2013,summer,CSS,161/A', '2013,autumn,EDC&I,461/A']:
+            section = get_section_by_label(label)
+            instructor = section.meetings[0].instructors[0]
+            self.graderosters.append(
+                get_graderoster(section, instructor, instructor))
+
+        section = make_section(500)
+        self.graderosters.append(GradeRoster.from_xhtml(
+            etree.fromstring(make_graderoster_xhtml(section, 500)),
+            section=section, instructor=make_instructor()))
+
+    def test_grade_points(self):
+        points = grade_points()
+        self.assertEqual(points["4.0"], 4.0)
+        self.assertEqual(points["0.7"], 0.7)
+        self.assertEqual(points["0.0"], 0.0)
+        for grade in GradingScale.GRADE_SCALES["gr"]:
+            self.assertIn(grade, points)
+        for grade in list(GradingScale.GRADE_ORDER) + ["HP", "CR", "N"]:
+            self.assertNotIn(grade, points)
+
+    def test_roster(self):
+        for graderoster in self.graderosters:
+            arrays = GradeRosterArrays(graderoster)
+            self.assertEqual(len(arrays), len(graderoster.items))
+            self.assertEqual(arrays.labels,
+                             [graderoster.graderoster_label()])
+            summary = arrays.summary()
+            self.assertEqual(summary, expected_summary(graderoster))
+            self.assertEqual(list(summary["grade_distribution"]),
+                             list(expected_summary(
+                                 graderoster)["grade_distribution"]))
+            self.assertEqual(summary, arrays.summary(0))
+
+            # Compact rosters have the same statistics
+            self.assertEqual(
+                GradeRosterArrays(CompactGradeRoster(graderoster)).summary(),
+                summary)
+
+    def test_batch(self):
+        arrays = GradeRosterArrays(self.graderosters)
+        self.assertEqual(len(arrays), sum(
+            len(graderoster.items) for graderoster in self.graderosters))
+        self.assertEqual(list(arrays.offsets), [0, 5, 10, 510])
+
+        summaries = arrays.summaries()
+        self.assertEqual(list(summaries), [
+            graderoster.graderoster_label()
+            for graderoster in self.graderosters])
+        for roster, graderoster in enumerate(self.graderosters):
+            self.assertEqual(arrays.summary(roster),
+                             expected_summary(graderoster))
+            self.assertEqual(summaries[graderoster.graderoster_label()],
+                             expected_summary(graderoster))
+
+        summary = arrays.summary()
+        self.assertEqual(summary["items"], 510)
+        self.assertEqual(sum(summary["grade_distribution"].values()), 510)
+        self.assertEqual(summary["incomplete"], sum(
+            arrays.summary(roster)["incomplete"] for roster in range(3)))
+
+    def test_grading_scales(self):
+        graderoster = self.graderosters[0]
+        items = graderoster.items
+        items[0].grade = "HP"
+        items[1].grade = "P"
+        items[2].grade = "CR"
+        items[3].grade = "4.0"
+        items[4].grade = None
+        items[4].date_withdrawn = "2013-07-01"
+        items[4].has_incomplete = True
+
+        summary = GradeRosterArrays(graderoster).summary()
+        self.assertEqual(list(summary["grade_distribution"].items()), [
+            ("", 1), ("HP", 1), ("P", 1), ("CR", 1), ("4.0", 1)])
+        self.assertEqual(summary["graded"], 4)
+        self.assertEqual(summary["decimal"], 1)
+        self.assertEqual(summary["mean_grade_points"], 4.0)
+        self.assertEqual(summary["withdrawn"], 1)
+        self.assertEqual(summary, expected_summary(graderoster))
+
+        items[3].grade = "N"
+        summary = GradeRosterArrays(graderoster).summary()
+        self.assertEqual(summary["decimal"], 0)
+        self.assertIsNone(summary["mean_grade_points"])
+
+    def test_empty(self):
+        arrays = GradeRosterArrays([])
+        self.assertEqual(len(arrays), 0)
+        self.assertEqual(arrays.summaries(), {})
+        self.assertEqual(arrays.grade_distribution(), {})
+        self.assertIsNone(arrays.mean_grade_points())
+        self.assertEqual(arrays.counts()["graded"], 0)
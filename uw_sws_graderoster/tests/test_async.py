@@ -0,0 +1,75 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import IsolatedAsyncioTestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import (
+    get_graderoster, async_get_graderoster, async_update_graderoster)
+from restclients_core.exceptions import DataFailureException
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+
+@fdao_pws_override
+@fdao_sws_override
+class AsyncGradeRosterTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sections = []
+        for label in ['2013,summer,CSS,161/A', '2013,autumn,EDC&I,461/A']:
+            section = get_section_by_label(label)
+            self.sections.append(
+                (section, section.meetings[0].instructors[0]))
+        self.requestor = self.sections[0][1]
+
+    async def test_async_get_graderoster(self):
+        (section, instructor) = self.sections[0]
+        graderoster = await async_get_graderoster(
+            section, instructor, self.requestor)
+        self.assertEqual(
+            graderoster.xhtml(),
+            get_graderoster(section, instructor, self.requestor).xhtml())
+
+    async def test_gather(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            graderosters = await asyncio.gather(*[
+                async_get_graderoster(section, instructor, self.requestor,
+                                      executor=executor)
+                for (section, instructor) in self.sections * 50])
+
+        self.assertEqual(len(graderosters), 100)
+        for idx, graderoster in enumerate(graderosters):
+            self.assertIs(graderoster.section, self.sections[idx % 2][0])
+            self.assertEqual(len(graderoster.items), 5)
+
+    async def test_async_get_failure(self):
+        section = get_section_by_label('2013,spring,TRAIN,101/A')
+        with self.assertRaises(DataFailureException):
+            await async_get_graderoster(
+                section, section.meetings[0].instructors[1], self.requestor)
+
+    async def test_async_update_graderoster(self):
+        (section, instructor) = self.sections[1]
+        graderoster = await async_get_graderoster(
+            section, instructor, self.requestor)
+        graderoster.items[0].grade = '2.5'
+
+        new_graderoster = await async_update_graderoster(
+            graderoster, self.requestor)
+        self.assertEqual(new_graderoster.xhtml(), graderoster.xhtml())
+
+        graderoster.items[1].grade = '3.5'
+        new_graderoster = await async_update_graderoster(
+            graderoster, self.requestor, delta=True)
+        self.assertEqual(new_graderoster.items[1].grade, '3.5')
+        self.assertIs(new_graderoster.items[2], graderoster.items[2])
+
+        unchanged = await async_update_graderoster(
+            new_graderoster, self.requestor, delta=True)
+        self.assertIs(unchanged, new_graderoster)
+
+        graderoster.items[3].grade = '1.5'
+        new_graderoster = await async_update_graderoster(
+            graderoster, self.requestor, chunked=True)
+        self.assertEqual(new_graderoster.xhtml(), graderoster.xhtml())
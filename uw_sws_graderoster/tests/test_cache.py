@@ -0,0 +1,173 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster, update_graderoster
+from uw_sws_graderoster.cache import (
+    GradeRosterCache, get_graderoster_cache, set_graderoster_cache)
+from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster.people import PersonReference, get_person_cache
+from restclients_core.models import MockHTTP
+from commonconf import override_settings
+from unittest.mock import patch
+
+ETAG = '"graderoster-1"'
+LAST_MODIFIED = "Tue, 14 May 2013 17:00:00 GMT"
+
+
+class CountingDAO(object):
+    def __init__(self, not_modified=False):
+        self.not_modified = not_modified
+        self.requests = []
+        self._getURL = SWS_GradeRoster_DAO.getURL
+
+    def getURL(self, dao, url, headers):
+        self.requests.append(dict(headers))
+        if self.not_modified and "If-None-Match" in headers:
+            response = MockHTTP()
+            response.status = 304
+            return response
+
+        response = self._getURL(dao, url, headers)
+        response.headers = {"etag": ETAG, "Last-Modified": LAST_MODIFIED}
+        return response
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterCacheTest(TestCase):
+    def setUp(self):
+        self.section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = self.section.meetings[0].instructors[0]
+        self.cache = GradeRosterCache(ttl=60)
+        set_graderoster_cache(self.cache)
+
+    def tearDown(self):
+        set_graderoster_cache(None)
+
+    def get_graderoster(self, dao, lazy_persons=False):
+        with patch.object(SWS_GradeRoster_DAO, 'getURL', autospec=True,
+                          side_effect=dao.getURL):
+            return get_graderoster(
+                self.section, self.instructor, self.instructor,
+                lazy_persons=lazy_persons)
+
+    def people(self, graderoster):
+        return ([delegate.person
+                 for delegate in graderoster.grade_submission_delegates] +
+                graderoster.authorized_grade_submitters +
+                [item.grade_submitter_person for item in graderoster.items
+                 if item.grade_submitter_person is not None])
+
+    def test_lazy_persons(self):
+        dao = CountingDAO()
+        lazy = self.get_graderoster(dao, lazy_persons=True)
+        self.assertTrue(any(isinstance(person, PersonReference)
+                            for person in self.people(lazy)))
+
+        # A cached roster parsed with lazy_persons has its people resolved
+        # for a caller that doesn't want stand-ins
+        get_person_cache().clear()
+        graderoster = self.get_graderoster(dao)
+        self.assertEqual(len(dao.requests), 1)
+        for person in self.people(graderoster):
+            self.assertNotIsInstance(person, PersonReference)
+        self.assertEqual(graderoster.xhtml(), lazy.xhtml())
+        self.assertEqual(graderoster.changed_items(), [])
+        self.assertEqual(
+            [delegate.person.display_name
+             for delegate in graderoster.grade_submission_delegates],
+            [delegate.person.display_name
+             for delegate in lazy.grade_submission_delegates])
+
+        # The cached roster itself is unchanged
+        cached = self.get_graderoster(dao, lazy_persons=True)
+        self.assertTrue(any(isinstance(person, PersonReference)
+                            for person in self.people(cached)))
+        self.assertEqual(len(dao.requests), 1)
+
+    def test_hit(self):
+        dao = CountingDAO()
+        graderoster = self.get_graderoster(dao)
+        cached = self.get_graderoster(dao)
+
+        self.assertEqual(len(dao.requests), 1)
+        self.assertEqual(cached.xhtml(), graderoster.xhtml())
+        self.assertIs(cached.section, self.section)
+        self.assertIs(cached.instructor, self.instructor)
+        self.assertEqual(self.cache.stats(), {
+            "hits": 1, "revalidations": 0, "misses": 1, "hit_rate": 0.5,
+            "size": 1})
+
+    def test_copies(self):
+        dao = CountingDAO()
+        graderoster = self.get_graderoster(dao)
+        graderoster.items[0].grade = "0.0"
+        cached = self.get_graderoster(dao)
+        self.assertNotEqual(cached.items[0].grade, "0.0")
+        self.assertIsNot(cached.items[0], graderoster.items[0])
+
+    def test_revalidation(self):
+        dao = CountingDAO(not_modified=True)
+        graderoster = self.get_graderoster(dao)
+
+        with patch('uw_sws_graderoster.cache.time.monotonic',
+                   return_value=10.0 ** 9):
+            cached = self.get_graderoster(dao)
+
+        self.assertEqual(len(dao.requests), 2)
+        self.assertNotIn("If-None-Match", dao.requests[0])
+        self.assertEqual(dao.requests[1]["If-None-Match"], ETAG)
+        self.assertEqual(dao.requests[1]["If-Modified-Since"], LAST_MODIFIED)
+        self.assertEqual(cached.xhtml(), graderoster.xhtml())
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+
+    def test_expired(self):
+        dao = CountingDAO()
+        self.get_graderoster(dao)
+
+        with patch('uw_sws_graderoster.cache.time.monotonic',
+                   return_value=10.0 ** 9):
+            graderoster = self.get_graderoster(dao)
+
+        self.assertEqual(len(dao.requests), 2)
+        self.assertEqual(len(graderoster.items), 5)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_update_invalidates(self):
+        dao = CountingDAO()
+        graderoster = self.get_graderoster(dao)
+        self.assertEqual(self.cache.stats()["size"], 1)
+
+        update_graderoster(graderoster, self.instructor)
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+        self.get_graderoster(dao)
+        self.assertEqual(len(dao.requests), 2)
+
+    def test_stream_bypasses_cache(self):
+        graderoster = get_graderoster(
+            self.section, self.instructor, self.instructor, stream=True)
+        self.assertEqual(len(graderoster.items), 5)
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_max_size(self):
+        cache = GradeRosterCache(max_size=2)
+        for netid in ["a", "b", "c"]:
+            cache.store("label", netid, self.section)
+        self.assertIsNone(cache.get_entry("label", "a"))
+        self.assertIsNotNone(cache.get_entry("label", "c"))
+
+    def test_cache_class_setting(self):
+        set_graderoster_cache(None)
+        self.assertIsNone(get_graderoster_cache())
+
+        with override_settings(GRADEROSTER_CACHE_CLASS=(
+                "uw_sws_graderoster.cache.GradeRosterCache")):
+            set_graderoster_cache(None)
+            cache = get_graderoster_cache()
+            self.assertIsInstance(cache, GradeRosterCache)
+            self.assertIs(get_graderoster_cache(), cache)
@@ -0,0 +1,69 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster
+from uw_sws_graderoster.benchmarks import bytes_per_student
+from uw_sws_graderoster.compact import CompactGradeRoster
+from uw_sws_graderoster.models import GradeRosterItem
+from restclients_core.models import BaseField
+
+
+@fdao_pws_override
+@fdao_sws_override
+class CompactGradeRosterTest(TestCase):
+    def setUp(self):
+        self.graderosters = []
+        for label in ['2013,summer,CSS,161/A', '2013,autumn,EDC&I,461/A']:
+            section = get_section_by_label(label)
+            instructor = section.meetings[0].instructors[0]
+            self.graderosters.append(
+                get_graderoster(section, instructor, instructor))
+
+    def test_row_views(self):
+        for graderoster in self.graderosters:
+            compact = CompactGradeRoster(graderoster)
+            self.assertEqual(len(compact), len(graderoster.items))
+            self.assertEqual(compact.graderoster_label(),
+                             graderoster.graderoster_label())
+
+            for item, view in zip(graderoster.items, compact):
+                for name, field in GradeRosterItem.__dict__.items():
+                    if isinstance(field, BaseField):
+                        self.assertEqual(getattr(view, name),
+                                         getattr(item, name), name)
+                self.assertIs(view.grade_choices, item.grade_choices)
+                self.assertEqual(view.student_label(), item.student_label())
+                self.assertTrue(view == item)
+                self.assertFalse(view.is_changed())
+
+            self.assertEqual(compact[-1].student_label(),
+                             graderoster.items[-1].student_label())
+            self.assertRaises(IndexError, compact.__getitem__, len(compact))
+            with self.assertRaises(AttributeError):
+                compact[0].grade = "4.0"
+
+    def test_xhtml(self):
+        for graderoster in self.graderosters:
+            compact = CompactGradeRoster(graderoster)
+            self.assertEqual(compact.xhtml(), graderoster.xhtml())
+
+            new_graderoster = compact.to_graderoster()
+            self.assertEqual(new_graderoster.xhtml(), graderoster.xhtml())
+            self.assertIs(new_graderoster.section, graderoster.section)
+            for item in new_graderoster.items:
+                self.assertFalse(item.is_changed())
+
+    def test_interned_values(self):
+        graderoster = self.graderosters[0]
+        compact = CompactGradeRoster(graderoster)
+        # Every item has the same grade_document_id and grade_choices
+        self.assertEqual(len(set(compact._columns["grade_document_id"])), 1)
+        self.assertEqual(len(set(compact._columns["grade_choices"])), 1)
+
+    def test_bytes_per_student(self):
+        sizes = bytes_per_student(self.graderosters[0])
+        self.assertGreater(sizes["items"], sizes["compact"])
@@ -2,10 +2,122 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from unittest import TestCase
-from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster import (
+    get_graderoster, get_graderosters, update_graderoster)
+from uw_sws_graderoster.dao import (
+    SWS_GradeRoster_DAO, get_graderoster_dao, set_graderoster_dao,
+    make_graderoster_submitted)
+from uw_sws_graderoster.synthetic import (
+    make_section, make_instructor, make_graderoster_xhtml)
+from restclients_core.dao import LiveDAO
+from commonconf import override_settings
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread
 
 
 class SWSGradeRosterTestDao(TestCase):
     def test_custom_headers(self):
         self.assertEqual(
             SWS_GradeRoster_DAO()._custom_headers('GET', '/', {}, None), None)
+
+    def test_shared_dao(self):
+        set_graderoster_dao(None)
+        dao = get_graderoster_dao()
+        self.assertIsInstance(dao, SWS_GradeRoster_DAO)
+        self.assertIs(get_graderoster_dao(), dao)
+        self.assertIsNone(dao.pool_stats())
+
+
+class GradeRosterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        data = make_graderoster_xhtml(make_section(5), 5).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xhtml+xml")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_PUT(self):
+        # Reads a chunked body, as urllib3 sends an iterable body
+        self.server.transfer_encoding = self.headers["Transfer-Encoding"]
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            chunks.append(self.rfile.read(size + 2)[:size])
+            if size == 0:
+                break
+
+        data = make_graderoster_submitted(b"".join(chunks))
+        self.server.chunks = len(chunks) - 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xhtml+xml")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SWSGradeRosterLiveDaoTest(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                          GradeRosterHandler)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        LiveDAO.pools.pop("sws", None)
+
+    def tearDown(self):
+        pool = LiveDAO.pools.pop("sws", None)
+        if pool is not None:
+            pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def live_settings(self):
+        return override_settings(
+            RESTCLIENTS_SWS_DAO_CLASS="Live",
+            RESTCLIENTS_SWS_HOST="http://127.0.0.1:{}".format(
+                self.server.server_address[1]),
+            RESTCLIENTS_SWS_POOL_SIZE=2)
+
+    def test_connection_reuse(self):
+        section = make_section(5)
+        instructor = make_instructor()
+        with self.live_settings():
+            for idx in range(5):
+                graderoster = get_graderoster(
+                    section, instructor, instructor, lazy_persons=True)
+                self.assertEqual(len(graderoster.items), 5)
+
+            self.assertEqual(get_graderoster_dao().pool_stats(), {
+                "connections": 1, "requests": 5, "idle": 1, "max_size": 2})
+
+    def test_bounded_pool(self):
+        pairs = [(make_section(5), make_instructor())] * 12
+        with self.live_settings():
+            results = list(get_graderosters(
+                pairs, make_instructor(), max_workers=6, lazy_persons=True))
+            stats = get_graderoster_dao().pool_stats()
+
+        self.assertEqual(len(results), 12)
+        for (section, instructor, graderoster) in results:
+            self.assertEqual(len(graderoster.items), 5)
+        self.assertEqual(stats["requests"], 12)
+        self.assertLessEqual(stats["connections"], 2)
+
+    def test_chunked_put(self):
+        section = make_section(5)
+        instructor = make_instructor()
+        with self.live_settings():
+            graderoster = get_graderoster(section, instructor, instructor,
+                                          lazy_persons=True)
+            graderoster.items[0].grade = "0.7"
+            new_graderoster = update_graderoster(
+                graderoster, instructor, lazy_persons=True, chunked=True)
+
+        self.assertEqual(self.server.transfer_encoding, "chunked")
+        self.assertGreaterEqual(self.server.chunks, 1)
+        self.assertEqual(new_graderoster.items[0].grade, "0.7")
+        self.assertEqual(new_graderoster.items[0].status_code, "200")
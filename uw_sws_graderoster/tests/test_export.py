@@ -0,0 +1,156 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster, _get_response
+from uw_sws_graderoster.export import (
+    export_graderosters, export_rows, EXPORT_FIELDS, ITEM_FIELDS,
+    _mp_context)
+from uw_sws_graderoster.loadtest import LoadProfile, set_load_profile
+from uw_sws_graderoster.synthetic import make_section, make_instructor
+from restclients_core.models import MockHTTP
+from commonconf import override_settings
+from concurrent import futures
+from io import StringIO
+from unittest.mock import patch
+import csv
+import json
+
+LOADTEST_DAO = "uw_sws_graderoster.loadtest.GradeRosterLoadTestDAO"
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterExportTest(TestCase):
+    def setUp(self):
+        self.pairs = []
+        for label in ['2013,summer,CSS,161/A', '2013,autumn,EDC&I,461/A']:
+            section = get_section_by_label(label)
+            self.pairs.append((section, section.meetings[0].instructors[0]))
+        self.requestor = self.pairs[0][1]
+
+    def expected_rows(self):
+        rows = {}
+        for (section, instructor) in self.pairs:
+            graderoster = get_graderoster(section, instructor, self.requestor)
+            for item in graderoster.items:
+                submitter = item.grade_submitter_person
+                rows[(section.section_label(), item.student_label())] = dict(
+                    [(name, getattr(item, name)) for name in ITEM_FIELDS] +
+                    [("section_label", section.section_label()),
+                     ("instructor_uwregid", instructor.uwregid),
+                     ("grade_submitter_uwregid",
+                      submitter.uwregid if submitter else None)])
+        return rows
+
+    def test_export_jsonl(self):
+        output = StringIO()
+        results = export_graderosters(
+            self.pairs, self.requestor, output, format="jsonl", processes=2,
+            max_in_flight=1)
+        self.assertEqual(results, {"sections": 2, "rows": 10, "errors": []})
+
+        expected = self.expected_rows()
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(rows), 10)
+        for row in rows:
+            self.assertEqual(list(row.keys()), list(EXPORT_FIELDS))
+            label = row["student_uwregid"]
+            if row["duplicate_code"]:
+                label += "," + row["duplicate_code"]
+            self.assertEqual(row, expected[(row["section_label"], label)])
+
+    def test_export_csv(self):
+        output = StringIO()
+        export_graderosters(self.pairs, self.requestor, output, processes=1)
+
+        rows = list(csv.reader(StringIO(output.getvalue())))
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(
+            set(row[0] for row in rows[1:]),
+            set(section.section_label() for (section, i) in self.pairs))
+
+    def test_errors(self):
+        section = get_section_by_label('2013,spring,TRAIN,101/A')
+        pairs = self.pairs + [(section, section.meetings[0].instructors[1])]
+
+        results = export_graderosters(pairs, self.requestor, StringIO(),
+                                      processes=1)
+        self.assertEqual(results["sections"], 2)
+        self.assertEqual(len(results["errors"]), 1)
+        (label, ex) = results["errors"][0]
+        self.assertEqual(label, section.section_label())
+        self.assertEqual(ex.status, 403)
+
+        self.assertRaises(ValueError, export_rows, (), "<html")
+
+        self.assertRaises(ValueError, export_rows, (), "<html/>")
+        self.assertRaises(
+            ValueError, export_rows, (),
+            '<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+            '<div class="graderoster"></div></body></html>')
+
+        # The parser processes aren't forked from the threaded parent
+        self.assertNotEqual(_mp_context().get_start_method(), "fork")
+        self.assertRaises(ValueError, export_graderosters, self.pairs,
+                          self.requestor, StringIO(), format="xlsx")
+
+    def test_not_graderoster(self):
+        # A section whose roster response is well-formed, but not a
+        # graderoster, is reported without stopping the export
+        get_response = _get_response
+
+        def response(url, headers):
+            if "EDC" not in url:
+                return get_response(url, headers)
+            response = MockHTTP()
+            response.status = 200
+            response.data = '<html xmlns="http://www.w3.org/1999/xhtml"/>'
+            return response
+
+        output = StringIO()
+        with patch('uw_sws_graderoster.export._get_response', response):
+            results = export_graderosters(
+                self.pairs, self.requestor, output, format="jsonl",
+                processes=1)
+        self.assertEqual(results["sections"], 1)
+        self.assertEqual(results["rows"], 5)
+        self.assertEqual(len(results["errors"]), 1)
+        (label, ex) = results["errors"][0]
+        self.assertEqual(label, '2013,autumn,EDC&I,461/A')
+        self.assertIsInstance(ex, ValueError)
+        self.assertEqual(len(output.getvalue().splitlines()), 5)
+
+
+@fdao_pws_override
+@override_settings(RESTCLIENTS_SWS_DAO_CLASS=LOADTEST_DAO)
+class GradeRosterBulkExportTest(TestCase):
+    def tearDown(self):
+        set_load_profile(None)
+
+    def test_bounded_window(self):
+        set_load_profile(LoadProfile(roster_size=20))
+        instructor = make_instructor()
+        pairs = [(make_section(100 + idx), instructor) for idx in range(30)]
+
+        waits = []
+        wait = futures.wait
+
+        def counting_wait(fs, **kwargs):
+            waits.append(len(fs))
+            return wait(fs, **kwargs)
+
+        output = StringIO()
+        with patch('uw_sws_graderoster.export.wait', counting_wait):
+            results = export_graderosters(
+                pairs, instructor, output, format="jsonl", processes=2,
+                max_in_flight=3)
+
+        self.assertEqual(results["sections"], 30)
+        self.assertEqual(results["rows"], 600)
+        self.assertEqual(len(output.getvalue().splitlines()), 600)
+        self.assertLessEqual(max(waits), 3)
@@ -6,8 +6,19 @@ from uw_pws.util import fdao_pws_override
 from uw_sws.util import fdao_sws_override
 from uw_sws.section import get_section_by_label
 from uw_sws.models import Section
-from uw_sws_graderoster import get_graderoster, update_graderoster
+from uw_sws_graderoster import (
+    get_graderoster, get_graderosters, update_graderoster,
+    iter_graderoster_items, _iter_chunks, _stream_graderoster)
+from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster.models import (
+    GradeRoster, GradeRosterItem, GradeRosterIndex)
+from uw_sws_graderoster.people import get_person_cache
+from uw_sws_graderoster.synthetic import (
+    make_graderoster_xhtml, make_section, make_instructor)
 from restclients_core.exceptions import DataFailureException
+from restclients_core.models import MockHTTP
+from unittest.mock import patch
+from lxml import etree
 import random
 import re
 
@@ -45,6 +56,9 @@ class SWSTestGradeRoster(TestCase):
             self.assertEqual(
                 len(item.grade_choices), 36,
                 "grade_choices returns correct grades")
+            self.assertIs(
+                item.grade_choices, graderoster.items[0].grade_choices,
+                "Items share grade_choices")
             self.assertEqual(
                 item.grade, grades[idx], "Correct default grade")
             self.assertEqual(
@@ -86,3 +100,439 @@ class SWSTestGradeRoster(TestCase):
 
 def split_xhtml(xhtml):
     return re.split(r'\s*\n\s*', xhtml.strip())
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SWSTestGradeRosterStream(TestCase):
+    def setUp(self):
+        self.section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = self.section.meetings[0].instructors[0]
+
+    def test_stream_graderoster(self):
+        graderoster = get_graderoster(
+            self.section, self.instructor, self.instructor)
+        streamed = get_graderoster(
+            self.section, self.instructor, self.instructor, stream=True)
+
+        self.assertEqual(len(streamed.grade_submission_delegates), 2)
+        self.assertEqual(len(streamed.items), 5)
+        self.assertEqual(streamed.xhtml(), graderoster.xhtml())
+
+    def test_iter_graderoster_items(self):
+        labels = [item.student_label() for item in iter_graderoster_items(
+            self.section, self.instructor, self.instructor)]
+        self.assertEqual(labels, [
+            '1914B1B26A7D11D5A4AE0004AC494FFE',
+            '511FC8241DC611DB9943F9D03AACCE31',
+            'F00E253C634211DA9755000629C31437',
+            'C7EED7406A7C11D5A4AE0004AC494FFE',
+            'A9D2DDFA6A7D11D5A4AE0004AC494FFE,A'])
+
+    def test_incremental_items(self):
+        data = SWS_GradeRoster_DAO().getURL(
+            '/student/v5/graderoster/2013,summer,CSS,161,A,'
+            'FBB38FE46A7C11D5A4AE0004AC494FFE', {}).data
+        chunks = []
+
+        def read_chunks():
+            for chunk in _iter_chunks(data, size=1024):
+                chunks.append(chunk)
+                yield chunk
+
+        graderoster = GradeRoster.from_xhtml_stream(
+            read_chunks(), section=self.section, instructor=self.instructor)
+        items = graderoster.iter_items()
+        item = next(items)
+        self.assertEqual(item.student_surname, 'AVERAGE')
+        self.assertLess(sum(len(c) for c in chunks), len(data))
+        self.assertEqual(len(list(items)), 4)
+        self.assertEqual(graderoster.items, [])
+
+    def test_stream_syntax_error(self):
+        response = MockHTTP()
+        response.status = 200
+        response.data = SWS_GradeRoster_DAO().getURL(
+            '/student/v5/graderoster/2013,summer,CSS,161,A,'
+            'FBB38FE46A7C11D5A4AE0004AC494FFE', {}).data[:-5000]
+
+        graderoster = _stream_graderoster(
+            '/', response, self.section, self.instructor)
+        self.assertRaises(DataFailureException, getattr, graderoster, 'items')
+
+    def test_stream_without_items(self):
+        response = MockHTTP()
+        response.status = 200
+        response.data = re.sub(
+            rb'<ul class="graderoster_items">.*?</ul>', b'',
+            SWS_GradeRoster_DAO().getURL(
+                '/student/v5/graderoster/2013,summer,CSS,161,A,'
+                'FBB38FE46A7C11D5A4AE0004AC494FFE', {}).data,
+            flags=re.DOTALL)
+
+        graderoster = _stream_graderoster(
+            '/', response, self.section, self.instructor)
+        self.assertEqual(graderoster.items, [])
+        self.assertEqual(len(graderoster.grade_submission_delegates), 2)
+        self.assertEqual(graderoster.xhtml(), GradeRoster.from_xhtml(
+            etree.fromstring(response.data.strip()), section=self.section,
+            instructor=self.instructor).xhtml())
+
+    def test_stream_not_graderoster(self):
+        response = MockHTTP()
+        response.status = 200
+        for data in [b'<html xmlns="http://www.w3.org/1999/xhtml"/>',
+                     b'<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+                     b'<ul><li>1</li></ul></body></html>']:
+            response.data = data
+            self.assertRaises(DataFailureException, _stream_graderoster,
+                              '/', response, self.section, self.instructor)
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SWSTestGradeRosterLazyPersons(TestCase):
+    def test_lazy_persons(self):
+        section = get_section_by_label('2013,autumn,EDC&I,461/A')
+        instructor = section.meetings[0].instructors[0]
+
+        with patch('uw_sws_graderoster.people._get_person') as get_person:
+            graderoster = get_graderoster(
+                section, instructor, instructor, lazy_persons=True)
+            xhtml = graderoster.xhtml()
+            get_person.assert_not_called()
+
+        delegates = graderoster.grade_submission_delegates
+        self.assertEqual(delegates[1].person.uwregid,
+                         '260A0DEC95CB11D78BAA000629C31437')
+        self.assertEqual(delegates[1].person.first_name, 'JAMES & AVERAGE')
+        self.assertIn('<span class="name">TEACHER,JAMES &amp; AVERAGE</span>',
+                      xhtml)
+        self.assertFalse(delegates[1].person.is_resolved())
+        self.assertEqual(delegates[1].person.uwnetid, 'james')
+
+        items = graderoster.items
+        self.assertIs(items[0].grade_submitter_person,
+                      items[1].grade_submitter_person)
+
+        new_graderoster = update_graderoster(
+            graderoster, instructor, lazy_persons=True)
+        self.assertEqual(split_xhtml(new_graderoster.xhtml()),
+                         split_xhtml(xhtml))
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SWSTestGradeRosterDelta(TestCase):
+    def setUp(self):
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = section.meetings[0].instructors[0]
+        self.graderoster = get_graderoster(
+            section, self.instructor, self.instructor)
+
+    def test_changed_fields(self):
+        item = self.graderoster.items[1]
+        self.assertEqual(self.graderoster.changed_items(), [])
+        self.assertEqual(item.changed_fields(), set())
+
+        item.grade = '3.5'
+        item.has_incomplete = item.has_incomplete
+        item.has_writing_credit = not item.has_writing_credit
+        self.assertEqual(item.changed_fields(),
+                         {'grade', 'has_writing_credit'})
+        self.assertEqual(self.graderoster.changed_items(), [item])
+
+        item.mark_clean()
+        self.assertFalse(item.is_changed())
+
+        new_item = GradeRosterItem(student_uwregid='1234')
+        self.assertIn('student_uwregid', new_item.changed_fields())
+        self.assertIn('grade', new_item.changed_fields())
+
+    def test_delta_update(self):
+        self.graderoster.items[1].grade = '3.5'
+
+        with patch.object(SWS_GradeRoster_DAO, 'putURL',
+                          autospec=True,
+                          side_effect=SWS_GradeRoster_DAO.putURL) as put:
+            new_graderoster = update_graderoster(
+                self.graderoster, self.instructor, delta=True)
+            body = put.call_args[0][3]
+
+        self.assertEqual(body.count('class="graderoster_item"'), 1)
+        self.assertEqual(len(new_graderoster.items), 5)
+        for idx, item in enumerate(new_graderoster.items):
+            self.assertEqual(item.student_label(),
+                             self.graderoster.items[idx].student_label())
+            if idx == 1:
+                self.assertEqual(item.grade, '3.5')
+                self.assertEqual(item.status_code, '200')
+                self.assertFalse(item.is_changed())
+            else:
+                self.assertIs(item, self.graderoster.items[idx])
+
+    def test_delta_unchanged(self):
+        with patch.object(SWS_GradeRoster_DAO, 'putURL') as put:
+            new_graderoster = update_graderoster(
+                self.graderoster, self.instructor, delta=True)
+            put.assert_not_called()
+        self.assertIs(new_graderoster, self.graderoster)
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SWSTestGradeRosterMerge(TestCase):
+    def setUp(self):
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = section.meetings[0].instructors[0]
+        self.graderoster = get_graderoster(
+            section, self.instructor, self.instructor)
+
+    def test_merge_update(self):
+        items = list(self.graderoster.items)
+        items[1].grade = '3.5'
+        expected = update_graderoster(self.graderoster, self.instructor)
+
+        # The people on the roster are reused, without PWS requests
+        get_person_cache().clear()
+        with patch('uw_sws_graderoster.people._get_person') as get_person:
+            graderoster = update_graderoster(
+                self.graderoster, self.instructor, merge=True)
+            get_person.assert_not_called()
+
+        self.assertIs(graderoster, self.graderoster)
+        self.assertEqual(graderoster.xhtml(), expected.xhtml())
+        for idx, item in enumerate(graderoster.items):
+            self.assertIs(item, items[idx])
+            self.assertEqual(item.status_code, '200')
+            self.assertIs(item.grade_submitter_person,
+                          expected.items[idx].grade_submitter_person)
+            self.assertFalse(item.is_changed())
+        self.assertEqual(items[1].grade, '3.5')
+
+    def test_merge_delta_update(self):
+        items = list(self.graderoster.items)
+        items[1].grade = '3.5'
+        graderoster = update_graderoster(
+            self.graderoster, self.instructor, delta=True, merge=True)
+
+        self.assertIs(graderoster, self.graderoster)
+        self.assertEqual(graderoster.items, items)
+        self.assertEqual(items[1].status_code, '200')
+        self.assertEqual(graderoster.changed_items(), [])
+
+    def test_merge_xhtml(self):
+        tree = etree.fromstring(self.graderoster.xhtml())
+        item = self.graderoster.items.pop(2)
+        self.graderoster.items[0].grade = 'I'
+
+        merged = self.graderoster.merge_xhtml(tree)
+        self.assertEqual(len(merged), 5)
+        self.assertEqual(len(self.graderoster.items), 5)
+        self.assertEqual(self.graderoster.items[-1].student_label(),
+                         item.student_label())
+        self.assertEqual(self.graderoster.items[0].grade, '0.7')
+        self.assertFalse(self.graderoster.items[0].is_changed())
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SWSTestGradeRosterIndex(TestCase):
+    def setUp(self):
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = section.meetings[0].instructors[0]
+        self.graderoster = get_graderoster(
+            section, self.instructor, self.instructor)
+        self.items = self.graderoster.items
+
+        # A second enrollment for the first student, in a linked section
+        self.items[1].student_uwregid = self.items[0].student_uwregid
+        self.items[1].student_number = self.items[0].student_number
+        self.items[1].duplicate_code = 'A'
+        self.items[1].section_id = 'AB'
+
+    def test_hashable(self):
+        items = set(self.items)
+        self.assertEqual(len(items), 5)
+        item = GradeRosterItem(student_uwregid=self.items[0].student_uwregid)
+        self.assertIn(item, items)
+        self.assertEqual(hash(item), hash(self.items[0]))
+        item.duplicate_code = 'A'
+        self.assertEqual(dict.fromkeys(self.items, 1)[item], 1)
+
+    def test_index(self):
+        index = self.graderoster.index()
+        self.assertIsInstance(index, GradeRosterIndex)
+        (first, second) = self.items[0:2]
+        regid = first.student_uwregid
+
+        self.assertEqual(index.find(regid), [first, second])
+        self.assertEqual(index.find(regid.lower()), [first, second])
+        self.assertEqual(index.find(regid + ',a'), [second])
+        self.assertEqual(index.find(regid + ',B'), [])
+        self.assertEqual(index.find(regid + ','), [first])
+        self.assertEqual(index.find('1250822'), [first, second])
+        self.assertEqual(index.find(1250822), [first, second])
+        self.assertEqual(index.find(self.items[4].student_label()),
+                         [self.items[4]])
+        self.assertEqual(index.find('1311701'), [self.items[4]])
+        self.assertEqual(index.find('1111111'), [])
+        self.assertEqual(index.find('Student'), [])
+        self.assertEqual(index.items_for_section('ab'), [second])
+        self.assertEqual(len(index.items_for_section('A')), 4)
+        self.assertEqual(index.items_for_section('AC'), [])
+
+        # Linked section ids are matched without case
+        self.items[3].section_id = 'Ac'
+        index = self.graderoster.index()
+        self.assertEqual(index.items_for_section('AC'), [self.items[3]])
+        self.assertEqual(index.items_for_section('ac'), [self.items[3]])
+        self.assertEqual(len(index.items_for_section('a')), 3)
+
+    def test_apply_grades(self):
+        regid = self.items[0].student_uwregid
+        results = self.graderoster.apply_grades({
+            regid: '3.0',
+            regid + ',A': {'grade': '2.0', 'has_incomplete': True},
+            '1310071': '1.0',
+            1311656: '',
+            self.items[4].student_label(): '3.9',
+            'FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF': '4.0',
+            9999999: '4.0',
+        })
+        self.assertEqual(results['applied'], self.items[1:5])
+        self.assertEqual(results['unknown'], [
+            'FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF', 9999999])
+        self.assertEqual(results['ambiguous'], {
+            regid: [regid, regid + ',A']})
+
+        self.assertEqual([item.grade for item in self.items],
+                         ['0.7', '2.0', '1.0', '', '3.9'])
+        self.assertTrue(self.items[1].has_incomplete)
+        self.assertEqual(self.graderoster.changed_items(), self.items[1:5])
+
+        with self.assertRaises(ValueError):
+            self.graderoster.apply_grades({regid + ',A': {'is_auditor': True},
+                                           '1310071': '4.0'})
+        self.assertEqual(self.items[2].grade, '1.0')
+
+    def test_apply_grades_linear(self):
+        section = make_section(2000)
+        graderoster = GradeRoster.from_xhtml(
+            etree.fromstring(make_graderoster_xhtml(section, 2000)),
+            section=section, instructor=make_instructor(), lazy_persons=True)
+        grades = dict((item.student_label(), '4.0')
+                      for item in graderoster.items)
+
+        # Items are only compared through the index, never pairwise
+        with patch.object(GradeRosterItem, '__eq__') as eq:
+            results = graderoster.apply_grades(grades)
+            eq.assert_not_called()
+        # The label of a student's first enrollment is their regid, which
+        # also matches their duplicate enrollment
+        self.assertEqual(len(results['applied']), 1960)
+        self.assertEqual(len(results['ambiguous']), 40)
+        for labels in results['ambiguous'].values():
+            self.assertEqual(len(labels), 2)
+        self.assertEqual(results['unknown'], [])
+
+        # Their first enrollments are matched with a trailing comma
+        results = graderoster.apply_grades(dict(
+            (key + ',', '3.0') for key in results['ambiguous']))
+        self.assertEqual(len(results['applied']), 40)
+        for item in results['applied']:
+            self.assertIsNone(item.duplicate_code)
+        self.assertEqual(
+            [item.grade for item in graderoster.items].count('3.0'), 40)
+        self.assertEqual(set(item.grade for item in graderoster.items),
+                         set(['3.0', '4.0']))
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SWSTestGradeRosterChunked(TestCase):
+    def test_xhtml_chunks(self):
+        section = make_section(1000)
+        graderoster = GradeRoster.from_xhtml(
+            etree.fromstring(make_graderoster_xhtml(section, 1000)),
+            section=section, instructor=make_instructor(), lazy_persons=True)
+
+        chunks = list(graderoster.xhtml_chunks(chunk_size=16 * 1024))
+        self.assertGreater(len(chunks), 10)
+        for chunk in chunks[:-1]:
+            self.assertGreaterEqual(len(chunk), 16 * 1024)
+            self.assertLess(len(chunk), 20 * 1024)
+        self.assertEqual(b"".join(chunks),
+                         graderoster.xhtml().encode("utf-8"))
+
+        items = graderoster.items[10:20]
+        self.assertEqual(b"".join(graderoster.xhtml_chunks(items=items)),
+                         graderoster.xhtml(items=items).encode("utf-8"))
+
+    def test_chunked_update(self):
+        section = get_section_by_label('2013,autumn,EDC&I,461/A')
+        instructor = section.meetings[0].instructors[0]
+        graderoster = get_graderoster(section, instructor, instructor)
+        graderoster.items[0].grade = '2.5'
+        expected = update_graderoster(graderoster, instructor)
+
+        bodies = []
+        put_url = SWS_GradeRoster_DAO.putURL
+
+        def put(dao, url, headers, body):
+            bodies.append(body)
+            return put_url(dao, url, headers, body)
+
+        with patch.object(SWS_GradeRoster_DAO, 'putURL', put):
+            new_graderoster = update_graderoster(
+                graderoster, instructor, chunked=True)
+            self.assertEqual(new_graderoster.xhtml(), expected.xhtml())
+
+            graderoster.items[1].grade = '3.5'
+            new_graderoster = update_graderoster(
+                graderoster, instructor, chunked=True, delta=True,
+                merge=True)
+            self.assertIs(new_graderoster, graderoster)
+            self.assertEqual(graderoster.items[1].status_code, '200')
+
+        self.assertEqual(len(bodies), 2)
+        for body in bodies:
+            self.assertNotIsInstance(body, (str, bytes))
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SWSTestGradeRosters(TestCase):
+    def test_get_graderosters(self):
+        pairs = []
+        for label in ['2013,summer,CSS,161/A', '2013,autumn,EDC&I,461/A',
+                      '2013,spring,TRAIN,101/A']:
+            section = get_section_by_label(label)
+            pairs.append((section, section.meetings[0].instructors[-1]))
+        requestor = pairs[0][1]
+
+        results = {}
+        for section, instructor, graderoster in get_graderosters(
+                pairs, requestor, max_workers=2):
+            results[section.section_label()] = (instructor, graderoster)
+        self.assertEqual(len(results), 3)
+
+        for section, instructor in pairs[:2]:
+            (result_instructor, graderoster) = results[
+                section.section_label()]
+            self.assertIs(result_instructor, instructor)
+            self.assertEqual(len(graderoster.items), 5)
+            self.assertIs(graderoster.section, section)
+
+        (instructor, ex) = results['2013,spring,TRAIN,101/A']
+        self.assertIsInstance(ex, DataFailureException)
+        self.assertEqual(ex.status, 403)
+
+    def test_get_graderosters_early_exit(self):
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        instructor = section.meetings[0].instructors[0]
+        results = get_graderosters(
+            [(section, instructor)] * 4, instructor, max_workers=1)
+        (result_section, result_instructor, graderoster) = next(results)
+        self.assertEqual(len(graderoster.items), 5)
+        results.close()
@@ -0,0 +1,170 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster
+from uw_sws_graderoster.models import GradeRosterItem, nsmap
+from restclients_core.models.fields import BaseField
+from lxml import etree
+import os
+
+RESOURCE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "resources", "sws", "file", "student", "v5", "graderoster")
+
+ROSTERS = {
+    "2013,summer,CSS,161/A":
+        "2013_summer_CSS_161_A_FBB38FE46A7C11D5A4AE0004AC494FFE",
+    "2013,autumn,EDC&I,461/A":
+        "2013_autumn_EDC_I_461_A_FBB38FE46A7C11D5A4AE0004AC494FFE",
+}
+
+ITEM_XPATH = ".//*[@class='graderoster_items']/*[@class='graderoster_item']"
+
+
+def load_roster_items(filename):
+    tree = etree.parse(os.path.join(RESOURCE_PATH, filename))
+    return tree.xpath(ITEM_XPATH)
+
+
+def item_fields(gr_item):
+    fields = {}
+    for name, value in GradeRosterItem.__dict__.items():
+        if isinstance(value, BaseField):
+            fields[name] = getattr(gr_item, name)
+    fields["grade_choices"] = list(gr_item.grade_choices)
+    return fields
+
+
+def legacy_item_from_xhtml(tree, *args, **kwargs):
+    """
+    Reference copy of the original multi-xpath item parser, used to prove
+    parity with the single-pass parser.
+    """
+    gr_item = GradeRosterItem(*args, **kwargs)
+    gr_item.grade_choices = []
+    for el in tree.xpath(".//xhtml:a[@rel='student']/*[@class='reg_id']",
+                         namespaces=nsmap):
+        gr_item.student_uwregid = el.text.strip()
+
+    for el in tree.xpath(".//xhtml:a[@rel='student']/*[@class='name']",
+                         namespaces=nsmap):
+        try:
+            (surname, first_name) = el.text.split(",", 1)
+            gr_item.student_first_name = first_name.strip()
+            gr_item.student_surname = surname.strip()
+        except ValueError:
+            pass
+
+    for el in tree.xpath(".//*[@class]"):
+        classname = el.get("class")
+        if classname == "duplicate_code" and el.text is not None:
+            duplicate_code = el.text.strip()
+            if len(duplicate_code):
+                gr_item.duplicate_code = duplicate_code
+        elif classname == "section_id" and el.text is not None:
+            gr_item.section_id = el.text.strip()
+        elif classname == "student_former_name" and el.text is not None:
+            student_former_name = el.text.strip()
+            if len(student_former_name):
+                gr_item.student_former_name = student_former_name
+        elif classname == "student_number":
+            gr_item.student_number = el.text.strip()
+        elif classname == "student_credits" and el.text is not None:
+            gr_item.student_credits = el.text.strip()
+        elif "date_withdrawn" in classname and el.text is not None:
+            gr_item.date_withdrawn = el.text.strip()
+        elif classname == "incomplete":
+            if el.get("checked", "") == "checked":
+                gr_item.has_incomplete = True
+            if el.get("disabled", "") != "disabled":
+                gr_item.allows_incomplete = True
+        elif classname == "writing_course":
+            if el.get("checked", "") == "checked":
+                gr_item.has_writing_credit = True
+        elif classname == "auditor":
+            if el.get("checked", "") == "checked":
+                gr_item.is_auditor = True
+        elif classname == "no_grade_now":
+            if el.get("checked", "") == "checked":
+                gr_item.no_grade_now = True
+        elif classname == "grades":
+            if el.get("disabled", "") != "disabled":
+                gr_item.allows_grade_change = True
+        elif classname == "grade":
+            grade = el.text.strip() if el.text is not None else ""
+            gr_item.grade_choices.append(grade)
+            if el.get("selected", "") == "selected":
+                gr_item.grade = grade
+        elif classname == "grade_document_id" and el.text is not None:
+            gr_item.grade_document_id = el.text.strip()
+        elif "date_graded" in classname and el.text is not None:
+            gr_item.date_graded = el.text.strip()
+        elif classname == "grade_submitter_source" and el.text is not None:
+            gr_item.grade_submitter_source = el.text.strip()
+        elif classname == "code" and el.text is not None:
+            gr_item.status_code = el.text.strip()
+        elif classname == "message" and el.text is not None:
+            gr_item.status_message = el.text.strip()
+    return gr_item
+
+
+def legacy_submitter_regid(tree):
+    reg_id = None
+    xpath = ".//xhtml:a[@rel='grade_submitter_person']/*[@class='reg_id']"
+    for el in tree.xpath(xpath, namespaces=nsmap):
+        reg_id = el.text.strip()
+    return reg_id
+
+
+class GradeRosterItemParseTest(TestCase):
+    def test_item_parity(self):
+        for filename in ROSTERS.values():
+            items = load_roster_items(filename)
+            self.assertEqual(len(items), 5)
+            for el in items:
+                self.assertEqual(
+                    item_fields(GradeRosterItem.from_xhtml(
+                        el, section_id="A")),
+                    item_fields(legacy_item_from_xhtml(el, section_id="A")),
+                    filename)
+
+    def test_item_status(self):
+        el = etree.fromstring(
+            '<li class="graderoster_item">'
+            '<span class="date_graded date">2013-06-01</span>'
+            '<span class="date_withdrawn date"/>'
+            '<span class="code">500</span>'
+            '<span class="message">Invalid grade</span></li>')
+        gr_item = GradeRosterItem.from_xhtml(el)
+        self.assertEqual(gr_item.date_graded, "2013-06-01")
+        self.assertIsNone(gr_item.date_withdrawn)
+        self.assertEqual(gr_item.status_code, "500")
+        self.assertEqual(gr_item.status_message, "Invalid grade")
+        self.assertEqual(item_fields(gr_item),
+                         item_fields(legacy_item_from_xhtml(el)))
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterParseTest(TestCase):
+    def test_graderoster_parity(self):
+        for label, filename in ROSTERS.items():
+            section = get_section_by_label(label)
+            instructor = section.meetings[0].instructors[0]
+            graderoster = get_graderoster(section, instructor, instructor)
+
+            items = load_roster_items(filename)
+            self.assertEqual(len(graderoster.items), len(items))
+            for gr_item, el in zip(graderoster.items, items):
+                legacy = legacy_item_from_xhtml(
+                    el, section_id=section.section_id)
+                fields = item_fields(gr_item)
+                person = fields.pop("grade_submitter_person")
+                self.assertEqual(person.uwregid, legacy_submitter_regid(el))
+                legacy_fields = item_fields(legacy)
+                legacy_fields.pop("grade_submitter_person")
+                self.assertEqual(fields, legacy_fields, label)
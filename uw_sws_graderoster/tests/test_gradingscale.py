@@ -3,6 +3,7 @@
 
 from unittest import TestCase
 from uw_sws_graderoster.models import GradingScale
+from unittest.mock import patch
 
 
 class TestGradingScale(TestCase):
@@ -51,3 +52,32 @@ class TestGradingScale(TestCase):
         grading_options = ['4.0', '2.5', '0.0', 'i', 'NC', 'Cr', '']
         self.assertEqual(gs.sorted_scale(grading_options),
                          ['', 'I', 'CR', 'NC', '4.0', '2.5', '0.0'])
+
+    def test_exact_scale(self):
+        gs = GradingScale()
+
+        # Repeated grades don't match a scale
+        self.assertEqual(gs.is_any_scale(['P', 'F', 'F']), None)
+        self.assertEqual(gs.is_passfail_scale(['P', 'p']), False)
+        self.assertEqual(gs.is_any_scale(['f', 'p']), gs.PASSFAIL_SCALE)
+        self.assertEqual(gs.is_highpassfail_scale(['P', 'HP', 'F', 'H']),
+                         True)
+
+    def test_classify(self):
+        gs = GradingScale()
+        cnc_scale = ('CR', 'NC')
+        self.assertEqual(
+            gs.classify([cnc_scale, ['P', 'F'], [], cnc_scale, ['4.0']]),
+            [gs.CREDIT_SCALE, gs.PASSFAIL_SCALE, None, gs.CREDIT_SCALE,
+             None])
+
+        with patch.object(GradingScale, 'is_any_scale',
+                          autospec=True, return_value=None) as is_any_scale:
+            gs.classify([cnc_scale] * 100)
+            self.assertEqual(is_any_scale.call_count, 1)
+
+    def test_sorted_scale_copy(self):
+        gs = GradingScale()
+        scale = gs.sorted_scale(['P', 'F'])
+        scale.append('X')
+        self.assertEqual(gs.sorted_scale(['P', 'F']), ['P', 'F'])
@@ -0,0 +1,17 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_sws_graderoster.benchmarks import import_time
+
+# Loaded only when a roster is rendered, or people are resolved
+DEFERRED_MODULES = ("jinja2", "uw_pws", "uw_sws", "restclients_core.dao")
+
+
+class ImportTest(TestCase):
+    def test_deferred_imports(self):
+        for module in ["uw_sws_graderoster", "uw_sws_graderoster.models",
+                       "uw_sws_graderoster.compact"]:
+            (elapsed, modules) = import_time(module, repeat=1)
+            for name in DEFERRED_MODULES:
+                self.assertNotIn(name, modules, module)
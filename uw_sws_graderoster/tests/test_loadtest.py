@@ -0,0 +1,144 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster, update_graderoster
+from uw_sws_graderoster.dao import make_graderoster_submitted
+from uw_sws_graderoster.loadtest import (
+    LoadProfile, get_load_profile, set_load_profile)
+from uw_sws_graderoster.synthetic import make_section, make_instructor
+from restclients_core.exceptions import DataFailureException
+from commonconf import override_settings
+from unittest.mock import patch
+from lxml import etree
+
+LOADTEST_DAO = "uw_sws_graderoster.loadtest.GradeRosterLoadTestDAO"
+
+
+def item_statuses(graderoster):
+    return [(item.student_label(), item.status_code)
+            for item in graderoster.items]
+
+
+@fdao_pws_override
+@override_settings(RESTCLIENTS_SWS_DAO_CLASS=LOADTEST_DAO)
+class GradeRosterLoadTestTest(TestCase):
+    def setUp(self):
+        self.section = make_section(461)
+        self.instructor = make_instructor()
+
+    def tearDown(self):
+        set_load_profile(None)
+
+    def get_graderoster(self):
+        return get_graderoster(self.section, self.instructor, self.instructor)
+
+    def test_synthetic_rosters(self):
+        set_load_profile(LoadProfile(roster_size=250))
+        graderoster = self.get_graderoster()
+        self.assertEqual(len(graderoster.items), 250)
+        self.assertEqual(graderoster.xhtml(), self.get_graderoster().xhtml())
+
+        # Other resources are served from the mock resources
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        self.assertEqual(section.curriculum_abbr, 'CSS')
+
+    def test_item_failures(self):
+        set_load_profile(LoadProfile(item_failure_rate=0.3, seed=4))
+        graderoster = self.get_graderoster()
+
+        statuses = item_statuses(update_graderoster(
+            graderoster, self.instructor))
+        failed = [label for (label, status) in statuses if status == '500']
+        self.assertTrue(0 < len(failed) < len(statuses))
+
+        # The same items fail on every submission
+        self.assertEqual(item_statuses(update_graderoster(
+            graderoster, self.instructor)), statuses)
+
+        set_load_profile(LoadProfile(item_failure_rate=0.3, seed=5))
+        self.assertNotEqual(item_statuses(update_graderoster(
+            graderoster, self.instructor)), statuses)
+
+    def test_bursts(self):
+        set_load_profile(LoadProfile(
+            burst_rate=0.2, burst_length=3, burst_status=503, seed=1))
+        results = []
+        for idx in range(30):
+            try:
+                self.get_graderoster()
+                results.append(200)
+            except DataFailureException as ex:
+                results.append(ex.status)
+
+        self.assertIn(503, results)
+        self.assertIn(200, results)
+        # Errors come in bursts of burst_length requests
+        self.assertEqual(results.count(503) % 3, 0)
+
+        set_load_profile(LoadProfile(
+            burst_rate=0.2, burst_length=3, burst_status=503, seed=1))
+        again = []
+        for idx in range(30):
+            try:
+                self.get_graderoster()
+                again.append(200)
+            except DataFailureException as ex:
+                again.append(ex.status)
+        self.assertEqual(again, results)
+
+    def test_latency(self):
+        set_load_profile(LoadProfile(latency="uniform:0.1,0.2"))
+        with patch('uw_sws_graderoster.loadtest.time.sleep') as sleep:
+            self.get_graderoster()
+            self.get_graderoster()
+        self.assertEqual(sleep.call_count, 2)
+        for call in sleep.call_args_list:
+            self.assertTrue(0.1 <= call.args[0] <= 0.2)
+
+        self.assertRaises(ValueError, LoadProfile, latency="gamma:1")
+
+    def test_settings(self):
+        set_load_profile(None)
+        with override_settings(GRADEROSTER_LOADTEST_ROSTER_SIZE="12",
+                               GRADEROSTER_LOADTEST_LATENCY="exponential:1",
+                               GRADEROSTER_LOADTEST_BURST_STATUS="429"):
+            profile = get_load_profile()
+        self.assertEqual(profile.roster_size, 12)
+        self.assertEqual(profile.burst_status, 429)
+        self.assertIs(get_load_profile(), profile)
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterSubmittedTest(TestCase):
+    def test_partial_submissions(self):
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        instructor = section.meetings[0].instructors[0]
+        graderoster = get_graderoster(section, instructor, instructor)
+
+        with override_settings(GRADEROSTER_PARTIAL_SUBMISSIONS=True,
+                               GRADEROSTER_PARTIAL_SUBMISSIONS_SEED=7):
+            statuses = item_statuses(
+                update_graderoster(graderoster, instructor))
+            self.assertEqual(item_statuses(
+                update_graderoster(graderoster, instructor)), statuses)
+
+    def test_make_graderoster_submitted(self):
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        instructor = section.meetings[0].instructors[0]
+        body = get_graderoster(section, instructor, instructor).xhtml()
+
+        root = etree.fromstring(make_graderoster_submitted(body))
+        self.assertEqual(
+            [el.text for el in root.iterfind('.//*[@class="code"]')],
+            ['200'] * 5)
+
+        root = etree.fromstring(
+            make_graderoster_submitted(body, failure_rate=1.0))
+        self.assertEqual(
+            [el.text for el in root.iterfind('.//*[@class="message"]')],
+            ['Invalid grade'] * 5)
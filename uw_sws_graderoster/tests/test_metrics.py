@@ -0,0 +1,138 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase, IsolatedAsyncioTestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import (
+    get_graderoster, update_graderoster, async_get_graderoster)
+from uw_sws_graderoster.metrics import (
+    add_metrics_sink, remove_metrics_sink, start_metrics, timed)
+from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster.people import get_person_cache
+from uw_sws_graderoster.retry import RetryPolicy, set_retry_policy
+from restclients_core.models import MockHTTP
+from unittest.mock import patch
+from restclients_core.exceptions import DataFailureException
+
+
+class MetricsTestMixin(object):
+    def setUp(self):
+        self.section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = self.section.meetings[0].instructors[0]
+        self.reports = []
+        add_metrics_sink(self.reports.append)
+        get_person_cache().clear()
+
+    def tearDown(self):
+        remove_metrics_sink(self.reports.append)
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterMetricsTest(MetricsTestMixin, TestCase):
+    def test_get_graderoster(self):
+        get_graderoster(self.section, self.instructor, self.instructor)
+
+        self.assertEqual(len(self.reports), 1)
+        metrics = self.reports[0]
+        self.assertEqual(metrics.operation, "get_graderoster")
+        self.assertEqual(set(metrics.timings.keys()),
+                         set(["request", "parse", "people"]))
+        self.assertLessEqual(metrics.timings["people"],
+                             metrics.timings["parse"])
+        self.assertEqual(metrics.counts["items"], 5)
+        self.assertEqual(metrics.counts["pws_lookups"], 2)
+        self.assertGreater(metrics.counts["response_bytes"], 0)
+        self.assertIsNone(metrics.error)
+
+        # The people are cached by the first request
+        get_graderoster(self.section, self.instructor, self.instructor)
+        self.assertEqual(self.reports[1].counts["pws_lookups"], 0)
+
+    def test_update_graderoster(self):
+        graderoster = get_graderoster(
+            self.section, self.instructor, self.instructor)
+        update_graderoster(graderoster, self.instructor)
+
+        metrics = self.reports[1]
+        self.assertEqual(metrics.operation, "update_graderoster")
+        self.assertEqual(set(metrics.timings.keys()),
+                         set(["render", "request", "parse", "people"]))
+        self.assertEqual(metrics.counts["items"], 5)
+        self.assertEqual(metrics.counts["request_bytes"],
+                         len(graderoster.xhtml().encode("utf-8")))
+
+    def test_chunked_update(self):
+        graderoster = get_graderoster(
+            self.section, self.instructor, self.instructor)
+        set_retry_policy(RetryPolicy(max_attempts=2, backoff=0))
+        response = MockHTTP()
+        response.status = 503
+        responses = [response]
+        put_url = SWS_GradeRoster_DAO.putURL
+
+        def put(dao, url, headers, body):
+            if len(responses):
+                list(body)
+                return responses.pop()
+            return put_url(dao, url, headers, body)
+
+        try:
+            with patch.object(SWS_GradeRoster_DAO, 'putURL', put):
+                update_graderoster(graderoster, self.instructor,
+                                   chunked=True)
+        finally:
+            set_retry_policy(None)
+
+        # The body of the retried request isn't counted twice
+        metrics = self.reports[1]
+        self.assertEqual(metrics.counts["retries"], 1)
+        self.assertEqual(set(metrics.timings.keys()),
+                         set(["render", "request", "parse", "people"]))
+        self.assertEqual(metrics.counts["request_bytes"],
+                         len(graderoster.xhtml().encode("utf-8")))
+
+    def test_stream(self):
+        graderoster = get_graderoster(
+            self.section, self.instructor, self.instructor, stream=True)
+        self.assertEqual(len(graderoster.items), 5)
+
+        self.assertEqual(len(self.reports), 1)
+        metrics = self.reports[0]
+        self.assertEqual(set(metrics.timings.keys()),
+                         set(["request", "parse", "people"]))
+        self.assertNotIn("items", metrics.counts)
+
+    def test_error(self):
+        section = get_section_by_label('2013,spring,TRAIN,101/A')
+        with self.assertRaises(DataFailureException):
+            get_graderoster(section, section.meetings[0].instructors[1],
+                            self.instructor)
+
+        metrics = self.reports[0]
+        self.assertIsInstance(metrics.error, DataFailureException)
+        self.assertIn("request", metrics.timings)
+
+    def test_no_sink(self):
+        remove_metrics_sink(self.reports.append)
+        self.assertIsNone(start_metrics("get_graderoster"))
+        self.assertEqual(timed(None, "parse", len, "abc"), 3)
+
+        get_graderoster(self.section, self.instructor, self.instructor)
+        self.assertEqual(self.reports, [])
+
+
+@fdao_pws_override
+@fdao_sws_override
+class AsyncGradeRosterMetricsTest(MetricsTestMixin, IsolatedAsyncioTestCase):
+    async def test_async_get_graderoster(self):
+        await async_get_graderoster(
+            self.section, self.instructor, self.instructor)
+
+        metrics = self.reports[0]
+        self.assertEqual(metrics.operation, "async_get_graderoster")
+        self.assertEqual(set(metrics.timings.keys()),
+                         set(["request", "parse", "people"]))
+        self.assertEqual(metrics.counts["items"], 5)
@@ -0,0 +1,90 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from unittest.mock import patch
+from uw_pws.util import fdao_pws_override
+from uw_sws_graderoster.people import (
+    PersonCache, PersonReference, get_person_cache, get_people_by_regid)
+from restclients_core.exceptions import DataFailureException
+
+REG_IDS = ["FBB38FE46A7C11D5A4AE0004AC494FFE",
+           "6DF0A9206A7D11D5A4AE0004AC494FFE",
+           "260A0DEC95CB11D78BAA000629C31437"]
+
+
+class PersonCacheTest(TestCase):
+    def test_lru(self):
+        cache = PersonCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 1, "size": 2})
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "size": 0})
+
+    @patch("uw_sws_graderoster.people.time.monotonic")
+    def test_ttl(self, mock_monotonic):
+        cache = PersonCache(ttl=60)
+        mock_monotonic.return_value = 100
+        cache.set("a", 1)
+        mock_monotonic.return_value = 159
+        self.assertEqual(cache.get("a"), 1)
+        mock_monotonic.return_value = 160
+        self.assertEqual(cache.get("a"), None)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_disabled(self):
+        cache = PersonCache(ttl=0)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), None)
+
+
+@fdao_pws_override
+class GetPeopleTest(TestCase):
+    def setUp(self):
+        get_person_cache().clear()
+
+    def test_get_people_by_regid(self):
+        people = get_people_by_regid(REG_IDS + REG_IDS[:1], max_workers=2)
+        self.assertEqual(sorted(people.keys()), sorted(REG_IDS))
+        for reg_id, person in people.items():
+            self.assertEqual(person.uwregid, reg_id)
+        self.assertEqual(get_person_cache().stats()["misses"], 3)
+
+        cached = get_people_by_regid(REG_IDS)
+        self.assertEqual(cached, people)
+        self.assertEqual(get_person_cache().stats(),
+                         {"hits": 3, "misses": 3, "size": 3})
+
+    def test_invalid_person(self):
+        self.assertRaises(DataFailureException, get_people_by_regid,
+                          ["9136CCB8F66711D5BE060004AC494F31",
+                           REG_IDS[0]])
+
+
+@fdao_pws_override
+class PersonReferenceTest(TestCase):
+    def setUp(self):
+        get_person_cache().clear()
+
+    def test_person_reference(self):
+        person = PersonReference(REG_IDS[1], surname="TEACHER",
+                                 first_name="FRED AVERAGE")
+        self.assertEqual(person.uwregid, REG_IDS[1])
+        self.assertEqual(person.surname, "TEACHER")
+        self.assertFalse(person.is_resolved())
+
+        self.assertEqual(person.uwnetid, "fred")
+        self.assertTrue(person.is_resolved())
+        self.assertRaises(AttributeError, getattr, person, "_missing")
+
+    def test_unnamed_reference(self):
+        person = PersonReference(REG_IDS[1])
+        self.assertEqual(person.surname, "TEACHER")
+        self.assertTrue(person.is_resolved())
@@ -0,0 +1,198 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster, update_graderoster
+from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster.loadtest import LoadProfile, set_load_profile
+from uw_sws_graderoster.metrics import add_metrics_sink, remove_metrics_sink
+from uw_sws_graderoster.retry import (
+    RetryPolicy, CircuitBreaker, CircuitOpenException, get_retry_policy,
+    set_retry_policy, get_circuit_breaker, set_circuit_breaker)
+from uw_sws_graderoster.synthetic import make_section, make_instructor
+from restclients_core.exceptions import DataFailureException
+from restclients_core.models import MockHTTP
+from commonconf import override_settings
+from unittest.mock import patch
+
+LOADTEST_DAO = "uw_sws_graderoster.loadtest.GradeRosterLoadTestDAO"
+
+
+def mock_response(status, data, headers=None):
+    response = MockHTTP()
+    response.status = status
+    response.data = data
+    response.headers = headers or {}
+    return response
+
+
+class FlakyDAO(object):
+    """
+    Wraps a DAO method, returning the passed responses before calling it.
+    """
+    def __init__(self, method, responses):
+        self.method = method
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, *args):
+        self.calls.append(args)
+        if len(self.responses):
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return self.method(SWS_GradeRoster_DAO(), *args)
+
+
+@fdao_pws_override
+@fdao_sws_override
+@patch('uw_sws_graderoster.retry.sleep')
+class GradeRosterRetryTest(TestCase):
+    def setUp(self):
+        self.section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = self.section.meetings[0].instructors[0]
+        set_retry_policy(RetryPolicy(max_attempts=3, backoff=0.1, seed=0))
+        set_circuit_breaker(CircuitBreaker(failure_threshold=0))
+
+    def tearDown(self):
+        set_retry_policy(None)
+        set_circuit_breaker(None)
+
+    def get_graderoster(self):
+        return get_graderoster(self.section, self.instructor, self.instructor)
+
+    def test_get_retried(self, sleep):
+        flaky = FlakyDAO(SWS_GradeRoster_DAO.getURL, [
+            mock_response(503, "Service Unavailable",
+                          {"Retry-After": "2"}),
+            DataFailureException("/", 0, "Connection refused")])
+
+        reports = []
+        add_metrics_sink(reports.append)
+        try:
+            with patch.object(SWS_GradeRoster_DAO, 'getURL', flaky):
+                graderoster = self.get_graderoster()
+        finally:
+            remove_metrics_sink(reports.append)
+
+        self.assertEqual(len(graderoster.items), 5)
+        self.assertEqual(len(flaky.calls), 3)
+        self.assertEqual(reports[0].counts["retries"], 2)
+
+        # Retry-After is honoured
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(sleep.call_args_list[0].args[0], 2.0)
+        self.assertLessEqual(sleep.call_args_list[1].args[0], 0.2)
+
+    def test_get_gives_up(self, sleep):
+        flaky = FlakyDAO(SWS_GradeRoster_DAO.getURL, [
+            mock_response(503, "Service Unavailable")] * 3)
+        with patch.object(SWS_GradeRoster_DAO, 'getURL', flaky):
+            with self.assertRaises(DataFailureException) as cm:
+                self.get_graderoster()
+        self.assertEqual(cm.exception.status, 503)
+        self.assertEqual(cm.exception.msg, "Service Unavailable")
+        self.assertEqual(len(flaky.calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+        flaky = FlakyDAO(SWS_GradeRoster_DAO.getURL, [
+            DataFailureException("/", 0, "Connection refused")] * 3)
+        with patch.object(SWS_GradeRoster_DAO, 'getURL', flaky):
+            with self.assertRaises(DataFailureException) as cm:
+                self.get_graderoster()
+        self.assertEqual(cm.exception.status, 0)
+
+    def test_not_retried(self, sleep):
+        flaky = FlakyDAO(SWS_GradeRoster_DAO.getURL, [
+            mock_response(404, b"<html>Not Found")])
+        with patch.object(SWS_GradeRoster_DAO, 'getURL', flaky):
+            with self.assertRaises(DataFailureException) as cm:
+                self.get_graderoster()
+        self.assertEqual(cm.exception.msg, "<html>Not Found")
+        self.assertEqual(len(flaky.calls), 1)
+        self.assertEqual(sleep.call_count, 0)
+
+    def test_put_retried(self, sleep):
+        graderoster = self.get_graderoster()
+        flaky = FlakyDAO(SWS_GradeRoster_DAO.putURL, [
+            mock_response(502, "")])
+        with patch.object(SWS_GradeRoster_DAO, 'putURL', flaky):
+            new_graderoster = update_graderoster(graderoster, self.instructor)
+
+        self.assertEqual(len(new_graderoster.items), 5)
+        self.assertEqual(len(flaky.calls), 2)
+        self.assertEqual(flaky.calls[0], flaky.calls[1])
+
+    def test_circuit_breaker(self, sleep):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        set_circuit_breaker(breaker)
+
+        flaky = FlakyDAO(SWS_GradeRoster_DAO.getURL, [
+            mock_response(500, "Internal Server Error")] * 3)
+        with patch('uw_sws_graderoster.retry.monotonic',
+                   return_value=100.0):
+            with patch.object(SWS_GradeRoster_DAO, 'getURL', flaky):
+                self.assertRaises(DataFailureException, self.get_graderoster)
+                self.assertTrue(breaker.is_open())
+
+                # Requests fail fast while the circuit is open
+                with self.assertRaises(CircuitOpenException) as cm:
+                    self.get_graderoster()
+                self.assertEqual(cm.exception.status, 503)
+            self.assertEqual(len(flaky.calls), 3)
+
+        # After the reset timeout, a successful request closes the circuit
+        with patch('uw_sws_graderoster.retry.monotonic',
+                   return_value=131.0):
+            self.assertFalse(breaker.is_open())
+            self.assertEqual(len(self.get_graderoster().items), 5)
+        self.assertEqual(breaker.failures, 0)
+        self.assertFalse(breaker.is_open())
+
+    def test_delay(self, sleep):
+        policy = RetryPolicy(backoff=0.5, max_backoff=4.0, seed=1)
+        for attempt in range(8):
+            delay = policy.delay(attempt)
+            self.assertTrue(0 <= delay <= min(4.0, 0.5 * 2 ** attempt))
+        self.assertEqual(policy.delay(0, retry_after="3"), 3.0)
+        self.assertEqual(policy.delay(0, retry_after="120"), 4.0)
+        self.assertLessEqual(policy.delay(0, retry_after="soon"), 0.5)
+
+    def test_settings(self, sleep):
+        set_retry_policy(None)
+        set_circuit_breaker(None)
+        with override_settings(GRADEROSTER_RETRY_ATTEMPTS="4",
+                               GRADEROSTER_CIRCUIT_FAILURE_THRESHOLD="10"):
+            policy = get_retry_policy()
+            breaker = get_circuit_breaker()
+        self.assertEqual(policy.max_attempts, 4)
+        self.assertEqual(breaker.failure_threshold, 10)
+        self.assertIs(get_retry_policy(), policy)
+
+
+@fdao_pws_override
+@override_settings(RESTCLIENTS_SWS_DAO_CLASS=LOADTEST_DAO)
+@patch('uw_sws_graderoster.retry.sleep')
+class GradeRosterLoadTestRetryTest(TestCase):
+    def tearDown(self):
+        set_load_profile(None)
+        set_retry_policy(None)
+        set_circuit_breaker(None)
+
+    def test_bursts(self, sleep):
+        set_load_profile(LoadProfile(
+            burst_rate=0.2, burst_length=2, burst_status=503, seed=1))
+        set_retry_policy(RetryPolicy(max_attempts=8))
+        set_circuit_breaker(CircuitBreaker(failure_threshold=0))
+
+        section = make_section(30)
+        instructor = make_instructor()
+        for idx in range(20):
+            graderoster = get_graderoster(section, instructor, instructor)
+            self.assertEqual(len(graderoster.items), 30)
+        # Every error burst is retried through
+        self.assertGreater(sleep.call_count, 0)
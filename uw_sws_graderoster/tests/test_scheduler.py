@@ -0,0 +1,240 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster
+from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster.scheduler import (
+    SubmissionScheduler, get_submission_scheduler, set_submission_scheduler)
+from uw_sws_graderoster.validation import InvalidGradeRosterException
+from restclients_core.exceptions import DataFailureException
+from restclients_core.models import MockHTTP
+from commonconf import override_settings
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Event, Lock
+from unittest.mock import patch
+import time
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SubmissionSchedulerTest(TestCase):
+    def setUp(self):
+        self.section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = self.section.meetings[0].instructors[0]
+        self.delegate = self.get_graderoster().grade_submission_delegates[
+            0].person
+        self.scheduler = SubmissionScheduler(window=0.2)
+
+        # Counts the update requests, and the items each one submits
+        self.puts = []
+        put_lock = Lock()
+        put_url = SWS_GradeRoster_DAO.putURL
+
+        def put(dao, url, headers, body):
+            with put_lock:
+                self.puts.append((headers["X-UW-Act-as"], body.count(
+                    'class="graderoster_item"')))
+            return put_url(dao, url, headers, body)
+
+        patcher = patch.object(SWS_GradeRoster_DAO, 'putURL', put)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_graderoster(self):
+        return get_graderoster(self.section, self.instructor, self.instructor)
+
+    def submit_all(self, submissions):
+        # Submits each (graderoster, requestor) pair on its own thread, all
+        # at once
+        barrier = Barrier(len(submissions))
+
+        def submit(graderoster, requestor):
+            barrier.wait()
+            return self.scheduler.submit(graderoster, requestor)
+
+        with ThreadPoolExecutor(max_workers=len(submissions)) as executor:
+            futures = [executor.submit(submit, graderoster, requestor)
+                       for (graderoster, requestor) in submissions]
+            return [future.result() for future in futures]
+
+    def test_coalesce(self):
+        graderosters = [self.get_graderoster() for idx in range(5)]
+        labels = [item.student_label() for item in graderosters[0].items]
+        for idx, grade in [(0, "3.5"), (2, "2.5"), (4, "1.5")]:
+            graderosters[idx].items[idx].grade = grade
+        graderosters[1].items[0].has_incomplete = False
+        graderosters[3].items[2].no_grade_now = True
+
+        results = self.submit_all(
+            [(graderoster, self.instructor) for graderoster in graderosters])
+
+        # One request, with the five changed fields of three students
+        self.assertEqual(self.puts, [("bill", 3)])
+        self.assertEqual(results[0], {labels[0]: {
+            "status_code": "200", "status_message": None, "grade": "3.5"}})
+        self.assertEqual(list(results[1].keys()), [labels[0]])
+        self.assertEqual(results[2][labels[2]]["grade"], "2.5")
+        self.assertEqual(results[3][labels[2]]["status_code"], "200")
+        self.assertEqual(results[4][labels[4]]["grade"], "1.5")
+
+        # The graderosters of the submitters aren't modified
+        self.assertEqual(graderosters[0].items[0].grade, "3.5")
+        self.assertTrue(graderosters[0].items[0].has_incomplete)
+        self.assertTrue(graderosters[0].items[0].is_changed())
+
+    def test_requestors(self):
+        graderosters = [self.get_graderoster() for idx in range(4)]
+        for idx, graderoster in enumerate(graderosters):
+            graderoster.items[idx].grade = "3.0"
+
+        results = self.submit_all([
+            (graderosters[0], self.instructor),
+            (graderosters[1], self.delegate),
+            (graderosters[2], self.instructor),
+            (graderosters[3], self.delegate)])
+
+        self.assertEqual(sorted(self.puts), [("bill", 2), ("fred", 2)])
+        for idx, result in enumerate(results):
+            label = graderosters[idx].items[idx].student_label()
+            self.assertEqual(result[label]["grade"], "3.0")
+            self.assertEqual(result[label]["status_code"], "200")
+
+    def test_last_change(self):
+        first = self.get_graderoster()
+        second = self.get_graderoster()
+        first.items[0].grade = "3.5"
+        second.items[0].grade = "2.0"
+        label = first.items[0].student_label()
+
+        # The first submission's window stays open until the second joins
+        joined = Event()
+        with patch('uw_sws_graderoster.scheduler.sleep',
+                   lambda window: joined.wait()):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                future = executor.submit(
+                    self.scheduler.submit, first, self.instructor)
+                self.wait_for_batch(first, 1)
+                second_future = executor.submit(
+                    self.scheduler.submit, second, self.instructor)
+                self.wait_for_batch(first, 2)
+                joined.set()
+                results = [future.result(), second_future.result()]
+
+        self.assertEqual(len(self.puts), 1)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0][label]["grade"], "2.0")
+
+    def test_slow_requestor(self):
+        first = self.get_graderoster()
+        second = self.get_graderoster()
+        first.items[0].grade = "3.5"
+        second.items[1].grade = "2.0"
+
+        # The delegate's request is held until the instructor's returns
+        joined = Event()
+        released = Event()
+        put_url = SWS_GradeRoster_DAO.putURL
+
+        def put(dao, url, headers, body):
+            if headers["X-UW-Act-as"] == "fred":
+                released.wait(5)
+            return put_url(dao, url, headers, body)
+
+        with patch('uw_sws_graderoster.scheduler.sleep',
+                   lambda window: joined.wait()), \
+                patch.object(SWS_GradeRoster_DAO, 'putURL', put):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                future = executor.submit(
+                    self.scheduler.submit, first, self.instructor)
+                self.wait_for_batch(first, 1)
+                delegate_future = executor.submit(
+                    self.scheduler.submit, second, self.delegate)
+                self.wait_for_batch(first, 2)
+                joined.set()
+
+                result = future.result(timeout=5)
+                self.assertFalse(delegate_future.done())
+                released.set()
+                delegate_result = delegate_future.result(timeout=5)
+
+        label = first.items[0].student_label()
+        self.assertEqual(result[label]["grade"], "3.5")
+        label = second.items[1].student_label()
+        self.assertEqual(delegate_result[label]["status_code"], "200")
+
+    def wait_for_batch(self, graderoster, size):
+        label = graderoster.graderoster_label()
+        for idx in range(500):
+            with self.scheduler._lock:
+                if len(self.scheduler._batches.get(label, ())) == size:
+                    return
+            time.sleep(0.01)
+        self.fail("Batch of {} not opened".format(size))
+
+    @override_settings(GRADEROSTER_PARTIAL_SUBMISSIONS=True)
+    def test_partial_failures(self):
+        graderosters = [self.get_graderoster() for idx in range(5)]
+        for idx, graderoster in enumerate(graderosters):
+            graderoster.items[idx].grade = "2.0"
+
+        results = self.submit_all(
+            [(graderoster, self.instructor) for graderoster in graderosters])
+
+        self.assertEqual(len(self.puts), 1)
+        statuses = [list(result.values())[0]["status_code"]
+                    for result in results]
+        self.assertIn("500", statuses)
+        self.assertIn("200", statuses)
+        for result in results:
+            (status,) = result.values()
+            self.assertEqual(status["status_message"], "Invalid grade"
+                             if status["status_code"] == "500" else None)
+
+    def test_failure(self):
+        response = MockHTTP()
+        response.status = 500
+        response.data = "Server Error"
+
+        graderosters = [self.get_graderoster() for idx in range(3)]
+        for idx, graderoster in enumerate(graderosters):
+            graderoster.items[idx].grade = "2.0"
+
+        with patch.object(SWS_GradeRoster_DAO, 'putURL',
+                          return_value=response) as put:
+            with self.assertRaises(DataFailureException):
+                self.submit_all([(graderoster, self.instructor)
+                                 for graderoster in graderosters])
+            self.assertEqual(put.call_count, 1)
+
+    def test_unchanged(self):
+        self.assertEqual(self.scheduler.submit(
+            self.get_graderoster(), self.instructor), {})
+        self.assertEqual(self.puts, [])
+
+    def test_validate(self):
+        scheduler = SubmissionScheduler(window=0, validate=True)
+        graderoster = self.get_graderoster()
+        graderoster.items[0].grade = "5.0"
+        with self.assertRaises(InvalidGradeRosterException):
+            scheduler.submit(graderoster, self.instructor)
+        self.assertEqual(self.puts, [])
+        self.assertEqual(scheduler._batches, {})
+
+        graderoster.items[0].grade = "4.0"
+        result = scheduler.submit(graderoster, self.instructor)
+        self.assertEqual(list(result.values())[0]["grade"], "4.0")
+        self.assertEqual(len(self.puts), 1)
+
+    @override_settings(GRADEROSTER_SUBMISSION_WINDOW="0.05")
+    def test_shared_scheduler(self):
+        set_submission_scheduler(None)
+        try:
+            scheduler = get_submission_scheduler()
+            self.assertEqual(scheduler.window, 0.05)
+            self.assertIs(get_submission_scheduler(), scheduler)
+        finally:
+            set_submission_scheduler(None)
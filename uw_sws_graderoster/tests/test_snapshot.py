@@ -0,0 +1,127 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster
+from uw_sws_graderoster.models import (
+    GradeRoster, GradeRosterItem, SNAPSHOT_MAGIC)
+from uw_sws_graderoster.people import PersonReference
+from restclients_core.models import BaseField
+from datetime import date, datetime
+import zlib
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterSnapshotTest(TestCase):
+    def setUp(self):
+        self.graderosters = []
+        for label in ['2013,summer,CSS,161/A', '2013,autumn,EDC&I,461/A']:
+            section = get_section_by_label(label)
+            instructor = section.meetings[0].instructors[0]
+            self.graderosters.append(
+                get_graderoster(section, instructor, instructor))
+
+    def restore(self, graderoster, snapshot=None):
+        return GradeRoster.from_snapshot(
+            graderoster.to_snapshot() if snapshot is None else snapshot,
+            section=graderoster.section, instructor=graderoster.instructor)
+
+    def test_round_trip(self):
+        for graderoster in self.graderosters:
+            snapshot = graderoster.to_snapshot()
+            self.assertTrue(snapshot.startswith(SNAPSHOT_MAGIC))
+            self.assertLess(len(snapshot), len(graderoster.xhtml()))
+
+            restored = self.restore(graderoster, snapshot)
+            self.assertEqual(restored.xhtml(), graderoster.xhtml())
+            self.assertEqual(restored.section_credits,
+                             graderoster.section_credits)
+            self.assertEqual(restored.allows_writing_credit,
+                             graderoster.allows_writing_credit)
+            self.assertEqual(len(restored.items), len(graderoster.items))
+
+            for item, new_item in zip(graderoster.items, restored.items):
+                for name, field in GradeRosterItem.__dict__.items():
+                    if (isinstance(field, BaseField) and
+                            name != "grade_submitter_person"):
+                        self.assertEqual(getattr(new_item, name),
+                                         getattr(item, name), name)
+                self.assertEqual(new_item.grade_choices, item.grade_choices)
+                self.assertFalse(new_item.is_changed())
+
+            # A restored roster can be snapshot again
+            self.assertEqual(self.restore(restored).xhtml(),
+                             graderoster.xhtml())
+
+    def test_people(self):
+        graderoster = self.graderosters[1]
+        restored = self.restore(graderoster)
+
+        self.assertIs(restored.instructor, graderoster.instructor)
+        for delegate, new_delegate in zip(
+                graderoster.grade_submission_delegates,
+                restored.grade_submission_delegates):
+            person = new_delegate.person
+            self.assertIsInstance(person, PersonReference)
+            self.assertFalse(person.is_resolved())
+            self.assertEqual(person.uwregid, delegate.person.uwregid)
+            self.assertEqual(person.surname, delegate.person.surname)
+            self.assertEqual(new_delegate.delegate_level,
+                             delegate.delegate_level)
+
+        # People are shared, and resolved on demand
+        submitters = set(id(item.grade_submitter_person)
+                         for item in restored.items
+                         if item.grade_submitter_person is not None)
+        self.assertLessEqual(len(submitters), 2)
+        person = restored.grade_submission_delegates[0].person
+        self.assertEqual(person.display_name, graderoster
+                         .grade_submission_delegates[0].person.display_name)
+        self.assertTrue(person.is_resolved())
+
+    def test_changed_items(self):
+        graderoster = self.graderosters[0]
+        graderoster.items[0].grade = "3.9"
+
+        restored = self.restore(graderoster)
+        self.assertEqual(restored.items[0].grade, "3.9")
+        self.assertEqual(restored.changed_items(), [])
+
+    def test_dates(self):
+        graderoster = self.graderosters[0]
+        graderoster.items[0].date_graded = date(2013, 1, 1)
+        graderoster.items[1].date_withdrawn = datetime(2013, 7, 1, 12, 30)
+
+        restored = self.restore(graderoster)
+        self.assertEqual(restored.items[0].date_graded, date(2013, 1, 1))
+        self.assertEqual(restored.items[1].date_withdrawn,
+                         datetime(2013, 7, 1, 12, 30))
+        self.assertEqual(restored.items[2].date_graded,
+                         graderoster.items[2].date_graded)
+
+        graderoster.items[0].grade = object()
+        self.assertRaises(ValueError, graderoster.to_snapshot)
+
+    def test_invalid_snapshots(self):
+        (graderoster, other) = self.graderosters
+        snapshot = graderoster.to_snapshot()
+
+        self.assertRaises(ValueError, self.restore, other, snapshot)
+        self.assertRaises(ValueError, self.restore, graderoster,
+                          b"<html/>")
+
+        version = len(SNAPSHOT_MAGIC)
+        self.assertRaises(
+            ValueError, self.restore, graderoster,
+            snapshot[:version] + b"\x00" + snapshot[version + 1:])
+
+        # Short, truncated or corrupt snapshots
+        for data in [b"", SNAPSHOT_MAGIC, snapshot[:version + 1],
+                     snapshot[:len(snapshot) // 2],
+                     snapshot[:version + 1] + zlib.compress(b"[1, 2]"),
+                     snapshot[:version + 1] + zlib.compress(b"{")]:
+            self.assertRaises(ValueError, self.restore, graderoster, data)
@@ -0,0 +1,91 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws_graderoster.benchmarks import (
+    run_benchmarks, save_results, load_results, compare_results)
+from uw_sws_graderoster.models import GradeRoster
+from uw_sws_graderoster.synthetic import (
+    make_graderoster_xhtml, make_section, make_instructor)
+from restclients_core.dao import MockDAO
+from tempfile import TemporaryDirectory
+from lxml import etree
+import os
+
+
+@fdao_pws_override
+@fdao_sws_override
+class SyntheticGradeRosterTest(TestCase):
+    def test_generator(self):
+        section = make_section(300)
+        document = make_graderoster_xhtml(section, 300)
+        self.assertEqual(document, make_graderoster_xhtml(section, 300))
+        self.assertNotEqual(
+            document, make_graderoster_xhtml(section, 300, seed=1))
+        self.assertIn("EDC&amp;I", document)
+
+        graderoster = GradeRoster.from_xhtml(
+            etree.fromstring(document), section=section,
+            instructor=make_instructor())
+        items = graderoster.items
+        self.assertEqual(len(items), 300)
+        self.assertEqual(len(graderoster.grade_submission_delegates), 2)
+        self.assertEqual(
+            set(item.section_id for item in items), set(["A", "AA", "AB"]))
+        self.assertEqual(
+            len([item for item in items if item.duplicate_code]), 6)
+        self.assertEqual(len(set(item.student_label() for item in items)),
+                         300)
+
+        # Each duplicate enrollment shares the regid and student number of
+        # the preceding student
+        self.assertEqual(len(set(item.student_uwregid for item in items)),
+                         294)
+        for idx, item in enumerate(items):
+            if item.duplicate_code:
+                self.assertEqual(item.student_uwregid,
+                                 items[idx - 1].student_uwregid)
+                self.assertEqual(item.student_number,
+                                 items[idx - 1].student_number)
+        index = graderoster.index()
+        self.assertEqual(len(index.find(items[49].student_uwregid)), 2)
+
+        graded = [item for item in items if item.date_graded]
+        self.assertTrue(0 < len(graded) < 300)
+        for item in graded:
+            self.assertIsNotNone(item.grade)
+            self.assertIsNotNone(item.grade_submitter_person)
+
+        # The rendered roster parses back to the same document
+        xhtml = graderoster.xhtml()
+        self.assertEqual(GradeRoster.from_xhtml(
+            etree.fromstring(xhtml), section=section,
+            instructor=graderoster.instructor).xhtml(), xhtml)
+
+    def test_run_benchmarks(self):
+        paths = list(MockDAO.paths)
+        results = run_benchmarks(sizes=[10, 20], repeat=1)
+        self.assertEqual(MockDAO.paths, paths)
+        self.assertEqual(set(results.keys()), set([
+            "from_xhtml", "from_snapshot", "xhtml", "round_trip",
+            "grading_scale", "to_arrays", "grade_statistics", "import"]))
+        self.assertEqual(list(results.pop("import").keys()), ["0"])
+        for timings in results.values():
+            self.assertEqual(set(timings.keys()), set(["10", "20"]))
+
+        with TemporaryDirectory() as path:
+            filename = os.path.join(path, "results.json")
+            save_results(results, filename)
+            self.assertEqual(load_results(filename), results)
+
+    def test_compare_results(self):
+        baseline = {"xhtml": {"10": 1.0, "100": 2.0}}
+        results = {"xhtml": {"10": 1.1, "100": 3.0, "1000": 9.0},
+                   "round_trip": {"10": 1.0}}
+        self.assertEqual(compare_results(baseline, results),
+                         [("xhtml", "100", 2.0, 3.0)])
+        self.assertEqual(compare_results(baseline, results, threshold=1.05),
+                         [("xhtml", "10", 1.0, 1.1),
+                          ("xhtml", "100", 2.0, 3.0)])
@@ -0,0 +1,96 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster, update_graderoster
+from uw_sws_graderoster.dao import SWS_GradeRoster_DAO
+from uw_sws_graderoster.validation import (
+    validate_graderoster, InvalidGradeRosterException, INVALID_GRADE,
+    GRADE_CHANGE_NOT_ALLOWED, INCOMPLETE_NOT_ALLOWED,
+    WRITING_CREDIT_NOT_ALLOWED, WITHDRAWN_STUDENT)
+from unittest.mock import patch
+
+
+def error_codes(errors):
+    return [(error.student_label(), error.field, error.code)
+            for error in errors]
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterValidationTest(TestCase):
+    def setUp(self):
+        section = get_section_by_label('2013,summer,CSS,161/A')
+        self.instructor = section.meetings[0].instructors[0]
+        self.graderoster = get_graderoster(
+            section, self.instructor, self.instructor)
+        self.items = self.graderoster.items
+        self.labels = [item.student_label() for item in self.items]
+
+    def test_unchanged(self):
+        self.assertEqual(validate_graderoster(self.graderoster), [])
+
+    def test_grades(self):
+        self.items[0].grade = "3.5"
+        self.items[2].grade = ""
+        self.assertEqual(validate_graderoster(self.graderoster), [])
+
+        self.items[0].grade = "5.0"
+        self.items[1].grade = "3.0"
+        self.assertEqual(error_codes(validate_graderoster(self.graderoster)), [
+            (self.labels[0], "grade", INVALID_GRADE),
+            (self.labels[1], "grade", GRADE_CHANGE_NOT_ALLOWED)])
+
+        # Without grade choices, grades on any grading scale are valid
+        self.items[0].grade_choices = ()
+        self.items[0].grade = "HP"
+        self.assertEqual(validate_graderoster(self.graderoster, items=[
+            self.items[0]]), [])
+        self.items[0].grade = "Z"
+        self.assertEqual(error_codes(validate_graderoster(
+            self.graderoster, items=[self.items[0]])), [
+            (self.labels[0], "grade", INVALID_GRADE)])
+
+    def test_flags(self):
+        self.items[2].has_incomplete = True
+        self.items[4].date_withdrawn = "2013-07-01"
+        self.items[4].has_writing_credit = True
+        self.items[4].has_incomplete = True
+        self.assertEqual(error_codes(validate_graderoster(self.graderoster)), [
+            (self.labels[2], "has_incomplete", INCOMPLETE_NOT_ALLOWED),
+            (self.labels[4], "has_incomplete", WITHDRAWN_STUDENT),
+            (self.labels[4], "has_writing_credit", WITHDRAWN_STUDENT)])
+
+        self.graderoster.allows_writing_credit = False
+        self.items[4].mark_clean()
+        self.items[0].has_writing_credit = True
+        errors = validate_graderoster(self.graderoster)
+        self.assertEqual(error_codes(errors), [
+            (self.labels[0], "has_writing_credit",
+             WRITING_CREDIT_NOT_ALLOWED),
+            (self.labels[2], "has_incomplete", INCOMPLETE_NOT_ALLOWED)])
+        self.assertEqual(errors[0].json_data(), {
+            "student_label": self.labels[0], "field": "has_writing_credit",
+            "code": WRITING_CREDIT_NOT_ALLOWED,
+            "message": "Writing credit not allowed"})
+
+    def test_update(self):
+        self.items[0].grade = "5.0"
+        self.items[2].grade = "2.0"
+        with patch.object(SWS_GradeRoster_DAO, 'putURL') as put:
+            with self.assertRaises(InvalidGradeRosterException) as cm:
+                update_graderoster(self.graderoster, self.instructor,
+                                   validate=True)
+            put.assert_not_called()
+        self.assertEqual(cm.exception.status, 400)
+        self.assertEqual(error_codes(cm.exception.errors), [
+            (self.labels[0], "grade", INVALID_GRADE)])
+
+        self.items[0].grade = "4.0"
+        new_graderoster = update_graderoster(
+            self.graderoster, self.instructor, delta=True, validate=True)
+        self.assertEqual(new_graderoster.items[0].grade, "4.0")
+        self.assertEqual(new_graderoster.items[2].grade, "2.0")
@@ -0,0 +1,55 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_pws.util import fdao_pws_override
+from uw_sws.util import fdao_sws_override
+from uw_sws.section import get_section_by_label
+from uw_sws_graderoster import get_graderoster
+from uw_sws_graderoster.benchmarks import render_per_1000_items
+from uw_sws_graderoster.models import GradeRosterItem, _grade_options
+import os
+
+# XHTML rendered by the original, uncached template
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "resources")
+GOLDEN_FILES = {
+    "2013,summer,CSS,161/A": "2013_summer_CSS_161_A.xhtml",
+    "2013,autumn,EDC&I,461/A": "2013_autumn_EDC_I_461_A.xhtml",
+}
+
+
+def load_golden(filename):
+    with open(os.path.join(GOLDEN_PATH, filename)) as f:
+        return f.read()
+
+
+@fdao_pws_override
+@fdao_sws_override
+class GradeRosterXHTMLTest(TestCase):
+    def get_graderoster(self, label):
+        section = get_section_by_label(label)
+        instructor = section.meetings[0].instructors[0]
+        return get_graderoster(section, instructor, instructor)
+
+    def test_xhtml_parity(self):
+        for label, filename in GOLDEN_FILES.items():
+            graderoster = self.get_graderoster(label)
+            self.assertEqual(graderoster.xhtml(), load_golden(filename))
+            # The cached template renders the same document again
+            self.assertEqual(graderoster.xhtml(), load_golden(filename))
+
+    def test_grade_options(self):
+        gr_item = GradeRosterItem(grade="A&B")
+        gr_item.grade_choices = ["", "A&B", "<C>"]
+        self.assertEqual(
+            _grade_options(gr_item),
+            '<option class="grade" value=""></option>'
+            '<option class="grade" value="A&amp;B" selected="selected">'
+            'A&amp;B</option>'
+            '<option class="grade" value="&lt;C&gt;">&lt;C&gt;</option>')
+
+    def test_render_benchmark(self):
+        graderoster = self.get_graderoster("2013,summer,CSS,161/A")
+        self.assertGreater(
+            render_per_1000_items(graderoster, size=20, repeat=1), 0)
+        self.assertEqual(len(graderoster.items), 5)
@@ -0,0 +1,120 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Local validation of graderoster changes, so that grades SWS would reject
+are caught before the roster is submitted.
+"""
+
+from uw_sws_graderoster.models import GradingScale
+from restclients_core.exceptions import DataFailureException
+from functools import lru_cache
+
+INVALID_GRADE = "invalid_grade"
+GRADE_CHANGE_NOT_ALLOWED = "grade_change_not_allowed"
+INCOMPLETE_NOT_ALLOWED = "incomplete_not_allowed"
+WRITING_CREDIT_NOT_ALLOWED = "writing_credit_not_allowed"
+WITHDRAWN_STUDENT = "withdrawn_student"
+
+
+class ItemError(object):
+    """
+    A validation error for a field of a graderoster item.
+    """
+    def __init__(self, item, field, code, message):
+        self.item = item
+        self.field = field
+        self.code = code
+        self.message = message
+
+    def student_label(self):
+        return self.item.student_label()
+
+    def json_data(self):
+        return {"student_label": self.student_label(),
+                "field": self.field,
+                "code": self.code,
+                "message": self.message}
+
+    def __repr__(self):
+        return "<ItemError {}: {} {}>".format(
+            self.student_label(), self.field, self.code)
+
+
+class InvalidGradeRosterException(DataFailureException):
+    """
+    Raised in place of an update of a graderoster that fails validation.
+    errors is the list of ItemErrors.
+    """
+    def __init__(self, url, errors):
+        super(InvalidGradeRosterException, self).__init__(
+            url, 400, "{} invalid graderoster item{}".format(
+                len(errors), "" if len(errors) == 1 else "s"))
+        self.errors = errors
+
+
+def validate_graderoster(graderoster, items=None):
+    """
+    Returns a list of ItemErrors for the changes to the passed items of
+    the graderoster, or to all of its items.  Only changed fields are
+    validated, so values returned by SWS aren't reported.
+    """
+    errors = []
+    for item in graderoster.items if items is None else items:
+        changed = item.changed_fields()
+        if len(changed):
+            errors.extend(_validate_item(graderoster, item, changed))
+    return errors
+
+
+def _validate_item(graderoster, item, changed):
+    errors = []
+    if "grade" in changed:
+        if not item.allows_grade_change:
+            errors.append(ItemError(
+                item, "grade", GRADE_CHANGE_NOT_ALLOWED,
+                "Grade cannot be changed"))
+        elif not _is_valid_grade(item):
+            errors.append(ItemError(
+                item, "grade", INVALID_GRADE,
+                "Invalid grade: {}".format(item.grade)))
+
+    if "has_incomplete" in changed and item.has_incomplete:
+        if item.date_withdrawn is not None:
+            errors.append(ItemError(
+                item, "has_incomplete", WITHDRAWN_STUDENT,
+                "Incomplete for a withdrawn student"))
+        elif not item.allows_incomplete:
+            errors.append(ItemError(
+                item, "has_incomplete", INCOMPLETE_NOT_ALLOWED,
+                "Incomplete not allowed"))
+
+    if "has_writing_credit" in changed and item.has_writing_credit:
+        if item.date_withdrawn is not None:
+            errors.append(ItemError(
+                item, "has_writing_credit", WITHDRAWN_STUDENT,
+                "Writing credit for a withdrawn student"))
+        elif not graderoster.allows_writing_credit:
+            errors.append(ItemError(
+                item, "has_writing_credit", WRITING_CREDIT_NOT_ALLOWED,
+                "Writing credit not allowed"))
+    return errors
+
+
+def _is_valid_grade(item):
+    if item.grade is None:
+        return True
+
+    if len(item.grade_choices):
+        return item.grade in item.grade_choices
+
+    # Without choices from SWS, any grade on a grading scale is accepted
+    return item.grade.upper() in _scale_grades()
+
+
+@lru_cache(maxsize=None)
+def _scale_grades():
+    grades = set(GradingScale.GRADE_ORDER.keys())
+    for scale in GradingScale.GRADE_SCALES.values():
+        grades.update(scale)
+    return frozenset(grades)